@@ -0,0 +1,108 @@
+"""
+Benchmark of the logging cost per "order_create" request.
+
+Replays the log calls of "OrderService._on_recv_order_create" with the
+logger at INFO level, i.e. with the debug output disabled.
+  - Before: messages formatted eagerly and the OANDA response dumped with
+            "json.dumps(indent=2)" before the rclpy logger drops them.
+  - After:  "LazyLogger", which checks the level before any formatting.
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_lazy_logger.py [count]
+"""
+import sys
+import time
+import json
+import rclpy
+from oanda_api.lazy_logger import LazyLogger
+
+_APIRSP = {
+    "orderCreateTransaction": {
+        "type": "LIMIT_ORDER",
+        "instrument": "USD_JPY",
+        "units": "1000",
+        "price": "110.000",
+        "timeInForce": "GTC",
+        "takeProfitOnFill": {"price": "111.000", "timeInForce": "GTC"},
+        "stopLossOnFill": {"price": "109.000", "timeInForce": "GTC"},
+        "reason": "CLIENT_ORDER",
+        "id": "6372",
+        "accountID": "101-009-12345678-001",
+        "batchID": "6372",
+        "requestID": "24716258589170956",
+        "time": "2021-01-04T07:00:00.123456789Z",
+    },
+    "relatedTransactionIDs": ["6372"],
+    "lastTransactionID": "6372",
+}
+
+
+class _Request():
+    type = 2
+    price = 110.0
+    inst_id = 1
+    units = 1000
+    take_profit_price = 111.0
+    stop_loss_price = 109.0
+
+
+def _log_before(logger, req):
+    logger.debug("{:=^50}".format(" Service[order_create]:Start "))
+    logger.debug("<Request>")
+    logger.debug("  - ordertype_msg.type:[{}]".format(req.type))
+    logger.debug("  - price:[{}]".format(req.price))
+    logger.debug("  - inst_msg.inst_id:[{}]".format(req.inst_id))
+    logger.debug("  - units:[{}]".format(req.units))
+    logger.debug("  - take_profit_price:[{}]".format(req.take_profit_price))
+    logger.debug("  - stop_loss_price:[{}]".format(req.stop_loss_price))
+    logger.debug("{}".format(json.dumps(_APIRSP, indent=2)))
+    logger.debug("<Response>")
+    logger.debug("  - result:[{}]".format(True))
+    logger.debug("  - frc_msg.reason_code:[{}]".format(0))
+    logger.debug("  - id(Trade or Order):[{}]".format(6372))
+    logger.debug("[Performance]")
+    logger.debug("  - Response time:[{}]".format(0.123))
+    logger.debug("{:=^50}".format(" Service[order_create]:End "))
+
+
+def _log_after(logger, req):
+    logger.debug("{:=^50}", " Service[order_create]:Start ")
+    logger.debug("<Request>")
+    logger.debug("  - ordertype_msg.type:[{}]", req.type)
+    logger.debug("  - price:[{}]", req.price)
+    logger.debug("  - inst_msg.inst_id:[{}]", req.inst_id)
+    logger.debug("  - units:[{}]", req.units)
+    logger.debug("  - take_profit_price:[{}]", req.take_profit_price)
+    logger.debug("  - stop_loss_price:[{}]", req.stop_loss_price)
+    logger.debug_json(_APIRSP)
+    logger.debug("<Response>")
+    logger.debug("  - result:[{}]", True)
+    logger.debug("  - frc_msg.reason_code:[{}]", 0)
+    logger.debug("  - id(Trade or Order):[{}]", 6372)
+    logger.debug("[Performance]")
+    logger.debug("  - Response time:[{}]", 0.123)
+    logger.debug("{:=^50}", " Service[order_create]:End ")
+
+
+def _measure(label, log, logger, count):
+    req = _Request()
+    start = time.perf_counter()
+    for _ in range(count):
+        log(logger, req)
+    elapsed = time.perf_counter() - start
+    print("{:<7}: {:>10.0f} requests/sec, {:>8.2f} usec/request"
+          .format(label, count / elapsed, elapsed / count * 1e6))
+
+
+def main():
+    count = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+
+    logger = rclpy.logging.get_logger("bench_lazy_logger")
+    logger.set_level(rclpy.logging.LoggingSeverity.INFO)
+
+    _measure("Before", _log_before, logger, count)
+    _measure("After", _log_after, LazyLogger(logger), count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark of the OANDA payload generation of "order_create" and "trade_crcdo".
+
+Checks that both implementations give identical payloads for random float32
+prices (including exact ties such as 110.0005), then measures the CPU time
+per order.
+  - Before: nested dicts rebuilt per call, "InstParam" scanned per call and
+            prices quantized by "Decimal(str(value))" with ROUND_HALF_UP.
+  - After:  per instrument/order type templates compiled at import, and
+            prices rounded by the integer-pips path ("utility.fit_price").
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_order_payload.py [count]
+"""
+import sys
+import time
+import json
+import random
+import struct
+from decimal import Decimal, ROUND_HALF_UP
+from oanda_api.order_service import OrderService
+from oanda_api.constant import InstParam
+from api_msgs.srv import OrderCreateSrv, TradeCRCDOSrv
+from api_msgs.msg import OrderType
+
+_ORDER_TYP_DICT = {
+    OrderType.TYP_MARKET: "MARKET",
+    OrderType.TYP_LIMIT: "LIMIT",
+    OrderType.TYP_STOP: "STOP",
+}
+
+
+def _fit_unit_before(value, min_unit):
+    tmp = Decimal(str(value)).quantize(Decimal(min_unit),
+                                       rounding=ROUND_HALF_UP)
+    return str(tmp)
+
+
+def _order_create_before(req):
+    data = {
+        "order": {
+            "type": _ORDER_TYP_DICT[req.ordertype_msg.type],
+        }
+    }
+    data_order = data["order"]
+    inst_param = InstParam.get_member_by_msgid(req.inst_msg.inst_id)
+    min_unit = inst_param.lsb_str
+    if ((req.ordertype_msg.type == OrderType.TYP_LIMIT)
+            or (req.ordertype_msg.type == OrderType.TYP_STOP)):
+        data_order.update({
+            "price": _fit_unit_before(req.price, min_unit),
+            "timeInForce": "GTC",
+        })
+    data_order.update({
+        "instrument": inst_param.name,
+        "units": req.units,
+        "positionFill": "DEFAULT",
+        "takeProfitOnFill": {
+            "timeInForce": "GTC",
+            "price": _fit_unit_before(req.take_profit_price, min_unit)
+        },
+        "stopLossOnFill": {
+            "timeInForce": "GTC",
+            "price": _fit_unit_before(req.stop_loss_price, min_unit)
+        },
+    })
+    return data
+
+
+def _trade_crcdo_before(req):
+    inst_param = InstParam.get_member_by_msgid(req.inst_msg.inst_id)
+    min_unit = inst_param.lsb_str
+    return {
+        "takeProfit": {
+            "price": _fit_unit_before(req.take_profit_price, min_unit),
+            "timeInForce": "GTC",
+        },
+        "stopLoss": {
+            "price": _fit_unit_before(req.stop_loss_price, min_unit),
+            "timeInForce": "GTC",
+        },
+    }
+
+
+def _float32(value):
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+
+def _random_price(inst_param):
+    base = 1.2 if inst_param == InstParam.EUR_USD else 110.0
+    if random.random() < 0.2:
+        # Exact tie at the digit after the least significant one.
+        step = 10 ** -(inst_param.digit + 1)
+        return round(base + random.randint(0, 10000) * 2 * step + 5 * step,
+                     inst_param.digit + 1)
+    return _float32(base * random.uniform(0.9, 1.1))
+
+
+def _create_requests(count):
+    reqs = []
+    for _ in range(count):
+        inst_param = random.choice(list(InstParam))
+        req = OrderCreateSrv.Request()
+        req.ordertype_msg.type = random.choice(list(_ORDER_TYP_DICT.keys()))
+        req.inst_msg.inst_id = inst_param.msg_id
+        req.units = random.choice((1000, -1000))
+        req.price = _random_price(inst_param)
+        req.take_profit_price = _random_price(inst_param)
+        req.stop_loss_price = _random_price(inst_param)
+
+        crcdo_req = TradeCRCDOSrv.Request()
+        crcdo_req.inst_msg.inst_id = req.inst_msg.inst_id
+        crcdo_req.take_profit_price = req.take_profit_price
+        crcdo_req.stop_loss_price = req.stop_loss_price
+        reqs.append((req, crcdo_req))
+    return reqs
+
+
+def _measure(label, generate_order, generate_crcdo, reqs):
+    start = time.perf_counter()
+    for req, crcdo_req in reqs:
+        generate_order(req)
+        generate_crcdo(crcdo_req)
+    elapsed = time.perf_counter() - start
+    print("{:<7}: {:>10.0f} orders/sec, {:>8.2f} usec/order"
+          .format(label, len(reqs) / elapsed, elapsed / len(reqs) * 1e6))
+
+
+def main():
+    count = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+
+    random.seed(0)
+    reqs = _create_requests(count)
+
+    # The generators do not use the node state.
+    service = OrderService.__new__(OrderService)
+
+    for req, crcdo_req in reqs:
+        before = json.dumps(_order_create_before(req))
+        after = json.dumps(service._generate_order_create_data(req))
+        assert before == after, (before, after)
+        before = json.dumps(_trade_crcdo_before(crcdo_req))
+        after = json.dumps(service._generate_trade_crcdo_data(crcdo_req))
+        assert before == after, (before, after)
+    print("Identical payloads: {} orders".format(count))
+
+    _measure("Before", _order_create_before, _trade_crcdo_before, reqs)
+    _measure("After",
+             service._generate_order_create_data,
+             service._generate_trade_crcdo_data,
+             reqs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+from typing import Any, Dict, Optional, TypeVar
+from dataclasses import dataclass
+import requests
+import datetime as dt
+from requests.exceptions import ConnectionError, ReadTimeout
+import rclpy
+from rclpy.node import Node
+from rclpy.qos import QoSProfile, QoSHistoryPolicy, QoSReliabilityPolicy
+from oandapyV20 import API
+from oandapyV20.endpoints.accounts import AccountDetails, AccountChanges
+from oandapyV20.exceptions import V20Error
+from api_msgs.srv import AccountSrv
+from api_msgs.msg import Account, Position
+from api_msgs.msg import FailReasonCode as frc
+from oanda_api.utility import RosParam
+from oanda_api.lazy_logger import LazyLogger, get_severity
+from oanda_api.constant import ADD_CIPHERS
+from oanda_api.constant import InstParam
+from oanda_api.constant import FMT_YMDHMSF
+
+SrvTypeRequest = TypeVar("SrvTypeRequest")
+SrvTypeResponse = TypeVar("SrvTypeResponse")
+ApiRsp = TypeVar("ApiRsp")
+EndPoint = TypeVar("EndPoint")
+
+
+@dataclass
+class _RosParams():
+    """
+    ROS Parameter.
+    """
+    USE_ENV_LIVE = RosParam("use_env_live")
+    PRA_ACCOUNT_NUMBER = RosParam("env_practice.account_number")
+    PRA_ACCESS_TOKEN = RosParam("env_practice.access_token")
+    LIV_ACCOUNT_NUMBER = RosParam("env_live.account_number")
+    LIV_ACCESS_TOKEN = RosParam("env_live.access_token")
+    CONNECTION_TIMEOUT = RosParam("connection_timeout")
+    POLLING_INTERVAL = RosParam("polling_interval")
+    RELOAD_INTERVAL = RosParam("reload_interval")
+    LOG_LEVEL = RosParam("log_level")
+
+
+def _to_position(data: Dict[str, Any]) -> Dict[str, Any]:
+    long_ = data["long"]
+    short = data["short"]
+    return {
+        "long_units": int(long_["units"]),
+        "long_average_price": float(long_.get("averagePrice", 0.0)),
+        "short_units": int(short["units"]),
+        "short_average_price": float(short.get("averagePrice", 0.0)),
+    }
+
+
+class AccountService(Node):
+    """
+    Account state cache.
+
+    The Account is fetched once by "AccountDetails" and kept current by
+    polling "AccountChanges" since the last Transaction ID, so that the state
+    is served from memory without a REST call per request. The state is
+    published on the "account" topic whenever it changes.
+    The Account is fetched again every "reload_interval" seconds, and when
+    the state tracked from the changes is found inconsistent.
+    """
+
+    def __init__(self) -> None:
+        super().__init__("account_service")
+
+        # Set logger lebel
+        self.logger = LazyLogger(super().get_logger())
+
+        # Declare ROS parameter
+        self._rosprm = _RosParams()
+        self.declare_parameter(self._rosprm.USE_ENV_LIVE.name)
+        self.declare_parameter(self._rosprm.PRA_ACCOUNT_NUMBER.name)
+        self.declare_parameter(self._rosprm.PRA_ACCESS_TOKEN.name)
+        self.declare_parameter(self._rosprm.LIV_ACCOUNT_NUMBER.name)
+        self.declare_parameter(self._rosprm.LIV_ACCESS_TOKEN.name)
+        self.declare_parameter(self._rosprm.CONNECTION_TIMEOUT.name)
+        self.declare_parameter(self._rosprm.POLLING_INTERVAL.name, 1.0)
+        self.declare_parameter(self._rosprm.RELOAD_INTERVAL.name, 300.0)
+        self.declare_parameter(self._rosprm.LOG_LEVEL.name, "INFO")
+
+        # Set ROS parameter
+        para = self.get_parameter(self._rosprm.USE_ENV_LIVE.name)
+        self._rosprm.USE_ENV_LIVE.value = para.value
+        para = self.get_parameter(self._rosprm.PRA_ACCOUNT_NUMBER.name)
+        self._rosprm.PRA_ACCOUNT_NUMBER.value = para.value
+        para = self.get_parameter(self._rosprm.PRA_ACCESS_TOKEN.name)
+        self._rosprm.PRA_ACCESS_TOKEN.value = para.value
+        para = self.get_parameter(self._rosprm.LIV_ACCOUNT_NUMBER.name)
+        self._rosprm.LIV_ACCOUNT_NUMBER.value = para.value
+        para = self.get_parameter(self._rosprm.LIV_ACCESS_TOKEN.name)
+        self._rosprm.LIV_ACCESS_TOKEN.value = para.value
+        para = self.get_parameter(self._rosprm.CONNECTION_TIMEOUT.name)
+        self._rosprm.CONNECTION_TIMEOUT.value = para.value
+        para = self.get_parameter(self._rosprm.POLLING_INTERVAL.name)
+        self._rosprm.POLLING_INTERVAL.value = para.value
+        para = self.get_parameter(self._rosprm.RELOAD_INTERVAL.name)
+        self._rosprm.RELOAD_INTERVAL.value = para.value
+        para = self.get_parameter(self._rosprm.LOG_LEVEL.name)
+        self._rosprm.LOG_LEVEL.value = para.value
+
+        self.logger.set_level(get_severity(self._rosprm.LOG_LEVEL.value))
+
+        self.logger.debug("[Param]Use Env Live:[{}]", self._rosprm.USE_ENV_LIVE.value)
+        self.logger.debug("[Param]Env Practice")
+        self.logger.debug("  - Account_Number:[{}]", self._rosprm.PRA_ACCOUNT_NUMBER.value)
+        self.logger.debug("  - Access Token:[{}]", self._rosprm.PRA_ACCESS_TOKEN.value)
+        self.logger.debug("[Param]Env Live")
+        self.logger.debug("  - Account_Number:[{}]", self._rosprm.LIV_ACCOUNT_NUMBER.value)
+        self.logger.debug("  - Access Token:[{}]", self._rosprm.LIV_ACCESS_TOKEN.value)
+        self.logger.debug("[Param]Connection Timeout:[{}]", self._rosprm.CONNECTION_TIMEOUT.value)
+        self.logger.debug("[Param]Polling Interval:[{}]", self._rosprm.POLLING_INTERVAL.value)
+        self.logger.debug("[Param]Reload Interval:[{}]", self._rosprm.RELOAD_INTERVAL.value)
+        self.logger.debug("[Param]Log Level:[{}]", self._rosprm.LOG_LEVEL.value)
+
+        if self._rosprm.USE_ENV_LIVE.value:
+            environment = "live"
+            access_token = self._rosprm.LIV_ACCESS_TOKEN.value
+            self._ACCOUNT_NUMBER = self._rosprm.LIV_ACCOUNT_NUMBER.value
+        else:
+            environment = "practice"
+            access_token = self._rosprm.PRA_ACCESS_TOKEN.value
+            self._ACCOUNT_NUMBER = self._rosprm.PRA_ACCOUNT_NUMBER.value
+
+        if self._rosprm.CONNECTION_TIMEOUT.value <= 0:
+            request_params = None
+            self.logger.debug("Not set Timeout")
+        else:
+            request_params = {"timeout": self._rosprm.CONNECTION_TIMEOUT.value}
+
+        self._api = API(access_token=access_token,
+                        environment=environment,
+                        request_params=request_params)
+
+        # Initialize
+        self._last_txn_id = None
+        self._account_msg = None
+        self._positions = {}
+        self._pending_order_count = 0
+        self._reload_time = None
+
+        TPCNM_ACCOUNT = "account"
+
+        # Declare publisher
+        qos_profile = QoSProfile(history=QoSHistoryPolicy.KEEP_LAST,
+                                 depth=1,
+                                 reliability=QoSReliabilityPolicy.RELIABLE)
+        self._pub_acc = self.create_publisher(Account,
+                                              TPCNM_ACCOUNT,
+                                              qos_profile)
+
+        # Create service server "Account"
+        srv_type = AccountSrv
+        srv_name = "account"
+        callback = self._on_recv_account
+        self.account_srv = self.create_service(srv_type,
+                                               srv_name,
+                                               callback)
+
+        self._load_account()
+        self._timer = self.create_timer(self._rosprm.POLLING_INTERVAL.value,
+                                        self._on_timer_polling)
+
+    def _on_recv_account(self,
+                         req: SrvTypeRequest,
+                         rsp: SrvTypeResponse
+                         ) -> SrvTypeResponse:
+        if self._account_msg is None:
+            rsp.result = False
+            rsp.frc_msg.reason_code = frc.REASON_DATA_ZERO
+        else:
+            rsp.account_msg = self._account_msg
+            rsp.result = True
+        return rsp
+
+    def _on_timer_polling(self) -> None:
+        if ((self._last_txn_id is None)
+                or (self._reload_time <= dt.datetime.now())):
+            self._load_account()
+        else:
+            self._poll_changes()
+
+    def _load_account(self) -> None:
+        ep = AccountDetails(accountID=self._ACCOUNT_NUMBER)
+        apirsp = self._request_api(ep)
+        if apirsp is None:
+            return
+
+        try:
+            data_acc = apirsp["account"]
+            positions = {}
+            for data_pos in data_acc["positions"]:
+                self._update_position(positions, data_pos)
+                pos = positions.get(data_pos["instrument"])
+                if pos is not None:
+                    pos["unrealized_pl"] = float(data_pos.get("unrealizedPL", 0.0))
+            pending_order_count = int(data_acc["pendingOrderCount"])
+            last_txn_id = apirsp["lastTransactionID"]
+
+            msg = self._create_account_msg(last_txn_id,
+                                           float(data_acc["balance"]),
+                                           positions,
+                                           pending_order_count)
+            msg.nav = float(data_acc["NAV"])
+            msg.unrealized_pl = float(data_acc["unrealizedPL"])
+            msg.margin_used = float(data_acc["marginUsed"])
+            msg.margin_available = float(data_acc["marginAvailable"])
+            msg.open_trade_count = int(data_acc["openTradeCount"])
+        except (KeyError, TypeError, ValueError) as err:
+            self.logger.error("{:!^50}", " Account Details Response Error ")
+            self.logger.error("{}", repr(err))
+            return
+
+        self._positions = positions
+        self._pending_order_count = pending_order_count
+        self._last_txn_id = last_txn_id
+        self._reload_time = (dt.datetime.now()
+                             + dt.timedelta(seconds=self._rosprm.RELOAD_INTERVAL.value))
+        self._publish(msg)
+        self.logger.info("Account loaded.(last_transaction_id:[{}])", self._last_txn_id)
+
+    def _poll_changes(self) -> None:
+        params = {"sinceTransactionID": self._last_txn_id}
+        ep = AccountChanges(accountID=self._ACCOUNT_NUMBER, params=params)
+        apirsp = self._request_api(ep)
+        if apirsp is None:
+            return
+
+        # The changes are applied to copies, and dropped as a whole if the
+        # response is malformed.
+        try:
+            changes = apirsp["changes"]
+            state = apirsp["state"]
+
+            balance = self._account_msg.balance
+            for txn in changes["transactions"]:
+                if "accountBalance" in txn:
+                    balance = float(txn["accountBalance"])
+
+            positions = {name: dict(pos) for name, pos in self._positions.items()}
+            for data_pos in changes["positions"]:
+                self._update_position(positions, data_pos)
+            for data_pos in state["positions"]:
+                pos = positions.get(data_pos["instrument"])
+                if pos is not None:
+                    pos["unrealized_pl"] = float(data_pos["netUnrealizedPL"])
+
+            pending_order_count = (self._pending_order_count
+                                   + len(changes["ordersCreated"])
+                                   - len(changes["ordersCancelled"])
+                                   - len(changes["ordersFilled"])
+                                   - len(changes["ordersTriggered"]))
+            last_txn_id = apirsp["lastTransactionID"]
+
+            msg = self._create_account_msg(last_txn_id,
+                                           balance,
+                                           positions,
+                                           max(pending_order_count, 0))
+            msg.nav = float(state["NAV"])
+            msg.unrealized_pl = float(state["unrealizedPL"])
+            msg.margin_used = float(state["marginUsed"])
+            msg.margin_available = float(state["marginAvailable"])
+            msg.open_trade_count = len(state["trades"])
+        except (KeyError, TypeError, ValueError) as err:
+            self.logger.error("{:!^50}", " Account Changes Response Error ")
+            self.logger.error("{}", repr(err))
+            return
+
+        self._positions = positions
+        self._pending_order_count = pending_order_count
+        self._last_txn_id = last_txn_id
+
+        if pending_order_count < 0:
+            # The count tracked from the changes is out of sync.
+            self.logger.warn("Pending order count drifted:[{}], reload Account.",
+                             pending_order_count)
+            self._reload_time = dt.datetime.now()
+
+        if self._is_changed(msg):
+            self._publish(msg)
+
+    def _update_position(self,
+                         positions: Dict[str, Dict[str, Any]],
+                         data_pos: Dict[str, Any]
+                         ) -> None:
+        # The unrealized P/L is kept, since it is given by the state only.
+        pos = _to_position(data_pos)
+        prev = positions.get(data_pos["instrument"])
+        pos["unrealized_pl"] = 0.0 if prev is None else prev["unrealized_pl"]
+        if (pos["long_units"] == 0) and (pos["short_units"] == 0):
+            positions.pop(data_pos["instrument"], None)
+        else:
+            positions[data_pos["instrument"]] = pos
+
+    def _create_account_msg(self,
+                            last_txn_id: str,
+                            balance: float,
+                            positions: Dict[str, Dict[str, Any]],
+                            pending_order_count: int
+                            ) -> Account:
+        msg = Account()
+        msg.last_transaction_id = int(last_txn_id)
+        msg.balance = balance
+        msg.pending_order_count = pending_order_count
+        for inst_name, pos in sorted(positions.items()):
+            inst_param = InstParam.get_member_by_name(inst_name)
+            if inst_param is None:
+                continue
+            pos_msg = Position()
+            pos_msg.inst_msg.inst_id = inst_param.msg_id
+            pos_msg.long_units = pos["long_units"]
+            pos_msg.long_average_price = pos["long_average_price"]
+            pos_msg.short_units = pos["short_units"]
+            pos_msg.short_average_price = pos["short_average_price"]
+            pos_msg.unrealized_pl = pos["unrealized_pl"]
+            msg.position_msg_list.append(pos_msg)
+        return msg
+
+    def _is_changed(self, msg: Account) -> bool:
+        prev = self._account_msg
+        if msg.last_transaction_id != prev.last_transaction_id:
+            return True
+        return ((msg.nav != prev.nav)
+                or (msg.unrealized_pl != prev.unrealized_pl)
+                or (msg.margin_used != prev.margin_used)
+                or (msg.margin_available != prev.margin_available))
+
+    def _publish(self, msg: Account) -> None:
+        msg.time = dt.datetime.now().strftime(FMT_YMDHMSF)
+        self._account_msg = msg
+        self._pub_acc.publish(msg)
+        self.logger.debug("Account updated:[{}]", msg)
+
+    def _request_api(self, ep: EndPoint) -> Optional[ApiRsp]:
+        apirsp = None
+        try:
+            apirsp = self._api.request(ep)
+        except V20Error as err:
+            self.logger.error("{:!^50}", " V20Error ")
+            self.logger.error("{}", err)
+        except ConnectionError as err:
+            self.logger.error("{:!^50}", " Connection Error ")
+            self.logger.error("{}", err)
+        except ReadTimeout as err:
+            self.logger.error("{:!^50}", " ReadTimeout  Error")
+            self.logger.error("{}", err)
+        except Exception as err:
+            self.logger.error("{:!^50}", " Others Error ")
+            self.logger.error("{}", err)
+        else:
+            self.logger.debug_json(apirsp)
+        return apirsp
+
+
+def main(args=None):
+
+    requests.packages.urllib3.util.ssl_.DEFAULT_CIPHERS += ADD_CIPHERS
+
+    rclpy.init(args=args)
+    account_service = AccountService()
+
+    try:
+        rclpy.spin(account_service)
+    except KeyboardInterrupt:
+        pass
+
+    account_service.destroy_node()
+    rclpy.shutdown()
@@ -1,10 +1,13 @@
 from typing import TypeVar
 from dataclasses import dataclass
+import threading
 import requests
 import datetime as dt
 from requests.exceptions import ConnectionError, ReadTimeout
 import rclpy
 from rclpy.node import Node
+from rclpy.executors import MultiThreadedExecutor
+from rclpy.callback_groups import ReentrantCallbackGroup
 from oandapyV20 import API
 import oandapyV20.endpoints.instruments as instruments
 from oandapyV20.exceptions import V20Error
@@ -32,6 +35,7 @@ class _RosParams():
     PRA_ACCESS_TOKEN = RosParam("env_practice.access_token")
     LIV_ACCESS_TOKEN = RosParam("env_live.access_token")
     CONNECTION_TIMEOUT = RosParam("connection_timeout")
+    MAX_WORKERS = RosParam("max_workers")
 
 
 class CandlestickService(Node):
@@ -54,6 +58,7 @@ class CandlestickService(Node):
         self.declare_parameter(self._rosprm.PRA_ACCESS_TOKEN.name)
         self.declare_parameter(self._rosprm.LIV_ACCESS_TOKEN.name)
         self.declare_parameter(self._rosprm.CONNECTION_TIMEOUT.name)
+        self.declare_parameter(self._rosprm.MAX_WORKERS.name, 4)
 
         # Set ROS parameter
         para = self.get_parameter(self._rosprm.USE_ENV_LIVE.name)
@@ -64,6 +69,8 @@ class CandlestickService(Node):
         self._rosprm.LIV_ACCESS_TOKEN.value = para.value
         para = self.get_parameter(self._rosprm.CONNECTION_TIMEOUT.name)
         self._rosprm.CONNECTION_TIMEOUT.value = para.value
+        para = self.get_parameter(self._rosprm.MAX_WORKERS.name)
+        self._rosprm.MAX_WORKERS.value = para.value
 
         self.logger.debug("[Param]Use Env Live:[{}]".
                           format(self._rosprm.USE_ENV_LIVE.value))
@@ -75,6 +82,8 @@ class CandlestickService(Node):
                           .format(self._rosprm.LIV_ACCESS_TOKEN.value))
         self.logger.debug("[Param]Connection Timeout:[{}]"
                           .format(self._rosprm.CONNECTION_TIMEOUT.value))
+        self.logger.debug("[Param]Max Workers:[{}]"
+                          .format(self._rosprm.MAX_WORKERS.value))
 
         if self._rosprm.USE_ENV_LIVE.value:
             environment = "live"
@@ -89,9 +98,15 @@ class CandlestickService(Node):
         else:
             request_params = {"timeout": self._rosprm.CONNECTION_TIMEOUT.value}
 
-        self._api = API(access_token=access_token,
-                        environment=environment,
-                        request_params=request_params)
+        self._api_kwargs = {
+            "access_token": access_token,
+            "environment": environment,
+            "request_params": request_params,
+        }
+
+        # "candles" requests are served concurrently by the executor threads.
+        # Each thread has its own API (HTTP session).
+        self._thread_local = threading.local()
 
         # Create service server "Candles"
         srv_type = CandlesSrv
@@ -99,7 +114,19 @@ class CandlestickService(Node):
         callback = self._on_recv_candles
         self._candles_srv = self.create_service(srv_type,
                                                 srv_name,
-                                                callback)
+                                                callback,
+                                                callback_group=ReentrantCallbackGroup())
+
+    @property
+    def max_workers(self) -> int:
+        return self._rosprm.MAX_WORKERS.value
+
+    def _get_api(self) -> API:
+        api = getattr(self._thread_local, "api", None)
+        if api is None:
+            api = API(**self._api_kwargs)
+            self._thread_local.api = api
+        return api
 
     def _on_recv_candles(self,
                          req: SrvTypeRequest,
@@ -178,7 +205,7 @@ class CandlestickService(Node):
             rsp.frc_msg.reason_code = frc.REASON_UNSET
             apirsp = None
             try:
-                apirsp = self._api.request(ep)
+                apirsp = self._get_api().request(ep)
             except V20Error as err:
                 self.logger.error("{:!^50}".format(" V20Error "))
                 self.logger.error("{}".format(err))
@@ -274,11 +301,15 @@ def main(args=None):
 
     rclpy.init(args=args)
     cs = CandlestickService()
+    executor = MultiThreadedExecutor(num_threads=cs.max_workers)
+    executor.add_node(cs)
 
     try:
-        rclpy.spin(cs)
+        executor.spin()
     except KeyboardInterrupt:
         pass
 
+    executor.shutdown()
+
     cs.destroy_node()
     rclpy.shutdown()
@@ -0,0 +1,105 @@
+from typing import Any, TypeVar
+import time
+import json
+from rclpy.logging import LoggingSeverity
+
+RcutilsLogger = TypeVar("RcutilsLogger")
+
+# Define Constant value.
+_MAX_THROTTLE_KEYS = 1000
+
+
+def get_severity(name: str) -> LoggingSeverity:
+    """
+    Logging severity by name, e.g. "debug", "INFO".
+    """
+    return LoggingSeverity[name.upper()]
+
+
+class LazyLogger():
+    """
+    Level-guarded wrapper of the rclpy logger.
+
+    Messages are given as a format string and its arguments, and are only
+    formatted if the severity is enabled. The effective level is cached, so
+    a disabled message costs one integer comparison. If "throttle_sec" is
+    given, a message with the same format string and arguments is logged at
+    most once per period, and the number of suppressed messages is appended
+    to the next one.
+
+    The logger is shared by "oanda_api" and "trade_manager".
+    """
+
+    def __init__(self, logger: RcutilsLogger) -> None:
+        self._logger = logger
+        self._level = logger.get_effective_level()
+        self._throttle = {}
+
+    @property
+    def name(self) -> str:
+        return self._logger.name
+
+    def get_child(self, name: str) -> "LazyLogger":
+        return LazyLogger(self._logger.get_child(name))
+
+    def set_level(self, level: LoggingSeverity) -> None:
+        self._logger.set_level(level)
+        self._level = self._logger.get_effective_level()
+
+    def is_enabled_for(self, severity: LoggingSeverity) -> bool:
+        return self._level <= severity
+
+    def is_debug_enabled(self) -> bool:
+        return self._level <= LoggingSeverity.DEBUG
+
+    def debug(self, fmt: str, *args: Any, throttle_sec: float = 0.0) -> None:
+        if self._level <= LoggingSeverity.DEBUG:
+            self._log(LoggingSeverity.DEBUG, fmt, args, throttle_sec)
+
+    def info(self, fmt: str, *args: Any, throttle_sec: float = 0.0) -> None:
+        if self._level <= LoggingSeverity.INFO:
+            self._log(LoggingSeverity.INFO, fmt, args, throttle_sec)
+
+    def warn(self, fmt: str, *args: Any, throttle_sec: float = 0.0) -> None:
+        if self._level <= LoggingSeverity.WARN:
+            self._log(LoggingSeverity.WARN, fmt, args, throttle_sec)
+
+    def error(self, fmt: str, *args: Any, throttle_sec: float = 0.0) -> None:
+        if self._level <= LoggingSeverity.ERROR:
+            self._log(LoggingSeverity.ERROR, fmt, args, throttle_sec)
+
+    def debug_json(self, obj: Any) -> None:
+        """
+        Pretty-printed JSON, only dumped if debug output is enabled.
+        """
+        if self._level <= LoggingSeverity.DEBUG:
+            self._logger.debug(json.dumps(obj, indent=2))
+
+    def _log(self,
+             severity: LoggingSeverity,
+             fmt: str,
+             args: tuple,
+             throttle_sec: float
+             ) -> None:
+        suffix = ""
+        if 0 < throttle_sec:
+            now = time.monotonic()
+            try:
+                key = (fmt, args)
+                entry = self._throttle.get(key)
+            except TypeError:
+                key = (fmt, tuple(str(arg) for arg in args))
+                entry = self._throttle.get(key)
+            if entry is not None:
+                if now < entry[0]:
+                    entry[1] += 1
+                    return
+                if 0 < entry[1]:
+                    suffix = " ({} similar messages suppressed)".format(entry[1])
+            elif _MAX_THROTTLE_KEYS <= len(self._throttle):
+                # Drop the periods over, e.g. of the tickets completed.
+                self._throttle = {k: v for k, v in self._throttle.items() if now < v[0]}
+            self._throttle[key] = [now + throttle_sec, 0]
+
+        msg = fmt.format(*args) if args else str(fmt)
+        self._logger.log(msg + suffix, severity)
@@ -1,25 +1,31 @@
 from typing import TypeVar
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import requests
+import time
 import datetime as dt
 import ast
-import json
-from decimal import Decimal, ROUND_HALF_UP
 from requests.exceptions import ConnectionError, ReadTimeout
 import rclpy
 from rclpy.node import Node
 from oandapyV20 import API
 from oandapyV20.endpoints.orders import OrderCreate, OrderDetails, OrderCancel
+from oandapyV20.endpoints.orders import OrdersPending
 from oandapyV20.endpoints.trades import TradeDetails, TradeCRCDO, TradeClose
+from oandapyV20.endpoints.trades import OpenTrades
 from oandapyV20.exceptions import V20Error
 
 from api_msgs.srv import (OrderCreateSrv, TradeDetailsSrv,
                           TradeCRCDOSrv, TradeCloseSrv,
-                          OrderDetailsSrv, OrderCancelSrv)
+                          OrderDetailsSrv, OrderCancelSrv,
+                          OrderTradeListSrv, OrderCreateBulkSrv)
 from api_msgs.msg import OrderType, OrderState, TradeState
+from api_msgs.msg import OrderCreateResult
 from api_msgs.msg import FailReasonCode as frc
 from oanda_api import utility as utl
 from oanda_api.utility import RosParam
+from oanda_api.lazy_logger import LazyLogger, get_severity
 from oanda_api.constant import ADD_CIPHERS
 from oanda_api.constant import InstParam
 
@@ -52,6 +58,76 @@ _TRADE_STS_DICT = {
 }
 
 
+class _OrderCreateTemplate():
+    """
+    Payload template of "OrderCreate" for an instrument and an order type.
+    """
+
+    __slots__ = ("_type_name", "_inst_name", "_digit", "_has_price")
+
+    def __init__(self, order_type: int, inst_param: InstParam) -> None:
+        self._type_name = _ORDER_TYP_DICT[order_type]
+        self._inst_name = inst_param.name
+        self._digit = inst_param.digit
+        self._has_price = order_type in (OrderType.TYP_LIMIT, OrderType.TYP_STOP)
+
+    def generate(self, req: SrvTypeRequest) -> JsonFmt:
+        digit = self._digit
+        data_order = {"type": self._type_name}
+        if self._has_price:
+            data_order["price"] = utl.fit_price(req.price, digit)
+            data_order["timeInForce"] = "GTC"
+        data_order["instrument"] = self._inst_name
+        data_order["units"] = req.units
+        data_order["positionFill"] = "DEFAULT"
+        data_order["takeProfitOnFill"] = {
+            "timeInForce": "GTC",
+            "price": utl.fit_price(req.take_profit_price, digit)
+        }
+        data_order["stopLossOnFill"] = {
+            "timeInForce": "GTC",
+            "price": utl.fit_price(req.stop_loss_price, digit)
+        }
+        return {"order": data_order}
+
+
+# Compiled per (instrument message ID, order type).
+_ORDER_CREATE_TEMPLATE_DICT = {
+    (inst_param.msg_id, order_type): _OrderCreateTemplate(order_type, inst_param)
+    for inst_param in InstParam for order_type in _ORDER_TYP_DICT.keys()
+}
+
+_INST_DIGIT_DICT = {inst_param.msg_id: inst_param.digit for inst_param in InstParam}
+
+
+def _set_order_create_result(apirsp: ApiRsp, rsp: SrvTypeResponse) -> None:
+    """
+    Set the result of "OrderCreate" response "apirsp" in "rsp".
+    """
+    rsp.frc_msg.reason_code = frc.REASON_UNSET
+    if "orderFillTransaction" in apirsp.keys():
+        data_oft = apirsp["orderFillTransaction"]
+        if "tradeOpened" in data_oft:
+            rsp.id = int(data_oft["tradeOpened"]["tradeID"])
+            rsp.result = True
+        else:
+            # A fill only reducing or closing existing trades opens no trade,
+            # so there is no trade of the order to manage.
+            rsp.frc_msg.reason_code = frc.REASON_OTHERS
+    elif "orderCancelTransaction" in apirsp.keys():
+        reason = apirsp["orderCancelTransaction"]["reason"]
+        if reason == "MARKET_HALTED":
+            rsp.frc_msg.reason_code = frc.REASON_MARKET_HALTED
+        else:
+            rsp.frc_msg.reason_code = frc.REASON_OTHERS
+    elif "orderCreateTransaction" in apirsp.keys():
+        data_oct = apirsp["orderCreateTransaction"]
+        rsp.id = int(data_oct["id"])
+        rsp.result = True
+    else:
+        rsp.frc_msg.reason_code = frc.REASON_OTHERS
+
+
 @dataclass
 class _RosParams():
     """
@@ -63,6 +139,8 @@ class _RosParams():
     LIV_ACCOUNT_NUMBER = RosParam("env_live.account_number")
     LIV_ACCESS_TOKEN = RosParam("env_live.access_token")
     CONNECTION_TIMEOUT = RosParam("connection_timeout")
+    BULK_MAX_WORKERS = RosParam("bulk_max_workers")
+    LOG_LEVEL = RosParam("log_level")
 
 
 class OrderService(Node):
@@ -71,9 +149,7 @@ class OrderService(Node):
         super().__init__("order_service")
 
         # Set logger lebel
-        logger = super().get_logger()
-        logger.set_level(rclpy.logging.LoggingSeverity.DEBUG)
-        self.logger = logger
+        self.logger = LazyLogger(super().get_logger())
 
         # Declare ROS parameter
         self._rosprm = _RosParams()
@@ -83,6 +159,8 @@ class OrderService(Node):
         self.declare_parameter(self._rosprm.LIV_ACCOUNT_NUMBER.name)
         self.declare_parameter(self._rosprm.LIV_ACCESS_TOKEN.name)
         self.declare_parameter(self._rosprm.CONNECTION_TIMEOUT.name)
+        self.declare_parameter(self._rosprm.BULK_MAX_WORKERS.name, 8)
+        self.declare_parameter(self._rosprm.LOG_LEVEL.name, "INFO")
 
         # Set ROS parameter
         para = self.get_parameter(self._rosprm.USE_ENV_LIVE.name)
@@ -97,21 +175,23 @@ class OrderService(Node):
         self._rosprm.LIV_ACCESS_TOKEN.value = para.value
         para = self.get_parameter(self._rosprm.CONNECTION_TIMEOUT.name)
         self._rosprm.CONNECTION_TIMEOUT.value = para.value
+        para = self.get_parameter(self._rosprm.BULK_MAX_WORKERS.name)
+        self._rosprm.BULK_MAX_WORKERS.value = para.value
+        para = self.get_parameter(self._rosprm.LOG_LEVEL.name)
+        self._rosprm.LOG_LEVEL.value = para.value
+
+        self.logger.set_level(get_severity(self._rosprm.LOG_LEVEL.value))
 
-        self.logger.debug("[Param]Use Env Live:[{}]".
-                          format(self._rosprm.USE_ENV_LIVE.value))
+        self.logger.debug("[Param]Use Env Live:[{}]", self._rosprm.USE_ENV_LIVE.value)
         self.logger.debug("[Param]Env Practice")
-        self.logger.debug("  - Account_Number:[{}]"
-                          .format(self._rosprm.PRA_ACCOUNT_NUMBER.value))
-        self.logger.debug("  - Access Token:[{}]"
-                          .format(self._rosprm.PRA_ACCESS_TOKEN.value))
+        self.logger.debug("  - Account_Number:[{}]", self._rosprm.PRA_ACCOUNT_NUMBER.value)
+        self.logger.debug("  - Access Token:[{}]", self._rosprm.PRA_ACCESS_TOKEN.value)
         self.logger.debug("[Param]Env Live")
-        self.logger.debug("  - Account_Number:[{}]"
-                          .format(self._rosprm.LIV_ACCOUNT_NUMBER.value))
-        self.logger.debug("  - Access Token:[{}]"
-                          .format(self._rosprm.LIV_ACCESS_TOKEN.value))
-        self.logger.debug("[Param]Connection Timeout:[{}]"
-                          .format(self._rosprm.CONNECTION_TIMEOUT.value))
+        self.logger.debug("  - Account_Number:[{}]", self._rosprm.LIV_ACCOUNT_NUMBER.value)
+        self.logger.debug("  - Access Token:[{}]", self._rosprm.LIV_ACCESS_TOKEN.value)
+        self.logger.debug("[Param]Connection Timeout:[{}]", self._rosprm.CONNECTION_TIMEOUT.value)
+        self.logger.debug("[Param]Bulk Max Workers:[{}]", self._rosprm.BULK_MAX_WORKERS.value)
+        self.logger.debug("[Param]Log Level:[{}]", self._rosprm.LOG_LEVEL.value)
 
         if self._rosprm.USE_ENV_LIVE.value:
             environment = "live"
@@ -128,9 +208,18 @@ class OrderService(Node):
         else:
             request_params = {"timeout": self._rosprm.CONNECTION_TIMEOUT.value}
 
-        self._api = API(access_token=access_token,
-                        environment=environment,
-                        request_params=request_params)
+        self._api_kwargs = {
+            "access_token": access_token,
+            "environment": environment,
+            "request_params": request_params,
+        }
+        self._api = API(**self._api_kwargs)
+
+        # The orders of "order_create_bulk" are sent concurrently.
+        # Each worker thread has its own API (HTTP session).
+        self._thread_local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=self._rosprm.BULK_MAX_WORKERS.value,
+                                            initializer=self._init_worker_api)
 
         # Create service server "OrderCreate"
         srv_type = OrderCreateSrv
@@ -139,6 +228,13 @@ class OrderService(Node):
         self.order_create_srv = self.create_service(srv_type,
                                                     srv_name,
                                                     callback)
+        # Create service server "OrderCreateBulk"
+        srv_type = OrderCreateBulkSrv
+        srv_name = "order_create_bulk"
+        callback = self._on_recv_order_create_bulk
+        self.order_create_bulk_srv = self.create_service(srv_type,
+                                                         srv_name,
+                                                         callback)
         # Create service server "TradeDetails"
         srv_type = TradeDetailsSrv
         srv_name = "trade_details"
@@ -174,75 +270,115 @@ class OrderService(Node):
         self.order_cancel_srv = self.create_service(srv_type,
                                                     srv_name,
                                                     callback)
+        # Create service server "OrderTradeList"
+        srv_type = OrderTradeListSrv
+        srv_name = "order_trade_list"
+        callback = self._on_recv_order_trade_list
+        self.order_trade_list_srv = self.create_service(srv_type,
+                                                        srv_name,
+                                                        callback)
+
+    def destroy_node(self) -> None:
+        self._executor.shutdown(wait=False)
+        super().destroy_node()
 
     def _on_recv_order_create(self,
                               req: SrvTypeRequest,
                               rsp: SrvTypeResponse
                               ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
         logger = self.logger
 
-        logger.debug("{:=^50}".format(" Service[order_create]:Start "))
+        logger.debug("{:=^50}", " Service[order_create]:Start ")
         logger.debug("<Request>")
-        logger.debug("  - ordertype_msg.type:[{}]".format(req.ordertype_msg.type))
-        logger.debug("  - price:[{}]".format(req.price))
-        logger.debug("  - inst_msg.inst_id:[{}]".format(req.inst_msg.inst_id))
-        logger.debug("  - units:[{}]".format(req.units))
-        logger.debug("  - take_profit_price:[{}]".format(req.take_profit_price))
-        logger.debug("  - stop_loss_price:[{}]".format(req.stop_loss_price))
+        logger.debug("  - ordertype_msg.type:[{}]", req.ordertype_msg.type)
+        logger.debug("  - price:[{}]", req.price)
+        logger.debug("  - inst_msg.inst_id:[{}]", req.inst_msg.inst_id)
+        logger.debug("  - units:[{}]", req.units)
+        logger.debug("  - take_profit_price:[{}]", req.take_profit_price)
+        logger.debug("  - stop_loss_price:[{}]", req.stop_loss_price)
         dbg_tm_start = dt.datetime.now()
 
-        data = self._generate_order_create_data(req)
-        ep = OrderCreate(accountID=self._ACCOUNT_NUMBER, data=data)
+        self._create_order(req, rsp)
+
+        dbg_tm_end = dt.datetime.now()
+        logger.debug("<Response>")
+        logger.debug("  - result:[{}]", rsp.result)
+        logger.debug("  - frc_msg.reason_code:[{}]", rsp.frc_msg.reason_code)
+        logger.debug("  - id(Trade or Order):[{}]", rsp.id)
+        logger.debug("[Performance]")
+        logger.debug("  - Response time:[{}]", dbg_tm_end - dbg_tm_start)
+        logger.debug("{:=^50}", " Service[order_create]:End ")
+
+        return rsp
+
+    def _create_order(self,
+                      req: SrvTypeRequest,
+                      rsp: SrvTypeResponse
+                      ) -> None:
+        """
+        Send an order to the OANDA API and set the result in "rsp".
+        "req" and "rsp" are "OrderCreateSrv" or the items of "OrderCreateBulkSrv".
+        """
         rsp.result = False
         apirsp = None
         try:
-            apirsp = self._api.request(ep)
+            data = self._generate_order_create_data(req)
+            ep = OrderCreate(accountID=self._ACCOUNT_NUMBER, data=data)
+            apirsp = self._request_api(ep, rsp)
+            self.logger.debug_json(apirsp)
+            _set_order_create_result(apirsp, rsp)
         except V20Error as err:
-            self.logger.error("{:!^50}".format(" V20Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " V20Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
         except ConnectionError as err:
-            self.logger.error("{:!^50}".format(" Connection Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Connection Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except ReadTimeout as err:
-            self.logger.error("{:!^50}".format(" ReadTimeout  Error"))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " ReadTimeout  Error")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except Exception as err:
-            self.logger.error("{:!^50}".format(" Others Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Others Error ")
+            self.logger.error("{}", repr(err))
+            rsp.result = False
             rsp.frc_msg.reason_code = frc.REASON_OTHERS
-        else:
-            self.logger.debug("{}".format(json.dumps(apirsp, indent=2)))
 
-            rsp.frc_msg.reason_code = frc.REASON_UNSET
-            if "orderFillTransaction" in apirsp.keys():
-                data_oft = apirsp["orderFillTransaction"]
-                data_to = data_oft["tradeOpened"]
-                rsp.id = int(data_to["tradeID"])
-                rsp.result = True
-            elif "orderCancelTransaction" in apirsp.keys():
-                reason = apirsp["orderCancelTransaction"]["reason"]
-                if reason == "MARKET_HALTED":
-                    rsp.frc_msg.reason_code = frc.REASON_MARKET_HALTED
-                else:
-                    rsp.frc_msg.reason_code = frc.REASON_OTHERS
-            elif "orderCreateTransaction" in apirsp.keys():
-                data_oct = apirsp["orderCreateTransaction"]
-                rsp.id = int(data_oct["id"])
-                rsp.result = True
-            else:
-                rsp.frc_msg.reason_code = frc.REASON_OTHERS
+    def _on_recv_order_create_bulk(self,
+                                   req: SrvTypeRequest,
+                                   rsp: SrvTypeResponse
+                                   ) -> SrvTypeResponse:
+        logger = self.logger
+
+        logger.debug("{:=^50}", " Service[order_create_bulk]:Start ")
+        logger.debug("<Request>")
+        logger.debug("  - order count:[{}]", len(req.order_msg_list))
+        dbg_tm_start = dt.datetime.now()
+
+        results = []
+        for order_msg in req.order_msg_list:
+            result_msg = OrderCreateResult()
+            self._stamp_receive(order_msg, result_msg)
+            results.append(result_msg)
+
+        list(self._executor.map(self._create_order, req.order_msg_list, results))
+
+        rsp.result_msg_list = results
+        rsp.result = all(result_msg.result for result_msg in results)
 
         dbg_tm_end = dt.datetime.now()
         logger.debug("<Response>")
-        logger.debug("  - result:[{}]".format(rsp.result))
-        logger.debug("  - frc_msg.reason_code:[{}]".format(rsp.frc_msg.reason_code))
-        logger.debug("  - id(Trade or Order):[{}]".format(rsp.id))
+        logger.debug("  - result:[{}]", rsp.result)
+        for result_msg in results:
+            logger.debug("  - result:[{}], frc_msg.reason_code:[{}], id:[{}]",
+                         result_msg.result,
+                         result_msg.frc_msg.reason_code,
+                         result_msg.id)
         logger.debug("[Performance]")
-        logger.debug("  - Response time:[{}]".format(dbg_tm_end - dbg_tm_start))
-        logger.debug("{:=^50}".format(" Service[order_create]:End "))
+        logger.debug("  - Response time:[{}]", dbg_tm_end - dbg_tm_start)
+        logger.debug("{:=^50}", " Service[order_create_bulk]:End ")
 
         return rsp
 
@@ -250,11 +386,12 @@ class OrderService(Node):
                                req: SrvTypeRequest,
                                rsp: SrvTypeResponse
                                ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
         logger = self.logger
 
-        logger.debug("{:=^50}".format(" Service[trade_details]:Start "))
+        logger.debug("{:=^50}", " Service[trade_details]:Start ")
         logger.debug("<Request>")
-        logger.debug("  - trade_id:[{}]".format(req.trade_id))
+        logger.debug("  - trade_id:[{}]", req.trade_id)
         dbg_tm_start = dt.datetime.now()
 
         ep = TradeDetails(accountID=self._ACCOUNT_NUMBER,
@@ -262,29 +399,32 @@ class OrderService(Node):
         rsp.result = False
         apirsp = None
         try:
-            apirsp = self._api.request(ep)
+            apirsp = self._request_api(ep, rsp)
         except V20Error as err:
-            self.logger.error("{:!^50}".format(" V20Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " V20Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
         except ConnectionError as err:
-            self.logger.error("{:!^50}".format(" Connection Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Connection Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except ReadTimeout as err:
-            self.logger.error("{:!^50}".format(" ReadTimeout  Error"))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " ReadTimeout  Error")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except Exception as err:
-            self.logger.error("{:!^50}".format(" Others Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Others Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OTHERS
         else:
-            self.logger.debug("{}".format(json.dumps(apirsp, indent=2)))
+            self.logger.debug_json(apirsp)
 
             rsp.frc_msg.reason_code = frc.REASON_UNSET
             if "trade" in apirsp.keys():
                 data_trd = apirsp["trade"]
+                inst_param = InstParam.get_member_by_name(data_trd["instrument"])
+                if inst_param is not None:
+                    rsp.inst_msg.inst_id = inst_param.msg_id
                 rsp.contract_price = float(data_trd["price"])
                 rsp.trade_state_msg.state = _TRADE_STS_DICT[data_trd["state"]]
                 rsp.current_units = int(data_trd["currentUnits"])
@@ -304,23 +444,24 @@ class OrderService(Node):
 
         dbg_tm_end = dt.datetime.now()
         logger.debug("<Response>")
-        logger.debug("  - result:[{}]".format(rsp.result))
-        logger.debug("  - frc_msg.reason_code:[{}]".format(rsp.frc_msg.reason_code))
-        logger.debug("  - contract_price:[{}]".format(rsp.contract_price))
-        logger.debug("  - trade_state_msg.state:[{}]".format(rsp.trade_state_msg.state))
-        logger.debug("  - current_units:[{}]".format(rsp.current_units))
-        logger.debug("  - realized_pl:[{}]".format(rsp.realized_pl))
-        logger.debug("  - unrealized_pl:[{}]".format(rsp.unrealized_pl))
-        logger.debug("  - open_time:[{}]".format(rsp.open_time))
-        logger.debug("  - profit_order_msg.price:[{}]".format(rsp.profit_order_msg.price))
-        logger.debug("  - profit_order_msg.order_state_msg.state:[{}]"
-                     .format(rsp.profit_order_msg.order_state_msg.state))
-        logger.debug("  - loss_order_msg.price:[{}]".format(rsp.loss_order_msg.price))
-        logger.debug("  - loss_order_msg.order_state_msg.state:[{}]"
-                     .format(rsp.loss_order_msg.order_state_msg.state))
+        logger.debug("  - result:[{}]", rsp.result)
+        logger.debug("  - frc_msg.reason_code:[{}]", rsp.frc_msg.reason_code)
+        logger.debug("  - inst_msg.inst_id:[{}]", rsp.inst_msg.inst_id)
+        logger.debug("  - contract_price:[{}]", rsp.contract_price)
+        logger.debug("  - trade_state_msg.state:[{}]", rsp.trade_state_msg.state)
+        logger.debug("  - current_units:[{}]", rsp.current_units)
+        logger.debug("  - realized_pl:[{}]", rsp.realized_pl)
+        logger.debug("  - unrealized_pl:[{}]", rsp.unrealized_pl)
+        logger.debug("  - open_time:[{}]", rsp.open_time)
+        logger.debug("  - profit_order_msg.price:[{}]", rsp.profit_order_msg.price)
+        logger.debug("  - profit_order_msg.order_state_msg.state:[{}]",
+                     rsp.profit_order_msg.order_state_msg.state)
+        logger.debug("  - loss_order_msg.price:[{}]", rsp.loss_order_msg.price)
+        logger.debug("  - loss_order_msg.order_state_msg.state:[{}]",
+                     rsp.loss_order_msg.order_state_msg.state)
         logger.debug("[Performance]")
-        logger.debug("  - Response time:[{}]".format(dbg_tm_end - dbg_tm_start))
-        logger.debug("{:=^50}".format(" Service[trade_details]:End "))
+        logger.debug("  - Response time:[{}]", dbg_tm_end - dbg_tm_start)
+        logger.debug("{:=^50}", " Service[trade_details]:End ")
 
         return rsp
 
@@ -328,14 +469,15 @@ class OrderService(Node):
                              req: SrvTypeRequest,
                              rsp: SrvTypeResponse
                              ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
         logger = self.logger
 
-        logger.debug("{:=^50}".format(" Service[trade_crcdo]:Start "))
+        logger.debug("{:=^50}", " Service[trade_crcdo]:Start ")
         logger.debug("<Request>")
-        logger.debug("  - trade_id:[{}]".format(req.trade_id))
-        logger.debug("  - inst_msg.inst_id:[{}]".format(req.inst_msg.inst_id))
-        logger.debug("  - take_profit_price:[{}]".format(req.take_profit_price))
-        logger.debug("  - stop_loss_price:[{}]".format(req.stop_loss_price))
+        logger.debug("  - trade_id:[{}]", req.trade_id)
+        logger.debug("  - inst_msg.inst_id:[{}]", req.inst_msg.inst_id)
+        logger.debug("  - take_profit_price:[{}]", req.take_profit_price)
+        logger.debug("  - stop_loss_price:[{}]", req.stop_loss_price)
         dbg_tm_start = dt.datetime.now()
 
         data = self._generate_trade_crcdo_data(req)
@@ -344,25 +486,25 @@ class OrderService(Node):
         rsp.result = False
         apirsp = None
         try:
-            apirsp = self._api.request(ep)
+            apirsp = self._request_api(ep, rsp)
         except V20Error as err:
-            self.logger.error("{:!^50}".format(" V20Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " V20Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
         except ConnectionError as err:
-            self.logger.error("{:!^50}".format(" Connection Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Connection Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except ReadTimeout as err:
-            self.logger.error("{:!^50}".format(" ReadTimeout  Error"))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " ReadTimeout  Error")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except Exception as err:
-            self.logger.error("{:!^50}".format(" Others Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Others Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OTHERS
         else:
-            self.logger.debug("{}".format(json.dumps(apirsp, indent=2)))
+            self.logger.debug_json(apirsp)
 
             rsp.frc_msg.reason_code = frc.REASON_UNSET
             if (("takeProfitOrderTransaction" in apirsp.keys())
@@ -377,13 +519,13 @@ class OrderService(Node):
 
         dbg_tm_end = dt.datetime.now()
         logger.debug("<Response>")
-        logger.debug("  - result:[{}]".format(rsp.result))
-        logger.debug("  - frc_msg.reason_code:[{}]".format(rsp.frc_msg.reason_code))
-        logger.debug("  - take_profit_price:[{}]".format(rsp.take_profit_price))
-        logger.debug("  - stop_loss_price:[{}]".format(rsp.stop_loss_price))
+        logger.debug("  - result:[{}]", rsp.result)
+        logger.debug("  - frc_msg.reason_code:[{}]", rsp.frc_msg.reason_code)
+        logger.debug("  - take_profit_price:[{}]", rsp.take_profit_price)
+        logger.debug("  - stop_loss_price:[{}]", rsp.stop_loss_price)
         logger.debug("[Performance]")
-        logger.debug("  - Response time:[{}]".format(dbg_tm_end - dbg_tm_start))
-        logger.debug("{:=^50}".format(" Service[trade_crcdo]:End "))
+        logger.debug("  - Response time:[{}]", dbg_tm_end - dbg_tm_start)
+        logger.debug("{:=^50}", " Service[trade_crcdo]:End ")
 
         return rsp
 
@@ -391,18 +533,19 @@ class OrderService(Node):
                              req: SrvTypeRequest,
                              rsp: SrvTypeResponse
                              ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
         logger = self.logger
 
-        logger.debug("{:=^50}".format(" Service[trade_close]:Start "))
+        logger.debug("{:=^50}", " Service[trade_close]:Start ")
         logger.debug("<Request>")
-        logger.debug("  - trade_id:[{}]".format(req.trade_id))
+        logger.debug("  - trade_id:[{}]", req.trade_id)
         dbg_tm_start = dt.datetime.now()
 
         ep = TradeClose(accountID=self._ACCOUNT_NUMBER, tradeID=req.trade_id)
         rsp.result = False
         apirsp = None
         try:
-            apirsp = self._api.request(ep)
+            apirsp = self._request_api(ep, rsp)
         except V20Error as err:
             rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
             try:
@@ -411,29 +554,29 @@ class OrderService(Node):
                 pass
             else:
                 if isinstance(rspdic, dict):
-                    self.logger.debug("{}".format(json.dumps(rspdic, indent=2)))
+                    self.logger.debug_json(rspdic)
                     if "orderRejectTransaction" in rspdic.keys():
                         rjc = rspdic["orderRejectTransaction"]
                         if "rejectReason" in rjc.keys():
                             if rjc["rejectReason"] == "TRADE_DOESNT_EXIST":
                                 rsp.frc_msg.reason_code = frc.REASON_TRADE_DOESNT_EXIST
             if not rsp.frc_msg.reason_code == frc.REASON_TRADE_DOESNT_EXIST:
-                self.logger.error("{:!^50}".format(" V20Error "))
-                self.logger.error("{}".format(err))
+                self.logger.error("{:!^50}", " V20Error ")
+                self.logger.error("{}", err)
         except ConnectionError as err:
-            self.logger.error("{:!^50}".format(" Connection Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Connection Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except ReadTimeout as err:
-            self.logger.error("{:!^50}".format(" ReadTimeout  Error"))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " ReadTimeout  Error")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except Exception as err:
-            self.logger.error("{:!^50}".format(" Others Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Others Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OTHERS
         else:
-            self.logger.debug("{}".format(json.dumps(apirsp, indent=2)))
+            self.logger.debug_json(apirsp)
 
             rsp.frc_msg.reason_code = frc.REASON_UNSET
             if "orderFillTransaction" in apirsp.keys():
@@ -452,17 +595,17 @@ class OrderService(Node):
 
         dbg_tm_end = dt.datetime.now()
         logger.debug("<Response>")
-        logger.debug("  - result:[{}]".format(rsp.result))
-        logger.debug("  - frc_msg.reason_code:[{}]".format(rsp.frc_msg.reason_code))
-        logger.debug("  - inst_msg.inst_id:[{}]".format(rsp.inst_msg.inst_id))
-        logger.debug("  - time:[{}]".format(rsp.time))
-        logger.debug("  - units:[{}]".format(rsp.units))
-        logger.debug("  - price:[{}]".format(rsp.price))
-        logger.debug("  - realized_pl:[{}]".format(rsp.realized_pl))
-        logger.debug("  - half_spread_cost:[{}]".format(rsp.half_spread_cost))
+        logger.debug("  - result:[{}]", rsp.result)
+        logger.debug("  - frc_msg.reason_code:[{}]", rsp.frc_msg.reason_code)
+        logger.debug("  - inst_msg.inst_id:[{}]", rsp.inst_msg.inst_id)
+        logger.debug("  - time:[{}]", rsp.time)
+        logger.debug("  - units:[{}]", rsp.units)
+        logger.debug("  - price:[{}]", rsp.price)
+        logger.debug("  - realized_pl:[{}]", rsp.realized_pl)
+        logger.debug("  - half_spread_cost:[{}]", rsp.half_spread_cost)
         logger.debug("[Performance]")
-        logger.debug("  - Response time:[{}]".format(dbg_tm_end - dbg_tm_start))
-        logger.debug("{:=^50}".format(" Service[trade_close]:End "))
+        logger.debug("  - Response time:[{}]", dbg_tm_end - dbg_tm_start)
+        logger.debug("{:=^50}", " Service[trade_close]:End ")
 
         return rsp
 
@@ -470,11 +613,12 @@ class OrderService(Node):
                                req: SrvTypeRequest,
                                rsp: SrvTypeResponse
                                ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
         logger = self.logger
 
-        logger.debug("{:=^50}".format(" Service[order_details]:Start "))
+        logger.debug("{:=^50}", " Service[order_details]:Start ")
         logger.debug("<Request>")
-        logger.debug("  - order_id:[{}]".format(req.order_id))
+        logger.debug("  - order_id:[{}]", req.order_id)
         dbg_tm_start = dt.datetime.now()
 
         ep = OrderDetails(accountID=self._ACCOUNT_NUMBER,
@@ -482,25 +626,25 @@ class OrderService(Node):
         rsp.result = False
         apirsp = None
         try:
-            apirsp = self._api.request(ep)
+            apirsp = self._request_api(ep, rsp)
         except V20Error as err:
-            self.logger.error("{:!^50}".format(" V20Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " V20Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
         except ConnectionError as err:
-            self.logger.error("{:!^50}".format(" Connection Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Connection Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except ReadTimeout as err:
-            self.logger.error("{:!^50}".format(" ReadTimeout  Error"))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " ReadTimeout  Error")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except Exception as err:
-            self.logger.error("{:!^50}".format(" Others Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Others Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OTHERS
         else:
-            self.logger.debug("{}".format(json.dumps(apirsp, indent=2)))
+            self.logger.debug_json(apirsp)
 
             rsp.frc_msg.reason_code = frc.REASON_UNSET
             if "order" in apirsp.keys():
@@ -525,19 +669,19 @@ class OrderService(Node):
 
         dbg_tm_end = dt.datetime.now()
         logger.debug("<Response>")
-        logger.debug("  - result:[{}]".format(rsp.result))
-        logger.debug("  - frc_msg.reason_code:[{}]".format(rsp.frc_msg.reason_code))
-        logger.debug("  - ordertype_msg.type:[{}]".format(rsp.ordertype_msg.type))
-        logger.debug("  - inst_msg.inst_id:[{}]".format(rsp.inst_msg.inst_id))
-        logger.debug("  - units:[{}]".format(rsp.units))
-        logger.debug("  - price:[{}]".format(rsp.price))
-        logger.debug("  - order_state_msg.state:[{}]".format(rsp.order_state_msg.state))
-        logger.debug("  - open_trade_id:[{}]".format(rsp.open_trade_id))
-        logger.debug("  - take_profit_on_fill_price:[{}]".format(rsp.take_profit_on_fill_price))
-        logger.debug("  - stop_loss_on_fill_price:[{}]".format(rsp.stop_loss_on_fill_price))
+        logger.debug("  - result:[{}]", rsp.result)
+        logger.debug("  - frc_msg.reason_code:[{}]", rsp.frc_msg.reason_code)
+        logger.debug("  - ordertype_msg.type:[{}]", rsp.ordertype_msg.type)
+        logger.debug("  - inst_msg.inst_id:[{}]", rsp.inst_msg.inst_id)
+        logger.debug("  - units:[{}]", rsp.units)
+        logger.debug("  - price:[{}]", rsp.price)
+        logger.debug("  - order_state_msg.state:[{}]", rsp.order_state_msg.state)
+        logger.debug("  - open_trade_id:[{}]", rsp.open_trade_id)
+        logger.debug("  - take_profit_on_fill_price:[{}]", rsp.take_profit_on_fill_price)
+        logger.debug("  - stop_loss_on_fill_price:[{}]", rsp.stop_loss_on_fill_price)
         logger.debug("[Performance]")
-        logger.debug("  - Response time:[{}]".format(dbg_tm_end - dbg_tm_start))
-        logger.debug("{:=^50}".format(" Service[order_details]:End "))
+        logger.debug("  - Response time:[{}]", dbg_tm_end - dbg_tm_start)
+        logger.debug("{:=^50}", " Service[order_details]:End ")
 
         return rsp
 
@@ -545,11 +689,12 @@ class OrderService(Node):
                               req: SrvTypeRequest,
                               rsp: SrvTypeResponse
                               ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
         logger = self.logger
 
-        logger.debug("{:=^50}".format(" Service[order_cancel]:Start "))
+        logger.debug("{:=^50}", " Service[order_cancel]:Start ")
         logger.debug("<Request>")
-        logger.debug("  - order_id:[{}]".format(req.order_id))
+        logger.debug("  - order_id:[{}]", req.order_id)
         dbg_tm_start = dt.datetime.now()
 
         ep = OrderCancel(accountID=self._ACCOUNT_NUMBER,
@@ -557,7 +702,7 @@ class OrderService(Node):
         rsp.result = False
         apirsp = None
         try:
-            apirsp = self._api.request(ep)
+            apirsp = self._request_api(ep, rsp)
         except V20Error as err:
             rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
             try:
@@ -566,29 +711,29 @@ class OrderService(Node):
                 pass
             else:
                 if isinstance(rspdic, dict):
-                    self.logger.debug("{}".format(json.dumps(rspdic, indent=2)))
+                    self.logger.debug_json(rspdic)
                     if "orderCancelRejectTransaction" in rspdic.keys():
                         rjc = rspdic["orderCancelRejectTransaction"]
                         if "rejectReason" in rjc.keys():
                             if rjc["rejectReason"] == "ORDER_DOESNT_EXIST":
                                 rsp.frc_msg.reason_code = frc.REASON_ORDER_DOESNT_EXIST
             if not rsp.frc_msg.reason_code == frc.REASON_ORDER_DOESNT_EXIST:
-                self.logger.error("{:!^50}".format(" V20Error "))
-                self.logger.error("{}".format(err))
+                self.logger.error("{:!^50}", " V20Error ")
+                self.logger.error("{}", err)
         except ConnectionError as err:
-            self.logger.error("{:!^50}".format(" Connection Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Connection Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except ReadTimeout as err:
-            self.logger.error("{:!^50}".format(" ReadTimeout  Error"))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " ReadTimeout  Error")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
         except Exception as err:
-            self.logger.error("{:!^50}".format(" Others Error "))
-            self.logger.error("{}".format(err))
+            self.logger.error("{:!^50}", " Others Error ")
+            self.logger.error("{}", err)
             rsp.frc_msg.reason_code = frc.REASON_OTHERS
         else:
-            self.logger.debug("{}".format(json.dumps(apirsp, indent=2)))
+            self.logger.debug_json(apirsp)
 
             rsp.frc_msg.reason_code = frc.REASON_UNSET
             if "orderCancelTransaction" in apirsp.keys():
@@ -598,79 +743,122 @@ class OrderService(Node):
 
         dbg_tm_end = dt.datetime.now()
         logger.debug("<Response>")
-        logger.debug("  - result:[{}]".format(rsp.result))
-        logger.debug("  - frc_msg.reason_code:[{}]".format(rsp.frc_msg.reason_code))
+        logger.debug("  - result:[{}]", rsp.result)
+        logger.debug("  - frc_msg.reason_code:[{}]", rsp.frc_msg.reason_code)
         logger.debug("[Performance]")
-        logger.debug("  - Response time:[{}]".format(dbg_tm_end - dbg_tm_start))
-        logger.debug("{:=^50}".format(" Service[order_cancel]:End "))
+        logger.debug("  - Response time:[{}]", dbg_tm_end - dbg_tm_start)
+        logger.debug("{:=^50}", " Service[order_cancel]:End ")
 
         return rsp
 
-    def _generate_order_create_data(self,
-                                    req: SrvTypeRequest,
-                                    ) -> JsonFmt:
-        data = {
-            "order": {
-                "type": _ORDER_TYP_DICT[req.ordertype_msg.type],
-            }
-        }
+    def _on_recv_order_trade_list(self,
+                                  req: SrvTypeRequest,
+                                  rsp: SrvTypeResponse
+                                  ) -> SrvTypeResponse:
+        logger = self.logger
 
-        data_order = data["order"]
+        logger.debug("{:=^50}", " Service[order_trade_list]:Start ")
+        dbg_tm_start = dt.datetime.now()
 
-        inst_param = InstParam.get_member_by_msgid(req.inst_msg.inst_id)
-        min_unit = inst_param.lsb_str
+        rsp.result = False
+        apirsp_ord = None
+        apirsp_trd = None
+        try:
+            ep = OrdersPending(accountID=self._ACCOUNT_NUMBER)
+            apirsp_ord = self._api.request(ep)
+            ep = OpenTrades(accountID=self._ACCOUNT_NUMBER)
+            apirsp_trd = self._api.request(ep)
+        except V20Error as err:
+            self.logger.error("{:!^50}", " V20Error ")
+            self.logger.error("{}", err)
+            rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
+        except ConnectionError as err:
+            self.logger.error("{:!^50}", " Connection Error ")
+            self.logger.error("{}", err)
+            rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
+        except ReadTimeout as err:
+            self.logger.error("{:!^50}", " ReadTimeout  Error")
+            self.logger.error("{}", err)
+            rsp.frc_msg.reason_code = frc.REASON_CONNECTION_ERROR
+        except Exception as err:
+            self.logger.error("{:!^50}", " Others Error ")
+            self.logger.error("{}", err)
+            rsp.frc_msg.reason_code = frc.REASON_OTHERS
+        else:
+            self.logger.debug_json(apirsp_ord)
+            self.logger.debug_json(apirsp_trd)
 
-        if ((req.ordertype_msg.type == OrderType.TYP_LIMIT)
-                or (req.ordertype_msg.type == OrderType.TYP_STOP)):
+            rsp.frc_msg.reason_code = frc.REASON_UNSET
+            if (("orders" in apirsp_ord.keys())
+                    and ("trades" in apirsp_trd.keys())):
+                rsp.pending_order_id_list = [int(data_ord["id"])
+                                             for data_ord in apirsp_ord["orders"]
+                                             if data_ord["type"] in _ORDER_TYP_NAME_DICT]
+                rsp.open_trade_id_list = [int(data_trd["id"])
+                                          for data_trd in apirsp_trd["trades"]]
+                rsp.result = True
+            else:
+                rsp.frc_msg.reason_code = frc.REASON_OTHERS
 
-            tmp = {
-                "price": self._fit_unit(req.price, min_unit),
-                "timeInForce": "GTC",
-            }
-            data_order.update(tmp)
-
-        tmp = {
-            "instrument": inst_param.name,
-            "units": req.units,
-            "positionFill": "DEFAULT",
-            "takeProfitOnFill": {
-                "timeInForce": "GTC",
-                "price": self._fit_unit(req.take_profit_price, min_unit)
-            },
-            "stopLossOnFill": {
-                "timeInForce": "GTC",
-                "price": self._fit_unit(req.stop_loss_price, min_unit)
-            },
-        }
-        data_order.update(tmp)
+        dbg_tm_end = dt.datetime.now()
+        logger.debug("<Response>")
+        logger.debug("  - result:[{}]", rsp.result)
+        logger.debug("  - frc_msg.reason_code:[{}]", rsp.frc_msg.reason_code)
+        logger.debug("  - pending_order_id_list:[{}]", rsp.pending_order_id_list)
+        logger.debug("  - open_trade_id_list:[{}]", rsp.open_trade_id_list)
+        logger.debug("[Performance]")
+        logger.debug("  - Response time:[{}]", dbg_tm_end - dbg_tm_start)
+        logger.debug("{:=^50}", " Service[order_trade_list]:End ")
 
-        return data
+        return rsp
+
+    def _stamp_receive(self,
+                       req: SrvTypeRequest,
+                       rsp: SrvTypeResponse
+                       ) -> None:
+        rsp.trace_msg.trace_id = req.trace_msg.trace_id
+        rsp.trace_msg.request_ns = req.trace_msg.request_ns
+        rsp.trace_msg.receive_ns = time.time_ns()
+
+    def _request_api(self,
+                     ep: EndPoint,
+                     rsp: SrvTypeResponse
+                     ) -> ApiRsp:
+        api = getattr(self._thread_local, "api", self._api)
+        rsp.trace_msg.api_start_ns = time.time_ns()
+        try:
+            return api.request(ep)
+        finally:
+            rsp.trace_msg.api_end_ns = time.time_ns()
+
+    def _init_worker_api(self) -> None:
+        self._thread_local.api = API(**self._api_kwargs)
+
+    def _generate_order_create_data(self,
+                                    req: SrvTypeRequest,
+                                    ) -> JsonFmt:
+        template = _ORDER_CREATE_TEMPLATE_DICT[(req.inst_msg.inst_id,
+                                                req.ordertype_msg.type)]
+        return template.generate(req)
 
     def _generate_trade_crcdo_data(self,
                                    req: SrvTypeRequest,
                                    ) -> JsonFmt:
-
-        inst_param = InstParam.get_member_by_msgid(req.inst_msg.inst_id)
-        min_unit = inst_param.lsb_str
+        digit = _INST_DIGIT_DICT[req.inst_msg.inst_id]
 
         data = {
             "takeProfit": {
-                "price": self._fit_unit(req.take_profit_price, min_unit),
+                "price": utl.fit_price(req.take_profit_price, digit),
                 "timeInForce": "GTC",
             },
             "stopLoss": {
-                "price": self._fit_unit(req.stop_loss_price, min_unit),
+                "price": utl.fit_price(req.stop_loss_price, digit),
                 "timeInForce": "GTC",
             },
         }
 
         return data
 
-    def _fit_unit(self, value: float, min_unit: str):
-        tmp = Decimal(str(value)).quantize(Decimal(min_unit),
-                                           rounding=ROUND_HALF_UP)
-        return str(tmp)
-
 
 def main(args=None):
 
@@ -0,0 +1,522 @@
+from typing import TypeVar, Optional
+from dataclasses import dataclass
+from enum import Enum, auto
+import time
+import rclpy
+from rclpy.node import Node
+from rclpy.qos import QoSProfile, QoSHistoryPolicy, QoSReliabilityPolicy
+from api_msgs.srv import (OrderCreateSrv, TradeDetailsSrv,
+                          TradeCRCDOSrv, TradeCloseSrv,
+                          OrderDetailsSrv, OrderCancelSrv,
+                          OrderTradeListSrv, OrderCreateBulkSrv)
+from api_msgs.msg import Pricing
+from api_msgs.msg import OrderCreateResult
+from api_msgs.msg import OrderType, OrderState, TradeState
+from api_msgs.msg import Instrument as Inst
+from api_msgs.msg import FailReasonCode as frc
+from oanda_api.utility import RosParam
+from oanda_api.lazy_logger import LazyLogger, get_severity
+from oanda_api.constant import InstParam
+from oanda_api.price_triggers import PriceTriggers, TriggerSide
+
+SrvTypeRequest = TypeVar("SrvTypeRequest")
+SrvTypeResponse = TypeVar("SrvTypeResponse")
+MsgType = TypeVar("MsgType")
+
+_PRICING_TOPIC_DICT = {
+    Inst.INST_USD_JPY: "pricing_usdjpy",
+    Inst.INST_EUR_JPY: "pricing_eurjpy",
+    Inst.INST_EUR_USD: "pricing_eurusd",
+}
+
+
+class _Kind(Enum):
+    """
+    Kind of a trigger.
+    """
+    ENTRY = auto()
+    TAKE_PROFIT = auto()
+    STOP_LOSS = auto()
+
+
+@dataclass
+class _RosParams():
+    """
+    ROS Parameter.
+    """
+    TICK_FILE = RosParam("tick_file")
+    TICK_PERIOD = RosParam("tick_period")
+    LOG_LEVEL = RosParam("log_level")
+
+
+@dataclass
+class _Order():
+    """
+    Pending or finished entry order.
+    """
+    order_id: int
+    inst_id: int
+    type_: int
+    units: int
+    price: float
+    take_profit_price: float
+    stop_loss_price: float
+    state: int = OrderState.STS_PENDING
+    trade_id: int = 0
+
+
+@dataclass
+class _Trade():
+    """
+    Open or closed trade.
+    """
+    trade_id: int
+    inst_id: int
+    units: int
+    price: float
+    open_time: str
+    take_profit_price: float
+    stop_loss_price: float
+    state: int = TradeState.STS_OPEN
+    take_profit_state: int = OrderState.STS_PENDING
+    stop_loss_state: int = OrderState.STS_PENDING
+    close_price: float = 0.0
+    close_time: str = ""
+    realized_pl: float = 0.0
+    half_spread_cost: float = 0.0
+
+
+class PaperBroker(Node):
+    """
+    Paper trading broker.
+
+    Serves the same order and trade services as "OrderService" without
+    OANDA. Orders are filled against the latest price of each instrument,
+    taken from the pricing topics or replayed from a recorded tick file.
+    Order and trade IDs are issued sequentially and fills are only
+    evaluated on ticks, so the same ticks and requests always give the
+    same results. P/L is calculated in the quote currency.
+    """
+
+    def __init__(self) -> None:
+        super().__init__("paper_broker")
+
+        # Set logger lebel
+        self.logger = LazyLogger(super().get_logger())
+
+        # Declare ROS parameter
+        self._rosprm = _RosParams()
+        self.declare_parameter(self._rosprm.TICK_FILE.name, "")
+        self.declare_parameter(self._rosprm.TICK_PERIOD.name, 0.001)
+        self.declare_parameter(self._rosprm.LOG_LEVEL.name, "INFO")
+
+        # Set ROS parameter
+        para = self.get_parameter(self._rosprm.TICK_FILE.name)
+        self._rosprm.TICK_FILE.value = para.value
+        para = self.get_parameter(self._rosprm.TICK_PERIOD.name)
+        self._rosprm.TICK_PERIOD.value = para.value
+        para = self.get_parameter(self._rosprm.LOG_LEVEL.name)
+        self._rosprm.LOG_LEVEL.value = para.value
+
+        self.logger.set_level(get_severity(self._rosprm.LOG_LEVEL.value))
+
+        self.logger.debug("[Param]Tick file:[{}]", self._rosprm.TICK_FILE.value)
+        self.logger.debug("[Param]Tick period:[{}]", self._rosprm.TICK_PERIOD.value)
+        self.logger.debug("[Param]Log Level:[{}]", self._rosprm.LOG_LEVEL.value)
+
+        self._next_id = 1
+        self._orders = {}
+        self._trades = {}
+        self._prices = {}
+        self._triggers = {}
+        for inst_param in InstParam:
+            self._triggers[inst_param.msg_id] = {
+                TriggerSide.ASK_AT_OR_BELOW: PriceTriggers(is_upward=False),
+                TriggerSide.ASK_AT_OR_ABOVE: PriceTriggers(is_upward=True),
+                TriggerSide.BID_AT_OR_BELOW: PriceTriggers(is_upward=False),
+                TriggerSide.BID_AT_OR_ABOVE: PriceTriggers(is_upward=True),
+            }
+
+        if self._rosprm.TICK_FILE.value:
+            # Replay recorded ticks.
+            # The format of each line is "time,instrument,bid,ask",
+            # e.g. "2021-01-04T07:00:00.123456,USD_JPY,103.100,103.104"
+            self._tick_file = open(self._rosprm.TICK_FILE.value, "r")
+            self._tick_timer = self.create_timer(self._rosprm.TICK_PERIOD.value,
+                                                 self._on_timer_tick_file)
+        else:
+            qos_profile = QoSProfile(history=QoSHistoryPolicy.KEEP_ALL,
+                                     reliability=QoSReliabilityPolicy.RELIABLE)
+            self._sub_pri = []
+            for inst_id, topic in _PRICING_TOPIC_DICT.items():
+                callback = self._create_pricing_callback(inst_id)
+                sub = self.create_subscription(Pricing,
+                                               topic,
+                                               callback,
+                                               qos_profile)
+                self._sub_pri.append(sub)
+
+        # Create service server "OrderCreate"
+        srv_type = OrderCreateSrv
+        srv_name = "order_create"
+        callback = self._on_recv_order_create
+        self.order_create_srv = self.create_service(srv_type,
+                                                    srv_name,
+                                                    callback)
+        # Create service server "OrderCreateBulk"
+        srv_type = OrderCreateBulkSrv
+        srv_name = "order_create_bulk"
+        callback = self._on_recv_order_create_bulk
+        self.order_create_bulk_srv = self.create_service(srv_type,
+                                                         srv_name,
+                                                         callback)
+        # Create service server "TradeDetails"
+        srv_type = TradeDetailsSrv
+        srv_name = "trade_details"
+        callback = self._on_recv_trade_details
+        self.trade_details_srv = self.create_service(srv_type,
+                                                     srv_name,
+                                                     callback)
+        # Create service server "TradeCRCDO"
+        srv_type = TradeCRCDOSrv
+        srv_name = "trade_crcdo"
+        callback = self._on_recv_trade_crcdo
+        self.trade_crcdo_srv = self.create_service(srv_type,
+                                                   srv_name,
+                                                   callback)
+        # Create service server "TradeClose"
+        srv_type = TradeCloseSrv
+        srv_name = "trade_close"
+        callback = self._on_recv_trade_close
+        self.trade_close_srv = self.create_service(srv_type,
+                                                   srv_name,
+                                                   callback)
+        # Create service server "OrderDetails"
+        srv_type = OrderDetailsSrv
+        srv_name = "order_details"
+        callback = self._on_recv_order_details
+        self.order_details_srv = self.create_service(srv_type,
+                                                     srv_name,
+                                                     callback)
+        # Create service server "OrderCancel"
+        srv_type = OrderCancelSrv
+        srv_name = "order_cancel"
+        callback = self._on_recv_order_cancel
+        self.order_cancel_srv = self.create_service(srv_type,
+                                                    srv_name,
+                                                    callback)
+        # Create service server "OrderTradeList"
+        srv_type = OrderTradeListSrv
+        srv_name = "order_trade_list"
+        callback = self._on_recv_order_trade_list
+        self.order_trade_list_srv = self.create_service(srv_type,
+                                                        srv_name,
+                                                        callback)
+
+    def destroy_node(self) -> None:
+        if self._rosprm.TICK_FILE.value:
+            self._tick_file.close()
+        super().destroy_node()
+
+    def _create_pricing_callback(self, inst_id: int):
+
+        def callback(msg: MsgType) -> None:
+            if not msg.tradeable:
+                return
+            bid = msg.bids[0].price if msg.bids else msg.closeout_bid
+            ask = msg.asks[0].price if msg.asks else msg.closeout_ask
+            self.update_price(inst_id, bid, ask, msg.time)
+
+        return callback
+
+    def _on_timer_tick_file(self) -> None:
+        line = self._tick_file.readline()
+        if not line:
+            self.logger.info("Tick file replay completed.")
+            self._tick_timer.cancel()
+            return
+        tick_time, inst_name, bid, ask = line.strip().split(",")
+        inst_param = InstParam.get_member_by_name(inst_name)
+        if inst_param is not None:
+            self.update_price(inst_param.msg_id, float(bid), float(ask), tick_time)
+
+    def update_price(self, inst_id: int, bid: float, ask: float, tick_time: str) -> None:
+        self._prices[inst_id] = (bid, ask, tick_time)
+        triggers = self._triggers[inst_id]
+
+        fired = []
+        fired += triggers[TriggerSide.ASK_AT_OR_BELOW].pop_crossed(ask)
+        fired += triggers[TriggerSide.ASK_AT_OR_ABOVE].pop_crossed(ask)
+        fired += triggers[TriggerSide.BID_AT_OR_BELOW].pop_crossed(bid)
+        fired += triggers[TriggerSide.BID_AT_OR_ABOVE].pop_crossed(bid)
+
+        for kind, id_ in fired:
+            if kind == _Kind.ENTRY:
+                order = self._orders[id_]
+                if order.state == OrderState.STS_PENDING:
+                    self._fill_order(order)
+            else:
+                trade = self._trades[id_]
+                if trade.state == TradeState.STS_OPEN:
+                    self._close_trade(trade, kind)
+
+    def _issue_id(self) -> int:
+        id_ = self._next_id
+        self._next_id += 1
+        return id_
+
+    def _get_entry_side(self, type_: int, units: int) -> TriggerSide:
+        if type_ == OrderType.TYP_LIMIT:
+            return TriggerSide.ASK_AT_OR_BELOW if 0 < units else TriggerSide.BID_AT_OR_ABOVE
+        return TriggerSide.ASK_AT_OR_ABOVE if 0 < units else TriggerSide.BID_AT_OR_BELOW
+
+    def _get_exit_side(self, kind: _Kind, units: int) -> TriggerSide:
+        if kind == _Kind.TAKE_PROFIT:
+            return TriggerSide.BID_AT_OR_ABOVE if 0 < units else TriggerSide.ASK_AT_OR_BELOW
+        return TriggerSide.BID_AT_OR_BELOW if 0 < units else TriggerSide.ASK_AT_OR_ABOVE
+
+    def _get_market_price(self, inst_id: int, units: int) -> float:
+        bid, ask, _ = self._prices[inst_id]
+        return ask if 0 < units else bid
+
+    def _set_exit_triggers(self, trade: _Trade, is_add: bool) -> None:
+        triggers = self._triggers[trade.inst_id]
+        for kind, price in ((_Kind.TAKE_PROFIT, trade.take_profit_price),
+                            (_Kind.STOP_LOSS, trade.stop_loss_price)):
+            if 0 < price:
+                side = self._get_exit_side(kind, trade.units)
+                if is_add:
+                    triggers[side].add(price, (kind, trade.trade_id))
+                else:
+                    triggers[side].remove(price, (kind, trade.trade_id))
+
+    def _open_trade(self, inst_id: int, units: int,
+                    take_profit_price: float, stop_loss_price: float
+                    ) -> _Trade:
+        trade = _Trade(trade_id=self._issue_id(),
+                       inst_id=inst_id,
+                       units=units,
+                       price=self._get_market_price(inst_id, units),
+                       open_time=self._prices[inst_id][2],
+                       take_profit_price=take_profit_price,
+                       stop_loss_price=stop_loss_price)
+        self._trades[trade.trade_id] = trade
+        self._set_exit_triggers(trade, is_add=True)
+        self.logger.debug("Trade opened:[{}]", trade)
+        return trade
+
+    def _fill_order(self, order: _Order) -> None:
+        trade = self._open_trade(order.inst_id, order.units,
+                                 order.take_profit_price, order.stop_loss_price)
+        order.state = OrderState.STS_FILLED
+        order.trade_id = trade.trade_id
+
+    def _close_trade(self, trade: _Trade, kind: Optional[_Kind]) -> None:
+        self._set_exit_triggers(trade, is_add=False)
+        bid, ask, close_time = self._prices[trade.inst_id]
+        trade.close_price = self._get_market_price(trade.inst_id, -trade.units)
+        trade.close_time = close_time
+        trade.realized_pl = (trade.close_price - trade.price) * trade.units
+        trade.half_spread_cost = (ask - bid) / 2 * abs(trade.units)
+        trade.state = TradeState.STS_CLOSED
+        trade.take_profit_state = OrderState.STS_CANCELLED
+        trade.stop_loss_state = OrderState.STS_CANCELLED
+        if kind == _Kind.TAKE_PROFIT:
+            trade.take_profit_state = OrderState.STS_FILLED
+        elif kind == _Kind.STOP_LOSS:
+            trade.stop_loss_state = OrderState.STS_FILLED
+        self.logger.debug("Trade closed:[{}]", trade)
+
+    def _stamp_receive(self,
+                       req: SrvTypeRequest,
+                       rsp: SrvTypeResponse
+                       ) -> None:
+        # The simulated broker is stamped in place of the OANDA API call.
+        now = time.time_ns()
+        rsp.trace_msg.trace_id = req.trace_msg.trace_id
+        rsp.trace_msg.request_ns = req.trace_msg.request_ns
+        rsp.trace_msg.receive_ns = now
+        rsp.trace_msg.api_start_ns = now
+
+    def _on_recv_order_create(self,
+                              req: SrvTypeRequest,
+                              rsp: SrvTypeResponse
+                              ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
+        rsp.result = False
+        inst_id = req.inst_msg.inst_id
+        type_ = req.ordertype_msg.type
+
+        if (inst_id not in self._triggers) or (req.units == 0):
+            rsp.frc_msg.reason_code = frc.REASON_ARG_ERR
+        elif type_ == OrderType.TYP_MARKET:
+            if inst_id in self._prices:
+                trade = self._open_trade(inst_id, req.units,
+                                         req.take_profit_price, req.stop_loss_price)
+                rsp.id = trade.trade_id
+                rsp.result = True
+            else:
+                rsp.frc_msg.reason_code = frc.REASON_MARKET_HALTED
+        elif type_ in (OrderType.TYP_LIMIT, OrderType.TYP_STOP):
+            order = _Order(order_id=self._issue_id(),
+                           inst_id=inst_id,
+                           type_=type_,
+                           units=req.units,
+                           price=req.price,
+                           take_profit_price=req.take_profit_price,
+                           stop_loss_price=req.stop_loss_price)
+            self._orders[order.order_id] = order
+            side = self._get_entry_side(type_, order.units)
+            self._triggers[inst_id][side].add(order.price, (_Kind.ENTRY, order.order_id))
+            rsp.id = order.order_id
+            rsp.result = True
+        else:
+            rsp.frc_msg.reason_code = frc.REASON_ARG_ERR
+
+        rsp.trace_msg.api_end_ns = time.time_ns()
+        return rsp
+
+    def _on_recv_order_create_bulk(self,
+                                   req: SrvTypeRequest,
+                                   rsp: SrvTypeResponse
+                                   ) -> SrvTypeResponse:
+        for order_msg in req.order_msg_list:
+            rsp.result_msg_list.append(self._on_recv_order_create(order_msg,
+                                                                  OrderCreateResult()))
+        rsp.result = all(result_msg.result for result_msg in rsp.result_msg_list)
+        return rsp
+
+    def _on_recv_order_details(self,
+                               req: SrvTypeRequest,
+                               rsp: SrvTypeResponse
+                               ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
+        rsp.result = False
+        order = self._orders.get(req.order_id)
+        if order is None:
+            rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
+        else:
+            rsp.ordertype_msg.type = order.type_
+            rsp.inst_msg.inst_id = order.inst_id
+            rsp.units = order.units
+            rsp.price = order.price
+            rsp.order_state_msg.state = order.state
+            rsp.take_profit_on_fill_price = order.take_profit_price
+            rsp.stop_loss_on_fill_price = order.stop_loss_price
+            if order.state == OrderState.STS_FILLED:
+                rsp.open_trade_id = order.trade_id
+            rsp.result = True
+        rsp.trace_msg.api_end_ns = time.time_ns()
+        return rsp
+
+    def _on_recv_order_cancel(self,
+                              req: SrvTypeRequest,
+                              rsp: SrvTypeResponse
+                              ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
+        rsp.result = False
+        order = self._orders.get(req.order_id)
+        if (order is None) or (order.state != OrderState.STS_PENDING):
+            rsp.frc_msg.reason_code = frc.REASON_ORDER_DOESNT_EXIST
+        else:
+            side = self._get_entry_side(order.type_, order.units)
+            self._triggers[order.inst_id][side].remove(order.price,
+                                                       (_Kind.ENTRY, order.order_id))
+            order.state = OrderState.STS_CANCELLED
+            rsp.result = True
+        rsp.trace_msg.api_end_ns = time.time_ns()
+        return rsp
+
+    def _on_recv_trade_details(self,
+                               req: SrvTypeRequest,
+                               rsp: SrvTypeResponse
+                               ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
+        rsp.result = False
+        trade = self._trades.get(req.trade_id)
+        if trade is None:
+            rsp.frc_msg.reason_code = frc.REASON_OANDA_V20_ERROR
+        else:
+            rsp.inst_msg.inst_id = trade.inst_id
+            rsp.contract_price = trade.price
+            rsp.trade_state_msg.state = trade.state
+            rsp.open_time = trade.open_time
+            rsp.profit_order_msg.price = trade.take_profit_price
+            rsp.profit_order_msg.order_state_msg.state = trade.take_profit_state
+            rsp.loss_order_msg.price = trade.stop_loss_price
+            rsp.loss_order_msg.order_state_msg.state = trade.stop_loss_state
+            if trade.state == TradeState.STS_OPEN:
+                rsp.current_units = trade.units
+                price = self._get_market_price(trade.inst_id, -trade.units)
+                rsp.unrealized_pl = (price - trade.price) * trade.units
+            else:
+                rsp.realized_pl = trade.realized_pl
+            rsp.result = True
+        rsp.trace_msg.api_end_ns = time.time_ns()
+        return rsp
+
+    def _on_recv_trade_crcdo(self,
+                             req: SrvTypeRequest,
+                             rsp: SrvTypeResponse
+                             ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
+        rsp.result = False
+        trade = self._trades.get(req.trade_id)
+        if (trade is None) or (trade.state != TradeState.STS_OPEN):
+            rsp.frc_msg.reason_code = frc.REASON_TRADE_DOESNT_EXIST
+        else:
+            self._set_exit_triggers(trade, is_add=False)
+            trade.take_profit_price = req.take_profit_price
+            trade.stop_loss_price = req.stop_loss_price
+            self._set_exit_triggers(trade, is_add=True)
+            rsp.take_profit_price = trade.take_profit_price
+            rsp.stop_loss_price = trade.stop_loss_price
+            rsp.result = True
+        rsp.trace_msg.api_end_ns = time.time_ns()
+        return rsp
+
+    def _on_recv_trade_close(self,
+                             req: SrvTypeRequest,
+                             rsp: SrvTypeResponse
+                             ) -> SrvTypeResponse:
+        self._stamp_receive(req, rsp)
+        rsp.result = False
+        trade = self._trades.get(req.trade_id)
+        if (trade is None) or (trade.state != TradeState.STS_OPEN):
+            rsp.frc_msg.reason_code = frc.REASON_TRADE_DOESNT_EXIST
+        else:
+            self._close_trade(trade, None)
+            rsp.inst_msg.inst_id = trade.inst_id
+            rsp.time = trade.close_time
+            rsp.units = -trade.units
+            rsp.price = trade.close_price
+            rsp.realized_pl = trade.realized_pl
+            rsp.half_spread_cost = trade.half_spread_cost
+            rsp.result = True
+        rsp.trace_msg.api_end_ns = time.time_ns()
+        return rsp
+
+    def _on_recv_order_trade_list(self,
+                                  req: SrvTypeRequest,
+                                  rsp: SrvTypeResponse
+                                  ) -> SrvTypeResponse:
+        rsp.pending_order_id_list = [order.order_id for order in self._orders.values()
+                                     if order.state == OrderState.STS_PENDING]
+        rsp.open_trade_id_list = [trade.trade_id for trade in self._trades.values()
+                                  if trade.state == TradeState.STS_OPEN]
+        rsp.result = True
+        return rsp
+
+
+def main(args=None):
+
+    rclpy.init(args=args)
+    broker = PaperBroker()
+
+    try:
+        rclpy.spin(broker)
+    except KeyboardInterrupt:
+        pass
+
+    broker.destroy_node()
+    rclpy.shutdown()
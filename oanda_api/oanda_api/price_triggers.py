@@ -0,0 +1,84 @@
+from typing import Any, List
+from enum import Enum, auto
+from bisect import bisect_left, bisect_right
+
+
+class TriggerSide(Enum):
+    """
+    Price side and crossing direction of a trigger.
+    """
+    ASK_AT_OR_BELOW = auto()
+    ASK_AT_OR_ABOVE = auto()
+    BID_AT_OR_BELOW = auto()
+    BID_AT_OR_ABOVE = auto()
+
+    @property
+    def is_ask(self) -> bool:
+        return self in (TriggerSide.ASK_AT_OR_BELOW, TriggerSide.ASK_AT_OR_ABOVE)
+
+    @property
+    def is_upward(self) -> bool:
+        return self in (TriggerSide.ASK_AT_OR_ABOVE, TriggerSide.BID_AT_OR_ABOVE)
+
+
+class PriceTriggers():
+    """
+    Trigger levels kept sorted in parallel arrays of levels and items, so
+    that a tick is checked in O(log n).
+
+    If "is_upward" is True, a trigger fires when the price rises to or
+    above its level, otherwise when the price falls to or below its level.
+    Triggers with the same level fire in registration order.
+
+    Shared by the paper broker of "oanda_api" and the local triggers of
+    "trade_manager".
+    """
+
+    def __init__(self, is_upward: bool) -> None:
+        self._is_upward = is_upward
+        self._levels = []
+        self._items = []
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def add(self, level: float, item: Any) -> None:
+        idx = bisect_right(self._levels, level)
+        self._levels.insert(idx, level)
+        self._items.insert(idx, item)
+
+    def remove(self, level: float, item: Any) -> bool:
+        """
+        Remove the trigger of "item" (compared by "==") at "level".
+        Return False if there is no such trigger.
+        """
+        idx = bisect_left(self._levels, level)
+        end = bisect_right(self._levels, level)
+        for i in range(idx, end):
+            if self._items[i] == item:
+                del self._levels[i]
+                del self._items[i]
+                return True
+        return False
+
+    def pop_crossed(self, price: float) -> List[Any]:
+        """
+        Remove and return the items of the triggers crossed by "price",
+        in the order the levels are crossed.
+        """
+        if self._is_upward:
+            end = bisect_right(self._levels, price)
+            if end == 0:
+                return []
+            items = self._items[:end]
+            del self._levels[:end]
+            del self._items[:end]
+        else:
+            idx = bisect_left(self._levels, price)
+            if idx == len(self._levels):
+                return []
+            items = self._items[idx:]
+            del self._levels[idx:]
+            del self._items[idx:]
+            items.reverse()
+        return items
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import math
 import datetime as dt
 from typing import Dict
 from oanda_api.constant import FMT_YMDHMSF
@@ -46,3 +47,45 @@ def roundi(val: float) -> int:
 def roundf(val: float, digit: int=0) -> float:
     p = 10 ** digit
     return (val * p * 2 + 1) // 2 / p
+
+
+def to_pips(val: float, digit: int) -> int:
+    """
+    Round "val" half up (away from zero) to "digit" decimal places, and return
+    it as an integer count of the least significant digit.
+    The result is the same as rounding the decimal string "str(val)" with
+    "decimal.ROUND_HALF_UP".
+    """
+    x = val * (10 ** digit)
+    if -1e9 < x < 1e9:
+        # Float error of "x" is far below 1e-6 here, so only near-ties
+        # need the exact decimal path.
+        n = math.floor(x)
+        frac = x - n
+        if 1e-6 < abs(frac - 0.5):
+            return n + 1 if 0.5 < frac else n
+
+    mantissa, _, exponent = repr(val).partition("e")
+    int_part, _, frac_part = mantissa.partition(".")
+    digits = int(int_part + frac_part)
+    shift = digit - len(frac_part) + (int(exponent) if exponent else 0)
+    if 0 <= shift:
+        return digits * 10 ** shift
+    q, r = divmod(abs(digits), 10 ** -shift)
+    if 10 ** -shift <= 2 * r:
+        q += 1
+    return -q if digits < 0 else q
+
+
+def fit_price(val: float, digit: int) -> str:
+    """
+    Price string of "val" rounded half up to "digit" decimal places.
+    Same as "str(Decimal(str(val)).quantize(lsb, rounding=ROUND_HALF_UP))".
+    """
+    pips = to_pips(val, digit)
+    sign = "-" if math.copysign(1.0, val) < 0 else ""
+    text = str(abs(pips))
+    if digit == 0:
+        return sign + text
+    text = text.rjust(digit + 1, "0")
+    return sign + text[:-digit] + "." + text[-digit:]
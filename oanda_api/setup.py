@@ -24,6 +24,8 @@ setup(
             "pricing_stream_exe = " + package_name + ".pricing_stream:main",
             "order_service_exe = " + package_name + ".order_service:main",
             "candlestick_service_exe = " + package_name + ".candlestick_service:main",
+            "paper_broker_exe = " + package_name + ".paper_broker:main",
+            "account_service_exe = " + package_name + ".account_service:main",
         ],
     },
 )
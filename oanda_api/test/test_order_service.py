@@ -0,0 +1,59 @@
+import pytest
+from oanda_api.order_service import _set_order_create_result
+from api_msgs.srv import OrderCreateSrv
+from api_msgs.msg import FailReasonCode as frc
+
+
+def _create_result(apirsp):
+    rsp = OrderCreateSrv.Response()
+    rsp.result = False
+    _set_order_create_result(apirsp, rsp)
+    return rsp
+
+
+def test_fill_opening_trade():
+    rsp = _create_result({
+        "orderFillTransaction": {
+            "tradeOpened": {"tradeID": "101", "units": "1000"},
+        },
+    })
+    assert rsp.result
+    assert rsp.id == 101
+    assert rsp.frc_msg.reason_code == frc.REASON_UNSET
+
+
+@pytest.mark.parametrize("data_oft", [
+    {"tradeReduced": {"tradeID": "77", "units": "-500"}},
+    {"tradesClosed": [{"tradeID": "78", "units": "-1000"}]},
+    {"tradesClosed": [{"tradeID": "78", "units": "-1000"}],
+     "tradeReduced": {"tradeID": "79", "units": "-500"}},
+])
+def test_fill_reducing_or_closing_trade(data_oft):
+    # The trades belong to other orders, so they are not given to the ticket.
+    rsp = _create_result({"orderFillTransaction": data_oft})
+    assert not rsp.result
+    assert rsp.id == 0
+    assert rsp.frc_msg.reason_code == frc.REASON_OTHERS
+
+
+def test_fill_flipping_position():
+    rsp = _create_result({
+        "orderFillTransaction": {
+            "tradesClosed": [{"tradeID": "78", "units": "-1000"}],
+            "tradeOpened": {"tradeID": "102", "units": "-500"},
+        },
+    })
+    assert rsp.result
+    assert rsp.id == 102
+
+
+def test_pending_order_created():
+    rsp = _create_result({"orderCreateTransaction": {"id": "200"}})
+    assert rsp.result
+    assert rsp.id == 200
+
+
+def test_order_canceled():
+    rsp = _create_result({"orderCancelTransaction": {"reason": "MARKET_HALTED"}})
+    assert not rsp.result
+    assert rsp.frc_msg.reason_code == frc.REASON_MARKET_HALTED
@@ -0,0 +1,98 @@
+"""
+Benchmark of the "Candle" message conversion of "CandlesData._update_dataframe".
+
+Measures the conversion of [count] candle messages, as in an initial load,
+and checks that both give the same completed and provisional candles.
+  - Before: a Python loop with "strptime" and mid prices per row, then a
+            DataFrame built from a list of lists.
+  - After:  "candles_from_msgs", which pulls the fields into NumPy arrays in
+            one pass, parses the times in bulk and computes mid prices as
+            array operations.
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_candles_convert.py [count]
+"""
+import sys
+import time
+import datetime as dt
+import numpy as np
+import pandas as pd
+from trade_manager.candle_buffer import CandleRingBuffer, candles_from_msgs
+from trade_manager.constant import CandleColumnNames as ColName
+from trade_manager.constant import FMT_YMDHMS
+from api_msgs.msg import Candle
+
+
+def _create_msgs(count):
+    rng = np.random.default_rng(0)
+    start = dt.datetime(2021, 1, 4, 7, 0)
+    msgs = []
+    for i in range(count):
+        bid = 110.0 + float(rng.random())
+        msg = Candle()
+        msg.bid_o = bid
+        msg.bid_h = bid + 0.02
+        msg.bid_l = bid - 0.02
+        msg.bid_c = bid + 0.01
+        msg.ask_o = msg.bid_o + 0.004
+        msg.ask_h = msg.bid_h + 0.004
+        msg.ask_l = msg.bid_l + 0.004
+        msg.ask_c = msg.bid_c + 0.004
+        msg.time = (start + dt.timedelta(minutes=i)).strftime(FMT_YMDHMS)
+        msg.is_complete = i < count - 1
+        msgs.append(msg)
+    return msgs
+
+
+def _convert_before(cndl_msg_list):
+    data = []
+    for cndl_msg in cndl_msg_list:
+        dt_ = dt.datetime.strptime(cndl_msg.time, FMT_YMDHMS)
+        hsc_o = (cndl_msg.ask_o - cndl_msg.bid_o) / 2
+        hsc_h = (cndl_msg.ask_h - cndl_msg.bid_h) / 2
+        hsc_l = (cndl_msg.ask_l - cndl_msg.bid_l) / 2
+        hsc_c = (cndl_msg.ask_c - cndl_msg.bid_c) / 2
+        data.append([dt_,
+                     cndl_msg.ask_o,
+                     cndl_msg.ask_h,
+                     cndl_msg.ask_l,
+                     cndl_msg.ask_c,
+                     cndl_msg.bid_o,
+                     cndl_msg.bid_h,
+                     cndl_msg.bid_l,
+                     cndl_msg.bid_c,
+                     cndl_msg.bid_o + hsc_o,
+                     cndl_msg.bid_h + hsc_h,
+                     cndl_msg.bid_l + hsc_l,
+                     cndl_msg.bid_c + hsc_c,
+                     cndl_msg.is_complete
+                     ])
+    df = pd.DataFrame(data, columns=ColName.to_list())
+    df.set_index([ColName.DATETIME.value], inplace=True)
+    return df
+
+
+def main():
+    count = int(sys.argv[1]) if 1 < len(sys.argv) else 50000
+
+    msgs = _create_msgs(count)
+
+    start = time.perf_counter()
+    df = _convert_before(msgs)
+    elapsed_before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    times, prices, is_complete = candles_from_msgs(msgs)
+    elapsed_after = time.perf_counter() - start
+
+    assert np.array_equal(df.index.values.astype("datetime64[ns]"), times)
+    assert np.array_equal(df[CandleRingBuffer.PRICE_COLUMNS].to_numpy().T, prices)
+    assert np.array_equal(df[ColName.COMP.value].to_numpy(), is_complete)
+
+    for label, elapsed in (("Before", elapsed_before), ("After", elapsed_after)):
+        print("{:<7}: {:>10.1f} msec/{} candles, {:>8.2f} usec/candle"
+              .format(label, elapsed * 1e3, count, elapsed / count * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark of the response building of the "candles_data" service.
+
+Measures the "Response time" part spent on building the response of a
+[count] rows query, and checks that every format carries the same candles.
+  - Before:   "Candle" messages built by "DataFrame.iterrows", with a
+              "strftime" per row.
+  - After:    "Candle" messages built from the column arrays in one pass,
+              with the times formatted in bulk.
+  - Columnar: the columnar format ("is_columnar"), parallel arrays of
+              epoch times and prices.
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_candles_data.py [count]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from trade_manager.historical_candles import _to_candle_msgs, _to_columnar_candles
+from trade_manager.historical_candles import _COLUMNAR_FIELD_DICT
+from trade_manager.candle_buffer import CandleRingBuffer
+from trade_manager.constant import CandleColumnNames as ColName
+from trade_manager.constant import FMT_YMDHMS
+from trade_manager_msgs.srv import CandlesDataSrv
+from trade_manager_msgs.msg import Candle
+
+
+def _build_before(df_comp):
+    cndl_msg_list = []
+    for idx, sr in df_comp.iterrows():
+        msg = Candle()
+        msg.ask_o = sr[ColName.ASK_OP.value]
+        msg.ask_h = sr[ColName.ASK_HI.value]
+        msg.ask_l = sr[ColName.ASK_LO.value]
+        msg.ask_c = sr[ColName.ASK_CL.value]
+        msg.mid_o = sr[ColName.MID_OP.value]
+        msg.mid_h = sr[ColName.MID_HI.value]
+        msg.mid_l = sr[ColName.MID_LO.value]
+        msg.mid_c = sr[ColName.MID_CL.value]
+        msg.bid_o = sr[ColName.BID_OP.value]
+        msg.bid_h = sr[ColName.BID_HI.value]
+        msg.bid_l = sr[ColName.BID_LO.value]
+        msg.bid_c = sr[ColName.BID_CL.value]
+        msg.time = idx.strftime(FMT_YMDHMS)
+        cndl_msg_list.append(msg)
+    return cndl_msg_list
+
+
+def _build_after(buf):
+    return _to_candle_msgs(buf.times, buf.prices)
+
+
+def _build_columnar(buf):
+    rsp = CandlesDataSrv.Response()
+    for field, values in _to_columnar_candles(buf.times, buf.prices).items():
+        setattr(rsp, field, values)
+    return rsp
+
+
+def _measure(label, build, data):
+    start = time.perf_counter()
+    result = build(data)
+    elapsed = time.perf_counter() - start
+    print("{:<9}: {:>10.1f} msec/{} rows, {:>8.2f} usec/row"
+          .format(label, elapsed * 1e3, len(data), elapsed / len(data) * 1e6))
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+
+    index = pd.date_range("2021-01-04T07:00", periods=count, freq="min",
+                          name=ColName.DATETIME.value)
+    buf = CandleRingBuffer(count)
+    buf.append(index.values,
+               110.0 + np.random.default_rng(0).random((len(buf.PRICE_COLUMNS), count)))
+    df_comp = buf.to_dataframe()
+
+    msgs_before = _measure("Before", _build_before, df_comp)
+    msgs_after = _measure("After", _build_after, buf)
+    rsp = _measure("Columnar", _build_columnar, buf)
+
+    fields = [f[:-len("_list")] for f in _COLUMNAR_FIELD_DICT.values()] + ["time"]
+    for before, after in zip(msgs_before, msgs_after):
+        assert all(getattr(before, f) == getattr(after, f) for f in fields)
+    assert len(msgs_before) == len(msgs_after) == len(rsp.time_list)
+
+    epoch = index.values.astype("datetime64[s]").astype(np.int64)
+    assert np.array_equal(np.asarray(rsp.time_list), epoch)
+    for col, field in _COLUMNAR_FIELD_DICT.items():
+        assert np.array_equal(np.asarray(getattr(rsp, field), dtype=np.float32),
+                              df_comp[col].to_numpy(dtype=np.float32))
+
+
+if __name__ == "__main__":
+    main()
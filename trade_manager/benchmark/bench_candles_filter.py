@@ -0,0 +1,78 @@
+"""
+Benchmark of the candle filtering of the "candles_data" service.
+
+Measures the filtering of a [window] rows M1 series by a date range,
+a weekday set and a time window, and checks that both select the same rows.
+  - Before: "DataFrame.loc", a list comprehension over "index.dayofweek"
+            and "DataFrame.between_time".
+  - After:  "CandleRingBuffer.select", "searchsorted" on the times and masks
+            on the precomputed weekday and minute-of-day columns.
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_candles_filter.py [window] [count]
+"""
+import sys
+import time
+import datetime as dt
+import numpy as np
+import pandas as pd
+from trade_manager.candle_buffer import CandleRingBuffer
+from trade_manager.constant import CandleColumnNames as ColName
+from trade_manager.constant import WeekDay
+
+_QUERIES = [
+    # (dayofweeks, time_from, time_to)
+    ([], None, None),
+    ([WeekDay.MON, WeekDay.WED, WeekDay.FRI], None, None),
+    ([], dt.time(9, 0), dt.time(10, 30)),
+    ([WeekDay.TUE, WeekDay.THU], dt.time(21, 0), dt.time(3, 0)),
+]
+
+
+def _select_before(df_comp, start_dt, end_dt, dayofweeks, start_time, end_time):
+    df_comp = df_comp.loc[start_dt:]
+    df_comp = df_comp.loc[:end_dt]
+    if dayofweeks:
+        cond = [i in dayofweeks for i in df_comp.index.dayofweek]
+        df_comp = df_comp[cond]
+    if (start_time is not None) and (end_time is not None):
+        df_comp = df_comp.between_time(start_time, end_time)
+    return df_comp
+
+
+def main():
+    window = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    count = int(sys.argv[2]) if 2 < len(sys.argv) else 20
+
+    index = pd.date_range("2021-01-04T07:00", periods=window, freq="min",
+                          name=ColName.DATETIME.value)
+    buf = CandleRingBuffer(window)
+    buf.append(index.values,
+               110.0 + np.random.default_rng(0).random((len(buf.PRICE_COLUMNS), window)))
+    df_comp = buf.to_dataframe()
+    start_dt = index[window // 10].to_pydatetime()
+    end_dt = index[-window // 10].to_pydatetime()
+
+    for query in _QUERIES:
+        args = (start_dt, end_dt) + tuple(query)
+        df = _select_before(df_comp, *args)
+        times, prices = buf.select(*args)
+        assert np.array_equal(df.index.values, times)
+        assert np.array_equal(df.to_numpy().T, prices)
+
+        elapsed = {}
+        for label, select in (("Before", lambda: _select_before(df_comp, *args)),
+                              ("After", lambda: buf.select(*args))):
+            start = time.perf_counter()
+            for _ in range(count):
+                select()
+            elapsed[label] = (time.perf_counter() - start) / count
+
+        print("dayofweeks:{} time:[{} - {}] -> {} rows"
+              .format([int(d) for d in query[0]], query[1], query[2], len(times)))
+        for label, sec in elapsed.items():
+            print("  {:<7}: {:>10.2f} msec/query".format(label, sec * 1e3))
+
+
+if __name__ == "__main__":
+    main()
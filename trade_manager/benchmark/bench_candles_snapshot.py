@@ -0,0 +1,81 @@
+"""
+Benchmark of the startup load of a "CandlesData" M1 series.
+
+Measures the local work of loading a [window] rows series after
+[downtime] minutes of downtime, and reports the candles to fetch.
+The network round trips are not included; each "candles" request
+fetches up to 4999 candles.
+  - Before: all [window] candles fetched and converted from messages.
+  - After:  the snapshot loaded ("CandleRingBuffer.load"), and only the
+            [downtime] newer candles fetched and converted.
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_candles_snapshot.py [window] [downtime]
+"""
+import sys
+import time
+import math
+import tempfile
+import numpy as np
+from trade_manager.candle_buffer import CandleRingBuffer, candles_from_msgs
+from trade_manager.constant import FMT_YMDHMS
+from api_msgs.msg import Candle
+
+_CANDLES_PER_REQUEST = 4999
+
+
+def _create_msgs(times):
+    rng = np.random.default_rng(0)
+    msgs = []
+    for time_ in times.astype("datetime64[s]").tolist():
+        bid = 110.0 + float(rng.random())
+        msg = Candle()
+        msg.bid_o = msg.bid_h = msg.bid_l = msg.bid_c = bid
+        msg.ask_o = msg.ask_h = msg.ask_l = msg.ask_c = bid + 0.004
+        msg.time = time_.strftime(FMT_YMDHMS)
+        msg.is_complete = True
+        msgs.append(msg)
+    return msgs
+
+
+def _load(buf, msgs):
+    times, prices, is_complete = candles_from_msgs(msgs)
+    buf.append(times[is_complete], prices[:, is_complete])
+
+
+def main():
+    window = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    downtime = int(sys.argv[2]) if 2 < len(sys.argv) else 60
+
+    times = (np.datetime64("2021-01-04T07:00", "ns")
+             + np.arange(window + downtime) * np.timedelta64(1, "m"))
+    msgs = _create_msgs(times)
+
+    with tempfile.TemporaryDirectory() as dirpath:
+        buf = CandleRingBuffer(window)
+        _load(buf, msgs[:window])
+        buf.save(dirpath)
+
+        start = time.perf_counter()
+        before = CandleRingBuffer(window)
+        _load(before, msgs[downtime:])
+        elapsed_before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        after = CandleRingBuffer(window)
+        after.load(dirpath)
+        _load(after, msgs[window:])
+        elapsed_after = time.perf_counter() - start
+
+    assert np.array_equal(before.times, after.times)
+    assert np.array_equal(before.prices, after.prices)
+
+    for label, elapsed, count in (("Before", elapsed_before, window),
+                                  ("After", elapsed_after, downtime)):
+        print("{:<7}: {:>10.1f} msec, {:>7} candles to fetch ({} requests)"
+              .format(label, elapsed * 1e3, count,
+                      math.ceil(count / _CANDLES_PER_REQUEST)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of the completed-candle storage update of "CandlesData".
+
+Measures the latency of one M1 update (one new completed candle) with a
+window of [window] rows.
+  - Before: the window DataFrame grown by "DataFrame.append" (emulated by
+            "pd.concat", which it called) and trimmed by "drop".
+  - After:  "CandleRingBuffer.append".
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_candles_update.py [window] [count]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from trade_manager.candle_buffer import CandleRingBuffer
+from trade_manager.constant import CandleColumnNames as ColName
+
+_COLUMNS = CandleRingBuffer.PRICE_COLUMNS
+
+
+def _create_frame(start, length):
+    index = pd.date_range(start, periods=length, freq="min",
+                          name=ColName.DATETIME.value)
+    values = 110.0 + np.random.default_rng(0).random((length, len(_COLUMNS)))
+    return pd.DataFrame(values, index=index, columns=_COLUMNS)
+
+
+def _update_before(state, df_comp):
+    df = pd.concat([state[0], df_comp])
+    droplist = df.index[range(0, len(df_comp))]
+    df.drop(index=droplist, inplace=True)
+    state[0] = df
+
+
+def _update_after(buf, df_comp):
+    prices = df_comp[_COLUMNS].to_numpy(dtype=np.float64)
+    buf.append(df_comp.index.values, prices.T)
+
+
+def _measure(label, update, state, updates):
+    start = time.perf_counter()
+    for df_comp in updates:
+        update(state, df_comp)
+    elapsed = time.perf_counter() - start
+    print("{:<7}: {:>10.1f} usec/update, {:>8.0f} updates/sec"
+          .format(label, elapsed / len(updates) * 1e6, len(updates) / elapsed))
+
+
+def main():
+    window = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    count = int(sys.argv[2]) if 2 < len(sys.argv) else 1000
+
+    df_init = _create_frame("2021-01-04T07:00", window)
+    df_new = _create_frame(df_init.index[-1] + pd.Timedelta(minutes=1), count)
+    updates = [df_new[i:i + 1] for i in range(count)]
+
+    state = [df_init.copy()]
+    _measure("Before", _update_before, state, updates)
+
+    buf = CandleRingBuffer(window)
+    buf.append(df_init.index.values, df_init.to_numpy().T)
+    _measure("After", _update_after, buf, updates)
+
+    assert state[0].index.equals(buf.to_dataframe().index)
+    assert np.array_equal(state[0].to_numpy(), buf.to_dataframe().to_numpy())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark of the indicator update per newly completed candle.
+
+Measures the update of SMA, EMA, ATR, Bollinger Bands and RSI for [bars]
+new candles over a series of [count] candles, and checks that both give
+the same latest values.
+  - Before: the indicators recomputed over the whole series on every new
+            candle, with "rolling" and "ewm" of pandas.
+  - After:  "IndicatorEngine.append", which updates the rolling state of
+            each indicator with the new candle only.
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_indicators.py [count] [bars]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from trade_manager.candle_buffer import CandleRingBuffer
+from trade_manager.indicator import IndicatorEngine, IndicatorSpec
+from trade_manager.constant import CandleColumnNames as ColName
+
+_SPEC_TEXTS = ["sma:20", "ema:12", "atr:14", "bollinger:20:2.0", "rsi:14"]
+
+
+def _compute_before(df_comp):
+    close = df_comp[ColName.MID_CL.value]
+    high = df_comp[ColName.MID_HI.value]
+    low = df_comp[ColName.MID_LO.value]
+
+    sma = close.rolling(20).mean()
+    ema = close.ewm(span=12, adjust=False, min_periods=12).mean()
+
+    prev_close = close.shift()
+    true_range = pd.concat([high - low,
+                            (high - prev_close).abs(),
+                            (low - prev_close).abs()], axis=1).max(axis=1)
+    atr = true_range.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+
+    middle = close.rolling(20).mean()
+    width = 2.0 * close.rolling(20).std(ddof=0)
+
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    rsi = 100 - 100 / (1 + gain / loss)
+
+    return [sma.iloc[-1], ema.iloc[-1], atr.iloc[-1],
+            middle.iloc[-1], middle.iloc[-1] + width.iloc[-1], middle.iloc[-1] - width.iloc[-1],
+            rsi.iloc[-1]]
+
+
+def main():
+    count = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+    bars = int(sys.argv[2]) if 2 < len(sys.argv) else 100
+
+    rng = np.random.default_rng(0)
+    total = count + bars
+    index = pd.date_range("2021-01-04T07:00", periods=total, freq="min",
+                          name=ColName.DATETIME.value)
+    close = 110.0 + np.cumsum(rng.normal(0.0, 0.01, total))
+    prices = np.empty((len(CandleRingBuffer.PRICE_COLUMNS), total))
+    prices[:] = close
+    for col, sign in ((ColName.ASK_HI, 1), (ColName.BID_HI, 1), (ColName.MID_HI, 1),
+                      (ColName.ASK_LO, -1), (ColName.BID_LO, -1), (ColName.MID_LO, -1)):
+        idx = CandleRingBuffer.PRICE_COLUMNS.index(col.value)
+        prices[idx] += sign * rng.random(total) * 0.02
+
+    buf = CandleRingBuffer(total)
+    buf.append(index.values[:count], prices[:, :count])
+    engine = IndicatorEngine(total)
+    engine.append(index.values[:count], prices[:, :count])
+    specs = [IndicatorSpec.parse(text) for text in _SPEC_TEXTS]
+    for spec in specs:
+        engine.register(spec, buf.prices)
+
+    elapsed_before = 0.0
+    elapsed_after = 0.0
+    for i in range(count, total):
+        buf.append(index.values[i:i + 1], prices[:, i:i + 1])
+
+        start = time.perf_counter()
+        values_before = _compute_before(buf.to_dataframe())
+        elapsed_before += time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.append(index.values[i:i + 1], prices[:, i:i + 1])
+        values_after = [v for spec in specs for v in engine.values(spec)[:, -1]]
+        elapsed_after += time.perf_counter() - start
+
+        assert np.allclose(values_before, values_after, rtol=0.0, atol=1e-8)
+
+    for label, elapsed in (("Before", elapsed_before), ("After", elapsed_after)):
+        print("{:<7}: {:>10.1f} msec/{} bars, {:>10.2f} usec/bar ({} candles)"
+              .format(label, elapsed * 1e3, bars, elapsed / bars * 1e6, count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark of the market hours lookups of "trade_manager.utility".
+
+Measures [count] "is_market_close" calls at random times, and the market
+open mask of the same times, and checks that all give the same result.
+  - Before:   "is_summer_time" building a "pd.Timestamp" in New York time
+              and calling "dst" on every call, as the mask of a loop.
+  - After:    "MarketCalendar" lookups of the precomputed summer time of
+              each date.
+  - Vector:   "MarketCalendar.is_open_mask" over the whole array.
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_market_calendar.py [count]
+"""
+import sys
+import time
+import datetime as dt
+import numpy as np
+import pandas as pd
+from trade_manager.constant import WeekDay
+from trade_manager.market_calendar import get_market_calendar
+
+
+def _is_summer_time_before(dt_):
+    pddt = pd.Timestamp(dt_.isoformat() + " 03:00:00",
+                        tz="America/New_York")
+    if 3600 <= pddt.dst().seconds:
+        return True
+    else:
+        return False
+
+
+def _get_market_time_before(dt_):
+    if _is_summer_time_before(dt_):
+        return dt.time(6, 0)
+    else:
+        return dt.time(7, 0)
+
+
+def _is_market_close_before(dt_):
+    is_close = False
+    if dt_.weekday() == WeekDay.SAT.value:
+        close_time = _get_market_time_before(dt_.date())
+        if close_time <= dt_.time():
+            is_close = True
+    elif dt_.weekday() == WeekDay.SUN.value:
+        is_close = True
+    elif dt_.weekday() == WeekDay.MON.value:
+        open_time = _get_market_time_before(dt_.date())
+        if dt_.time() < open_time:
+            is_close = True
+    else:
+        is_close = False
+    return is_close
+
+
+def _measure(label, func, count):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print("{:<7}: {:>10.1f} msec/{} times, {:>8.3f} usec/time"
+          .format(label, elapsed * 1e3, count, elapsed / count * 1e6))
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if 1 < len(sys.argv) else 100000
+
+    rng = np.random.default_rng(0)
+    seconds = rng.integers(0, 10 * 365 * 24 * 60 * 60, count)
+    times = np.datetime64("2015-01-01", "ns") + seconds.astype("timedelta64[s]")
+    dt_list = times.astype("datetime64[us]").tolist()
+
+    calendar = get_market_calendar()
+
+    def before():
+        return np.array([not _is_market_close_before(dt_) for dt_ in dt_list])
+
+    def after():
+        return np.array([not calendar.is_market_close(dt_) for dt_ in dt_list])
+
+    def vector():
+        return calendar.is_open_mask(times)
+
+    mask_before = _measure("Before", before, count)
+    mask_after = _measure("After", after, count)
+    mask_vector = _measure("Vector", vector, count)
+
+    assert np.array_equal(mask_before, mask_after)
+    assert np.array_equal(mask_before, mask_vector)
+
+
+if __name__ == "__main__":
+    main()
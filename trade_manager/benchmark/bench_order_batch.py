@@ -0,0 +1,127 @@
+"""
+Benchmark of the submission of an "OrderRequest" burst.
+
+Measures orders submitted per second, i.e. until every ticket has got the
+response of its "Order Create", for a burst of orders. The broker round
+trip is simulated by a sleep of [latency_ms] per order.
+  - Before: one "order_create" call per ticket, served one by one by the
+            single-threaded "order_service".
+  - After:  "OrderCreateBatcher", which sends the burst in "order_create_bulk"
+            calls served by [workers] threads as "order_service" does.
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_order_batch.py [count] [latency_ms] [workers]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import rclpy
+from rclpy.task import Future
+from trade_manager.order_scheduler import OrderTicket
+from trade_manager.order_batcher import OrderCreateBatcher
+from oanda_api.lazy_logger import LazyLogger
+from trade_manager_msgs.msg import OrderRequest
+from api_msgs.srv import OrderCreateSrv, OrderCreateBulkSrv
+from api_msgs.msg import OrderCreateResult
+
+
+class _Client():
+
+    srv_name = "order_create"
+
+    def __init__(self, latency_sec):
+        self._latency_sec = latency_sec
+        self._next_id = 0
+
+    def call_async(self, req):
+        time.sleep(self._latency_sec)
+        self._next_id += 1
+        rsp = OrderCreateSrv.Response()
+        rsp.result = True
+        rsp.id = self._next_id
+        future = Future()
+        future.set_result(rsp)
+        return future
+
+
+class _BulkClient():
+
+    srv_name = "order_create_bulk"
+
+    def __init__(self, latency_sec, workers):
+        self._latency_sec = latency_sec
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._next_id = 0
+
+    def _create_order(self, order_msg):
+        time.sleep(self._latency_sec)
+        result_msg = OrderCreateResult()
+        result_msg.result = True
+        return result_msg
+
+    def call_async(self, req):
+        rsp = OrderCreateBulkSrv.Response()
+        rsp.result_msg_list = list(self._executor.map(self._create_order,
+                                                      req.order_msg_list))
+        for result_msg in rsp.result_msg_list:
+            self._next_id += 1
+            result_msg.id = self._next_id
+        rsp.result = True
+        future = Future()
+        future.set_result(rsp)
+        return future
+
+
+class _Scheduler():
+
+    def __init__(self):
+        self.done_count = 0
+
+    def wakeup(self, ticket):
+        self.done_count += 1
+
+
+def _measure(label, msg, count):
+    scheduler = OrderTicket.scheduler = _Scheduler()
+    start = time.perf_counter()
+    tickets = [OrderTicket(i, msg) for i in range(count)]
+    if OrderTicket.order_batcher is not None:
+        OrderTicket.order_batcher.flush()
+    elapsed = time.perf_counter() - start
+    assert scheduler.done_count == len(tickets)
+
+    print("{:<7}: {:>10.0f} orders/sec, {:>8.1f} msec/burst"
+          .format(label, count / elapsed, elapsed * 1e3))
+
+
+def main():
+    count = int(sys.argv[1]) if 1 < len(sys.argv) else 100
+    latency_sec = (float(sys.argv[2]) if 2 < len(sys.argv) else 20.0) / 1e3
+    workers = int(sys.argv[3]) if 3 < len(sys.argv) else 8
+
+    rclpy.init()
+    OrderTicket.logger = LazyLogger(rclpy.logging.get_logger("bench_order_batch"))
+
+    msg = OrderRequest()
+    msg.inst_msg.inst_id = msg.inst_msg.INST_USD_JPY
+    msg.order_type = OrderRequest.ORDER_TYP_LIMIT
+    msg.order_dir = OrderRequest.DIR_LONG
+    msg.units = 1000
+    msg.entry_price = 110.0
+    msg.take_profit_price = 111.0
+    msg.stop_loss_price = 109.0
+
+    OrderTicket.cli_ordcre = _Client(latency_sec)
+    OrderTicket.order_batcher = None
+    _measure("Before", msg, count)
+
+    OrderTicket.order_batcher = OrderCreateBatcher(_BulkClient(latency_sec, workers),
+                                                   window_sec=0.01,
+                                                   max_size=50)
+    _measure("After", msg, count)
+
+    rclpy.shutdown()
+
+
+if __name__ == "__main__":
+    main()
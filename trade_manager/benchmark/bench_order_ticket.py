@@ -0,0 +1,139 @@
+"""
+Benchmark of "OrderTicket" creation.
+
+Measures tickets created per second and memory per ticket. Both create
+the ticket fields and send the first "Order Create" request.
+  - Before: the former implementation, reproduced by a plain model which
+            builds the state/transition specs and a "transitions.Machine"
+            per ticket, and logs with "str.format" in advance.
+  - After:  "OrderTicket", which uses the shared, precompiled "StateMachine".
+
+Usage (in a sourced ROS 2 environment):
+    python3 benchmark/bench_order_ticket.py [count]
+"""
+import sys
+import time
+import datetime as dt
+import tracemalloc
+import rclpy
+from rclpy.task import Future
+from transitions import Machine
+from trade_manager.order_scheduler import OrderTicket
+from trade_manager.constant import INST_DICT, ORDER_TYP_DICT
+from oanda_api.lazy_logger import LazyLogger
+from trade_manager_msgs.msg import OrderRequest
+from api_msgs.srv import OrderCreateSrv
+
+
+class _Client():
+
+    srv_name = "order_create"
+
+    def call_async(self, req):
+        return Future()
+
+
+class _Scheduler():
+
+    def wakeup(self, ticket):
+        pass
+
+
+class _TicketBefore():
+    """
+    Creation path of the former "OrderTicket".
+    """
+
+    logger = None
+    cli_ordcre = None
+
+    def __init__(self, msg):
+        self._POL_INTERVAL = dt.timedelta(minutes=1)
+
+        # The specs were literals in "__init__", built on each call.
+        sm = OrderTicket._sm
+        states = [dict(spec) for spec in sm.spec_states]
+        transitions = [dict(spec) for spec in sm.spec_transitions]
+        self._sm = Machine(model=self,
+                           states=states,
+                           initial=OrderTicket.States.EntryOrdering,
+                           transitions=transitions)
+
+        self._msg = msg
+        self._future = None
+        self._trade_id = None
+        self._order_id = None
+        self._entry_exp_time = None
+        self._exit_exp_time = None
+        self._is_entry_exp_time_over = False
+        self._is_trans_lock_waiting = False
+        self._next_pol_time = None
+
+        self.logger.debug("----- init -----")
+        self.logger.debug("  - entry_exp_time:[{}]".format(self._entry_exp_time))
+        self.logger.debug("  - exit_exp_time:[{}]".format(self._exit_exp_time))
+
+        self.logger.debug("state:[{}]".format(self.state))
+        req = OrderCreateSrv.Request()
+        req.ordertype_msg.type = ORDER_TYP_DICT[self._msg.order_type]
+        req.price = self._msg.entry_price
+        req.units = self._msg.units
+        req.inst_msg.inst_id = INST_DICT[self._msg.inst_msg.inst_id]
+        req.take_profit_price = self._msg.take_profit_price
+        req.stop_loss_price = self._msg.stop_loss_price
+        self.logger.debug("----- Requesting \"Order Create\" -----")
+        self._future = self.cli_ordcre.call_async(req)
+
+
+def _create_ticket_after(msg):
+    return OrderTicket(0, msg)
+
+
+def _create_ticket_before(msg):
+    return _TicketBefore(msg)
+
+
+def _measure(label, create, msg, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        create(msg)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tickets = [create(msg) for _ in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del tickets
+
+    print("{:<7}: {:>10.0f} tickets/sec, {:>8.0f} bytes/ticket"
+          .format(label, count / elapsed, used / count))
+
+
+def main():
+    count = int(sys.argv[1]) if 1 < len(sys.argv) else 10000
+
+    rclpy.init()
+    OrderTicket.logger = LazyLogger(rclpy.logging.get_logger("bench_order_ticket"))
+    OrderTicket.scheduler = _Scheduler()
+    OrderTicket.cli_ordcre = _Client()
+    _TicketBefore.logger = rclpy.logging.get_logger("bench_order_ticket")
+    _TicketBefore.cli_ordcre = _Client()
+
+    msg = OrderRequest()
+    msg.inst_msg.inst_id = msg.inst_msg.INST_USD_JPY
+    msg.order_type = OrderRequest.ORDER_TYP_LIMIT
+    msg.order_dir = OrderRequest.DIR_LONG
+    msg.units = 1000
+    msg.entry_price = 110.0
+    msg.take_profit_price = 111.0
+    msg.stop_loss_price = 109.0
+
+    _measure("Before", _create_ticket_before, msg, count)
+    _measure("After", _create_ticket_after, msg, count)
+
+    rclpy.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ setup(
         'console_scripts': [
             'order_scheduler_exe = ' + package_name + '.order_scheduler:main',
             'historical_candles_exe = ' + package_name + '.historical_candles:main',
+            'profit_loss_exe = ' + package_name + '.profit_loss:main',
         ],
     },
 )
@@ -0,0 +1,151 @@
+import time
+import datetime as dt
+import pytest
+from rclpy.logging import get_logger
+from rclpy.task import Future
+from oanda_api.lazy_logger import LazyLogger
+from trade_manager.constant import FMT_YMDHMS
+from trade_manager.latency_trace import LatencyTracer
+from trade_manager.order_scheduler import OrderTicket
+from trade_manager.ticket_journal import TicketJournal
+from trade_manager_msgs.msg import OrderRequest
+from api_msgs.srv import OrderCreateSrv, OrderDetailsSrv
+from api_msgs.msg import OrderState
+
+
+class _Scheduler():
+
+    def __init__(self) -> None:
+        self.tickets = set()
+        self.woken = []
+
+    def wakeup(self, ticket: OrderTicket) -> None:
+        if ticket in self.tickets:
+            self.woken.append(ticket)
+
+
+class _Client():
+
+    def __init__(self, srv_name: str) -> None:
+        self.srv_name = srv_name
+        self.reqs = []
+
+    def call_async(self, req) -> Future:
+        future = Future()
+        self.reqs.append((req, future))
+        return future
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    # The polling time of a ticket is over as soon as it is set.
+    monkeypatch.setattr(OrderTicket, "_POL_INTERVAL", dt.timedelta(minutes=-2))
+    # Kept after the test, since tickets may be deleted later.
+    OrderTicket.logger = LazyLogger(get_logger("test_order_scheduler"))
+    monkeypatch.setattr(OrderTicket, "scheduler", _Scheduler())
+    monkeypatch.setattr(OrderTicket, "cli_ordcre", _Client("order_create"))
+    monkeypatch.setattr(OrderTicket, "cli_orddet", _Client("order_details"))
+    monkeypatch.setattr(OrderTicket, "cli_ordcnc", _Client("order_cancel"))
+    monkeypatch.setattr(OrderTicket, "order_batcher", None)
+    monkeypatch.setattr(OrderTicket, "journal", TicketJournal(str(tmp_path / "journal"), 1000))
+    monkeypatch.setattr(OrderTicket, "tracer", LatencyTracer("test_order_scheduler"))
+    OrderTicket._is_trans_lock = False
+    OrderTicket._trans_lock_waiters.clear()
+    yield OrderTicket.scheduler
+    OrderTicket.journal.close()
+    OrderTicket._is_trans_lock = False
+    OrderTicket._trans_lock_waiters.clear()
+
+
+def _create_waiting_ticket(scheduler: _Scheduler,
+                           ticket_id: int,
+                           entry_exp_time: str = ""
+                           ) -> OrderTicket:
+    # Limit order ticket in "EntryWaiting", whose order has been created.
+    msg = OrderRequest()
+    msg.inst_msg.inst_id = msg.inst_msg.INST_USD_JPY
+    msg.order_type = OrderRequest.ORDER_TYP_LIMIT
+    msg.order_dir = OrderRequest.DIR_LONG
+    msg.units = 1000
+    msg.entry_price = 110.0
+    msg.entry_exp_time = entry_exp_time
+    ticket = OrderTicket(ticket_id, msg)
+    scheduler.tickets.add(ticket)
+
+    _, future = OrderTicket.cli_ordcre.reqs[-1]
+    rsp = OrderCreateSrv.Response()
+    rsp.result = True
+    rsp.id = 100 + ticket_id
+    future.set_result(rsp)
+    ticket.do_timeout_event()
+    assert ticket.state == OrderTicket.States.EntryWaiting
+    return ticket
+
+
+def _respond_pending(ticket: OrderTicket) -> None:
+    # The ticket holding the lock requests "Order Details": still pending.
+    ticket.do_timeout_event()
+    req, future = OrderTicket.cli_orddet.reqs[-1]
+    assert req.order_id == ticket.order_id
+    rsp = OrderDetailsSrv.Response()
+    rsp.result = True
+    rsp.order_state_msg.state = OrderState.STS_PENDING
+    future.set_result(rsp)
+    ticket.do_timeout_event()
+    assert ticket.state == OrderTicket.States.EntryWaiting
+
+
+def test_release_trans_lock_wakes_all_waiters(scheduler):
+    holder = _create_waiting_ticket(scheduler, 0)
+    holder.do_timeout_event()
+    assert holder.state == OrderTicket.States.EntryChecking
+
+    exp_time = dt.datetime.now().replace(microsecond=0) + dt.timedelta(seconds=2)
+    expiring = _create_waiting_ticket(scheduler, 1, exp_time.strftime(FMT_YMDHMS))
+    second = _create_waiting_ticket(scheduler, 2)
+    third = _create_waiting_ticket(scheduler, 3)
+    waiters = [expiring, second, third]
+    for ticket in waiters:
+        ticket.do_timeout_event()
+        assert ticket.state == OrderTicket.States.EntryWaiting
+        # Not left idle even without "wakeup".
+        assert ticket.get_next_event_time() is not None
+
+    # The first waiter expires before the lock is released.
+    while dt.datetime.now() <= exp_time:
+        time.sleep(0.05)
+    scheduler.woken.clear()
+    _respond_pending(holder)
+    assert scheduler.woken[-len(waiters):] == waiters
+
+    for ticket in waiters:
+        ticket.do_timeout_event()
+    assert expiring.state == OrderTicket.States.EntryCanceling
+    assert len(OrderTicket.cli_ordcnc.reqs) == 1
+    assert second.state == OrderTicket.States.EntryChecking
+    assert third.state == OrderTicket.States.EntryWaiting
+
+    # The loser is woken again on the next release.
+    scheduler.woken.clear()
+    _respond_pending(second)
+    assert scheduler.woken[-1] is third
+    third.do_timeout_event()
+    assert third.state == OrderTicket.States.EntryChecking
+
+
+def test_release_trans_lock_skips_removed_waiter(scheduler):
+    holder = _create_waiting_ticket(scheduler, 0)
+    holder.do_timeout_event()
+    removed = _create_waiting_ticket(scheduler, 1)
+    waiting = _create_waiting_ticket(scheduler, 2)
+    for ticket in (removed, waiting):
+        ticket.do_timeout_event()
+        assert ticket.state == OrderTicket.States.EntryWaiting
+    scheduler.tickets.discard(removed)
+
+    scheduler.woken.clear()
+    _respond_pending(holder)
+    assert scheduler.woken[-1] is waiting
+    assert removed not in scheduler.woken
+    waiting.do_timeout_event()
+    assert waiting.state == OrderTicket.States.EntryChecking
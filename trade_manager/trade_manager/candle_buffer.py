@@ -0,0 +1,353 @@
+from typing import List, Optional, Sequence, Tuple, TypeVar
+import os
+import time
+import datetime as dt
+import numpy as np
+import pandas as pd
+from trade_manager.constant import CandleColumnNames as ColName
+
+MsgType = TypeVar("MsgType")
+
+# Define Constant value.
+_SECONDS_PER_MINUTE = 60
+_SECONDS_PER_DAY = 24 * 60 * 60
+# 1970-01-01 is Thursday. (Monday is 0)
+_EPOCH_WEEKDAY = 3
+_SNAPSHOT_CURRENT_FILE = "current"
+_SNAPSHOT_ARRAY_FILE = "{}.{}.npy"
+
+
+def candles_from_msgs(cndl_msg_list: List[MsgType]
+                      ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert "api_msgs/Candle" messages into arrays in one pass.
+    Return (times, prices, is_complete), where "prices" is shaped
+    (len(CandleRingBuffer.PRICE_COLUMNS), len(cndl_msg_list)).
+    """
+    fields = [(m.ask_o, m.ask_h, m.ask_l, m.ask_c,
+               m.bid_o, m.bid_h, m.bid_l, m.bid_c,
+               m.time, m.is_complete) for m in cndl_msg_list]
+    count = len(fields)
+    if count == 0:
+        return (np.empty(0, dtype="datetime64[ns]"),
+                np.empty((len(CandleRingBuffer.PRICE_COLUMNS), 0)),
+                np.empty(0, dtype=bool))
+
+    cols = list(zip(*fields))
+    ask_bid = np.array(cols[:8], dtype=np.float64)
+    # The time format is fixed ("%Y-%m-%dT%H:%M:%S"), so NumPy parses it.
+    times = np.array(cols[8], dtype="datetime64[s]").astype("datetime64[ns]")
+    is_complete = np.array(cols[9], dtype=bool)
+
+    prices = np.empty((len(CandleRingBuffer.PRICE_COLUMNS), count), dtype=np.float64)
+    prices[:8] = ask_bid
+    ask = ask_bid[:4]
+    bid = ask_bid[4:]
+    half_spread = (ask - bid) / 2
+    prices[8:] = bid + half_spread
+
+    return times, prices, is_complete
+
+
+def _seconds_of_day(time: dt.time) -> int:
+    return time.hour * 3600 + time.minute * 60 + time.second
+
+
+class CandleRingBuffer():
+    """
+    Fixed-capacity, column-oriented ring buffer of completed candles.
+
+    Each row is written twice, at "i" and "i + capacity", so the stored rows
+    are always one contiguous slice: appending costs O(new rows), and the
+    arrays and DataFrame given to consumers are views without copy.
+    Views are read-only and valid until the next append.
+
+    The weekday and the minute of day of each row are computed once on
+    append and kept alongside, so "select" filters by small integer arrays.
+    Candle start times are on whole minutes.
+    """
+
+    PRICE_COLUMNS = [m.value for m in ColName
+                     if m not in (ColName.DATETIME, ColName.COMP)]
+
+    def __init__(self, capacity: int, buffer: Optional[memoryview] = None) -> None:
+        """
+        The arrays are allocated, or placed in "buffer" (of "nbytes(capacity)"
+        bytes at least) as "array_layout".
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive: [{}]".format(capacity))
+        self._capacity = capacity
+        if buffer is None:
+            buffer = bytearray(self.nbytes(capacity))
+        (self._times,
+         self._prices,
+         self._minutes,
+         self._weekdays) = self.create_arrays(capacity, buffer)
+        self._head = 0
+        self._length = 0
+        self._version = 0
+
+    @classmethod
+    def array_layout(cls, capacity: int) -> List[Tuple[str, tuple]]:
+        """
+        (dtype, shape) of the times, prices, minutes of day and weekdays
+        arrays, placed in this order without padding.
+        """
+        return [
+            ("datetime64[ns]", (2 * capacity,)),
+            (np.float64, (len(cls.PRICE_COLUMNS), 2 * capacity)),
+            (np.int16, (2 * capacity,)),
+            (np.int8, (2 * capacity,)),
+        ]
+
+    @classmethod
+    def nbytes(cls, capacity: int) -> int:
+        return sum([np.dtype(dtype).itemsize * int(np.prod(shape))
+                    for dtype, shape in cls.array_layout(capacity)])
+
+    @classmethod
+    def create_arrays(cls, capacity: int, buffer: memoryview) -> List[np.ndarray]:
+        arrays = []
+        offset = 0
+        for dtype, shape in cls.array_layout(capacity):
+            array = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            offset += array.nbytes
+            arrays.append(array)
+        return arrays
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def version(self) -> int:
+        """
+        Number of appends which changed the stored rows.
+        """
+        return self._version
+
+    @property
+    def latest_time(self) -> Optional[np.datetime64]:
+        if self._length == 0:
+            return None
+        return self._times[self._head + self._length - 1]
+
+    @property
+    def times(self) -> np.ndarray:
+        """
+        Start times of the candles, oldest first. ("datetime64[ns]")
+        """
+        return self._view(self._times[self._head:self._head + self._length])
+
+    @property
+    def prices(self) -> np.ndarray:
+        """
+        Prices shaped (len(PRICE_COLUMNS), len(self)).
+        """
+        return self._view(self._prices[:, self._head:self._head + self._length])
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        """
+        Weekdays of the start times. (Monday is 0, as "WeekDay")
+        """
+        return self._view(self._weekdays[self._head:self._head + self._length])
+
+    @property
+    def minutes_of_day(self) -> np.ndarray:
+        """
+        Minutes from 00:00 of the start times.
+        """
+        return self._view(self._minutes[self._head:self._head + self._length])
+
+    def column(self, name: str) -> np.ndarray:
+        idx = self.PRICE_COLUMNS.index(name)
+        return self._view(self._prices[idx, self._head:self._head + self._length])
+
+    def to_dataframe(self) -> pd.DataFrame:
+        index = pd.DatetimeIndex(self.times, name=ColName.DATETIME.value)
+        return pd.DataFrame(self.prices.T,
+                            index=index,
+                            columns=self.PRICE_COLUMNS,
+                            copy=False)
+
+    def select(self,
+               start: Optional[dt.datetime] = None,
+               end: Optional[dt.datetime] = None,
+               dayofweeks: Optional[Sequence[int]] = None,
+               time_from: Optional[dt.time] = None,
+               time_to: Optional[dt.time] = None,
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (times, prices) of the rows in the date range [start, end],
+        on one of "dayofweeks" and in the time window [time_from, time_to].
+        Empty or None conditions are not applied. The time window wraps
+        around midnight if "time_from" is later than "time_to",
+        as "DataFrame.between_time".
+        """
+        times = self.times
+        first = 0
+        last = len(times)
+        if start is not None:
+            first = np.searchsorted(times, np.datetime64(start, "ns"), side="left")
+        if end is not None:
+            last = np.searchsorted(times, np.datetime64(end, "ns"), side="right")
+        last = max(first, last)
+        rows = slice(self._head + first, self._head + last)
+
+        mask = None
+        if dayofweeks:
+            mask = np.isin(self._weekdays[rows], dayofweeks)
+
+        if (time_from is not None) or (time_to is not None):
+            sec_from = 0 if time_from is None else _seconds_of_day(time_from)
+            sec_to = _SECONDS_PER_DAY - 1 if time_to is None else _seconds_of_day(time_to)
+            # The first and the last minute of day in the window.
+            min_from = -(-sec_from // _SECONDS_PER_MINUTE)
+            min_to = sec_to // _SECONDS_PER_MINUTE
+            minutes = self._minutes[rows]
+            if sec_from <= sec_to:
+                in_window = (min_from <= minutes) & (minutes <= min_to)
+            else:
+                in_window = (min_from <= minutes) | (minutes <= min_to)
+            mask = in_window if mask is None else mask & in_window
+
+        times = self._times[rows]
+        prices = self._prices[:, rows]
+        if mask is not None:
+            times = times[mask]
+            prices = prices[:, mask]
+
+        return self._view(times), self._view(prices)
+
+    def save(self, dirpath: str) -> None:
+        """
+        Save the stored rows into "dirpath" as a snapshot: one ".npy" file
+        per array, which "load" memory-maps. The files are written under a
+        new generation name, then the "current" file, which names the
+        generation, is replaced atomically.
+        """
+        os.makedirs(dirpath, exist_ok=True)
+        gen = str(time.time_ns())
+        np.save(os.path.join(dirpath, _SNAPSHOT_ARRAY_FILE.format("times", gen)), self.times)
+        np.save(os.path.join(dirpath, _SNAPSHOT_ARRAY_FILE.format("prices", gen)), self.prices)
+
+        path = os.path.join(dirpath, _SNAPSHOT_CURRENT_FILE)
+        with open(path + ".tmp", "w") as f:
+            f.write(gen)
+        os.replace(path + ".tmp", path)
+
+        for filename in os.listdir(dirpath):
+            if filename.endswith(".npy") and (filename.split(".")[1] != gen):
+                os.remove(os.path.join(dirpath, filename))
+
+    def load(self, dirpath: str) -> int:
+        """
+        Append the rows of the snapshot saved by "save" in "dirpath",
+        and return the number of rows appended.
+        """
+        with open(os.path.join(dirpath, _SNAPSHOT_CURRENT_FILE)) as f:
+            gen = f.read().strip()
+        times = np.load(os.path.join(dirpath, _SNAPSHOT_ARRAY_FILE.format("times", gen)),
+                        mmap_mode="r")
+        prices = np.load(os.path.join(dirpath, _SNAPSHOT_ARRAY_FILE.format("prices", gen)),
+                         mmap_mode="r")
+        if ((times.dtype != np.dtype("datetime64[ns]"))
+                or (prices.shape != (len(self.PRICE_COLUMNS), len(times)))
+                or (not (times[:-1] < times[1:]).all())):
+            raise ValueError("inconsistent snapshot: [{}]".format(dirpath))
+        return self.append(times, prices)
+
+    def clear(self) -> None:
+        self._head = 0
+        self._length = 0
+        self._version += 1
+
+    def append(self, times: np.ndarray, prices: np.ndarray) -> int:
+        """
+        Append the rows newer than the latest row, and return the number of
+        rows appended. "prices" is shaped (len(PRICE_COLUMNS), len(times)).
+        The oldest rows are overwritten when the buffer is full.
+        """
+        times = np.asarray(times, dtype="datetime64[ns]")
+        if 0 < self._length:
+            mask = self.latest_time < times
+            if not mask.all():
+                times = times[mask]
+                prices = prices[:, mask]
+
+        count = len(times)
+        if count == 0:
+            return 0
+        if self._capacity < count:
+            times = times[-self._capacity:]
+            prices = prices[:, -self._capacity:]
+
+        pos = (self._head + self._length) % self._capacity
+        first = min(len(times), self._capacity - pos)
+        self._write(pos, times[:first], prices[:, :first])
+        if first < len(times):
+            self._write(0, times[first:], prices[:, first:])
+
+        overflow = self._length + len(times) - self._capacity
+        if 0 < overflow:
+            self._head = (self._head + overflow) % self._capacity
+            self._length = self._capacity
+        else:
+            self._length += len(times)
+        self._version += 1
+
+        return count
+
+    def merge(self, times: np.ndarray, prices: np.ndarray) -> int:
+        """
+        Insert the rows between the oldest and the latest rows which are not
+        stored, and return the number of rows inserted. The stored rows are
+        rewritten, so this costs O(len(self)).
+        """
+        times = np.asarray(times, dtype="datetime64[ns]")
+        if self._length == 0:
+            return 0
+        stored_times = self.times
+        is_new = ((stored_times[0] < times) & (times < stored_times[-1])
+                  & ~np.isin(times, stored_times))
+        count = int(is_new.sum())
+        if count == 0:
+            return 0
+
+        all_times = np.concatenate([stored_times, times[is_new]])
+        all_prices = np.concatenate([self.prices, prices[:, is_new]], axis=1)
+        order = np.argsort(all_times, kind="stable")[-self._capacity:]
+        all_times = all_times[order]
+        all_prices = all_prices[:, order]
+
+        self._write(0, all_times, all_prices)
+        self._head = 0
+        self._length = len(all_times)
+        self._version += 1
+
+        return count
+
+    def _write(self, pos: int, times: np.ndarray, prices: np.ndarray) -> None:
+        end = pos + len(times)
+        mirror = self._capacity
+        self._times[pos:end] = times
+        self._times[pos + mirror:end + mirror] = times
+        self._prices[:, pos:end] = prices
+        self._prices[:, pos + mirror:end + mirror] = prices
+
+        days = times.astype("datetime64[D]")
+        weekdays = (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+        minutes = (times - days).astype("timedelta64[m]").astype(np.int64)
+        self._weekdays[pos:end] = weekdays
+        self._weekdays[pos + mirror:end + mirror] = weekdays
+        self._minutes[pos:end] = minutes
+        self._minutes[pos + mirror:end + mirror] = minutes
+
+    def _view(self, array: np.ndarray) -> np.ndarray:
+        array.flags.writeable = False
+        return array
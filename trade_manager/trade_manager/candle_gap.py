@@ -0,0 +1,86 @@
+from typing import List, Tuple
+import datetime as dt
+import numpy as np
+from trade_manager.market_calendar import get_market_calendar
+
+GapRange = Tuple[dt.datetime, dt.datetime]
+
+
+def _closed_before(times: np.ndarray,
+                   closes: np.ndarray,
+                   opens: np.ndarray
+                   ) -> np.ndarray:
+    """
+    Closed time of the market from "closes[0]" to each of "times".
+    """
+    durations = (opens - closes).astype(np.int64)
+    cum_closed = np.concatenate([[0], np.cumsum(durations)])
+    # The weekends started at "times".
+    idx = np.searchsorted(closes, times, side="right")
+    last = np.maximum(idx - 1, 0)
+    partial = (np.minimum(times, opens[last]) - closes[last]).astype(np.int64)
+    return np.where(0 < idx, cum_closed[last] + np.maximum(partial, 0), 0)
+
+
+def scan_gaps(times: np.ndarray,
+              interval: dt.timedelta,
+              min_count: int = 1
+              ) -> List[GapRange]:
+    """
+    Find the missing candles between the stored ones, against the market
+    hours (closed from the close time on Saturday to the open time on
+    Monday, as "MarketCalendar").
+
+    Return the ranges (first, last) of the start times of the runs of
+    "min_count" or more missing candles. Each run between two stored
+    candles is one range, so the ranges are disjoint and oldest first.
+    """
+    if len(times) < 2:
+        return []
+
+    interval_ns = np.timedelta64(interval).astype("timedelta64[ns]").astype(np.int64)
+    times = np.asarray(times, dtype="datetime64[ns]")
+    diffs = np.diff(times).astype(np.int64)
+    # Most of candles are next to each other, and only the others are
+    # checked against the market hours.
+    idx = np.nonzero(interval_ns < diffs)[0]
+    if len(idx) == 0:
+        return []
+
+    lefts = times[idx]
+    rights = times[idx + 1]
+    closes, opens = get_market_calendar().weekend_closures(lefts[0], rights[-1])
+    closed = _closed_before(rights, closes, opens) - _closed_before(lefts, closes, opens)
+    # The open time between two stored candles holds them and the missing ones.
+    # (Flooring absorbs the shift of the candle alignment at a DST change.)
+    missing = (diffs[idx] - closed) // interval_ns - 1
+
+    is_gap = min_count <= missing
+    step = np.timedelta64(interval_ns, "ns")
+    firsts = (lefts[is_gap] + step).astype("datetime64[us]").tolist()
+    lasts = (rights[is_gap] - step).astype("datetime64[us]").tolist()
+    return list(zip(firsts, lasts))
+
+
+def batch_gaps(gaps: List[GapRange],
+               interval: dt.timedelta,
+               max_count: int,
+               max_join_count: int
+               ) -> List[GapRange]:
+    """
+    Join the ranges "gaps" (oldest first) into the ranges of requests:
+    neighboring ranges are requested at once if the candles between them
+    are "max_join_count" or less, and a request spans "max_count" candles
+    at most (unless a range is longer by itself).
+    """
+    batches = []
+    for first, last in gaps:
+        if batches:
+            batch_first, batch_last = batches[-1]
+            join_count = (first - batch_last) // interval - 1
+            span_count = (last - batch_first) // interval + 1
+            if (join_count <= max_join_count) and (span_count <= max_count):
+                batches[-1] = (batch_first, last)
+                continue
+        batches.append((first, last))
+    return batches
@@ -0,0 +1,231 @@
+from typing import Tuple
+import os
+import time
+from multiprocessing import shared_memory
+from multiprocessing import resource_tracker
+import numpy as np
+from trade_manager.candle_buffer import CandleRingBuffer
+
+# Define Constant value.
+# The header is an array of uint64 in front of the arrays of "CandleRingBuffer".
+_HEADER_SIZE = 64
+_MAGIC = 0
+_CAPACITY = 1
+_SEQ = 2
+_HEAD = 3
+_LENGTH = 4
+_VERSION = 5
+_OWNER_PID = 6
+_MAGIC_VALUE = 0x434E444C53484D31  # "CNDLSHM1"
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # The segment belongs to the process which created it,
+    # so it is not unlinked at the exit of this process.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Owned by another user.
+        return True
+    return True
+
+
+def _check_stale(name: str) -> None:
+    """
+    Raise FileExistsError unless the existing segment "name" is a
+    "SharedCandleBuffer" whose owner process is gone.
+    """
+    shm = _attach(name)
+    try:
+        if shm.size < _HEADER_SIZE:
+            owner_pid = None
+        else:
+            header = np.ndarray(_HEADER_SIZE // 8, dtype=np.uint64, buffer=shm.buf)
+            if header[_MAGIC] == _MAGIC_VALUE:
+                owner_pid = int(header[_OWNER_PID])
+            else:
+                owner_pid = None
+            del header
+    finally:
+        shm.close()
+
+    if owner_pid is None:
+        raise FileExistsError("shared memory [{}] exists and is not a candle buffer."
+                              .format(name))
+    if (owner_pid != 0) and _is_process_alive(owner_pid):
+        raise FileExistsError("shared memory [{}] is in use by the process [{}]."
+                              .format(name, owner_pid))
+
+
+class SharedCandleBuffer(CandleRingBuffer):
+    """
+    "CandleRingBuffer" stored in a named shared memory, so that other local
+    processes read it with "CandleShmReader" without copy.
+
+    The header holds the position, the length and the version of the stored
+    rows, and a sequence counter which is odd while an update is in progress
+    (seqlock). Readers check it to detect an update during their read.
+
+    The header also holds the PID of the owner. A segment of the same name
+    left by a dead owner is replaced, and FileExistsError is raised if the
+    owner is alive or the segment is not a candle buffer.
+    """
+
+    def __init__(self, name: str, capacity: int) -> None:
+        size = _HEADER_SIZE + CandleRingBuffer.nbytes(capacity)
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left by a previous run which did not exit normally.
+            _check_stale(name)
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self._shm = shm
+        self._header = np.ndarray(_HEADER_SIZE // 8, dtype=np.uint64, buffer=shm.buf)
+        super().__init__(capacity, shm.buf[_HEADER_SIZE:])
+        self._header[:] = 0
+        self._header[_CAPACITY] = capacity
+        self._header[_OWNER_PID] = os.getpid()
+        self._header[_MAGIC] = _MAGIC_VALUE
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def append(self, times: np.ndarray, prices: np.ndarray) -> int:
+        self._header[_SEQ] += 1
+        try:
+            return super().append(times, prices)
+        finally:
+            self._publish_header()
+
+    def merge(self, times: np.ndarray, prices: np.ndarray) -> int:
+        self._header[_SEQ] += 1
+        try:
+            return super().merge(times, prices)
+        finally:
+            self._publish_header()
+
+    def clear(self) -> None:
+        self._header[_SEQ] += 1
+        try:
+            super().clear()
+        finally:
+            self._publish_header()
+
+    def close(self) -> None:
+        """
+        Remove the shared memory. The buffer is not usable after this.
+        """
+        self._shm.unlink()
+        self._header = self._times = self._prices = self._minutes = self._weekdays = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views given to consumers still refer to it,
+            # it is unmapped when they are released.
+            pass
+
+    def _publish_header(self) -> None:
+        header = self._header
+        header[_HEAD] = self._head
+        header[_LENGTH] = self._length
+        header[_VERSION] = self._version
+        header[_SEQ] += 1
+
+
+class CandleShmReader():
+    """
+    Reader of a "SharedCandleBuffer" of another process.
+
+    "views" gives zero-copy, read-only views, which the writer may update
+    (the oldest rows are overwritten when the buffer is full). They are
+    consistent only if "is_unchanged" is True after they are used.
+    "read" gives consistent copies.
+
+    Usage:
+        reader = CandleShmReader("historical_candles_usdjpy_m1")
+        while True:
+            seq, times, prices = reader.views()
+            ...use times and prices...
+            if reader.is_unchanged(seq):
+                break
+    """
+
+    def __init__(self, name: str) -> None:
+        self._shm = _attach(name)
+        self._header = np.ndarray(_HEADER_SIZE // 8, dtype=np.uint64, buffer=self._shm.buf)
+        if self._header[_MAGIC] != _MAGIC_VALUE:
+            self.close()
+            raise ValueError("not a candle shared memory: [{}]".format(name))
+        capacity = int(self._header[_CAPACITY])
+        (self._times,
+         self._prices,
+         self._minutes,
+         self._weekdays) = CandleRingBuffer.create_arrays(capacity,
+                                                          self._shm.buf[_HEADER_SIZE:])
+
+    @property
+    def version(self) -> int:
+        return int(self._header[_VERSION])
+
+    @property
+    def length(self) -> int:
+        return int(self._header[_LENGTH])
+
+    def views(self) -> Tuple[int, np.ndarray, np.ndarray]:
+        """
+        Return (seq, times, prices), where "prices" is shaped
+        (len(CandleRingBuffer.PRICE_COLUMNS), len(times)).
+        """
+        seq = self._wait_seq()
+        head = int(self._header[_HEAD])
+        end = head + int(self._header[_LENGTH])
+        times = self._times[head:end]
+        prices = self._prices[:, head:end]
+        times.flags.writeable = False
+        prices.flags.writeable = False
+        return seq, times, prices
+
+    def is_unchanged(self, seq: int) -> bool:
+        return int(self._header[_SEQ]) == seq
+
+    def read(self) -> Tuple[int, np.ndarray, np.ndarray]:
+        """
+        Return (version, times, prices) copied in a consistent state.
+        """
+        while True:
+            seq, times, prices = self.views()
+            version = self.version
+            times = times.copy()
+            prices = prices.copy()
+            if self.is_unchanged(seq):
+                return version, times, prices
+
+    def close(self) -> None:
+        self._header = self._times = self._prices = self._minutes = self._weekdays = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views given by "views" still refer to it.
+            pass
+
+    def _wait_seq(self) -> int:
+        seq = int(self._header[_SEQ])
+        while seq % 2 == 1:
+            time.sleep(0)
+            seq = int(self._header[_SEQ])
+        return seq
@@ -5,3 +5,10 @@ class InitializerErrorException(Exception):
 
     def __init__(self, *args):
         Exception.__init__(self, "Error occurs during class initialization", *args)
+
+
+class InvalidTransitionErrorException(Exception):
+    """Raised when a trigger is called from a state that has no transition for it."""
+
+    def __init__(self, *args):
+        Exception.__init__(self, "Invalid state transition", *args)
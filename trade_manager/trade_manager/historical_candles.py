@@ -1,17 +1,21 @@
+import os
 import sys
-from typing import List
+import time
+import array
+from typing import Dict, List, Optional, Sequence, Tuple
 from typing import TypeVar
 from dataclasses import dataclass
 from enum import Enum, auto
 import datetime as dt
+import numpy as np
 import pandas as pd
-from transitions import Machine
-# from transitions.extensions.factory import GraphMachine as Machine
-from transitions.extensions.factory import GraphMachine
 import rclpy
 from rclpy.node import Node
 from rclpy.client import Client
+from rclpy.publisher import Publisher
 from rclpy.task import Future
+from rclpy.qos import QoSProfile, QoSHistoryPolicy, QoSReliabilityPolicy
+from rclpy.qos import QoSDurabilityPolicy
 import trade_manager.utility as utl
 from trade_manager.utility import RosParam
 from trade_manager.constant import Transitions as Tr
@@ -20,17 +24,57 @@ from trade_manager.constant import FMT_YMDHMS, FMT_TIME_HMS
 from trade_manager.constant import GranParam
 from trade_manager.constant import CandleColumnNames as ColName
 from trade_manager.constant import INST_DICT, GRAN_DICT
-from trade_manager.constant import MIN_TIME, MAX_TIME
 from trade_manager.exception import InitializerErrorException
+from trade_manager.state_machine import StateMachine
+from trade_manager.candle_buffer import CandleRingBuffer, candles_from_msgs
+from trade_manager.candle_gap import scan_gaps, batch_gaps
+from trade_manager.candle_shm import SharedCandleBuffer
+from trade_manager.indicator import IndicatorEngine, IndicatorSpec
+from trade_manager.response_cache import ResponseCache
+from trade_manager.timer_heap import TimerHeap
 from api_msgs.srv import CandlesSrv
 from api_msgs.msg import Instrument as InstApi
 from api_msgs.msg import Granularity as GranApi
 from trade_manager_msgs.srv import CandlesDataSrv
+from trade_manager_msgs.srv import IndicatorsDataSrv
 from trade_manager_msgs.msg import Candle
+from trade_manager_msgs.msg import CandlesReadiness
+from trade_manager_msgs.msg import CandlesUpdate
+from trade_manager_msgs.msg import Indicator
+from trade_manager_msgs.msg import IndicatorsUpdate
+from trade_manager_msgs.msg import Instrument as InstMng
+from trade_manager_msgs.msg import Granularity as GranMng
 
 SrvTypeRequest = TypeVar("SrvTypeRequest")
 SrvTypeResponse = TypeVar("SrvTypeResponse")
 
+# Define Constant value.
+_COLUMNAR_FIELD_DICT = {
+    ColName.ASK_OP.value: "ask_o_list",
+    ColName.ASK_HI.value: "ask_h_list",
+    ColName.ASK_LO.value: "ask_l_list",
+    ColName.ASK_CL.value: "ask_c_list",
+    ColName.BID_OP.value: "bid_o_list",
+    ColName.BID_HI.value: "bid_h_list",
+    ColName.BID_LO.value: "bid_l_list",
+    ColName.BID_CL.value: "bid_c_list",
+    ColName.MID_OP.value: "mid_o_list",
+    ColName.MID_HI.value: "mid_h_list",
+    ColName.MID_LO.value: "mid_l_list",
+    ColName.MID_CL.value: "mid_c_list",
+}
+_PRICE_INDEX_DICT = {col: i for i, col in enumerate(CandleRingBuffer.PRICE_COLUMNS)}
+_INST_NAME_DICT = {
+    InstApi.INST_USD_JPY: "usdjpy",
+    InstApi.INST_EUR_JPY: "eurjpy",
+    InstApi.INST_EUR_USD: "eurusd",
+}
+SHM_NAME_PREFIX = "historical_candles_"
+_INST_MNG_DICT = {v: k for k, v in INST_DICT.items()}
+_GRAN_MNG_DICT = {v: k for k, v in GRAN_DICT.items()}
+# Approximate memory size of a "Candle" message with its field values.
+_CANDLE_MSG_BYTES = 500
+
 
 @dataclass
 class _GranData():
@@ -83,6 +127,28 @@ class _RosParams():
     LENG_H12 = RosParam("data_length.h12")
     LENG_D = RosParam("data_length.d")
     LENG_W = RosParam("data_length.w")
+    RSP_CACHE_MAX_MB = RosParam("response_cache.max_mbytes")
+    SNAPSHOT_DIR = RosParam("snapshot.directory")
+    SNAPSHOT_INTERVAL = RosParam("snapshot.interval")
+    ENA_SHARED_MEMORY = RosParam("shared_memory.enable")
+    INDICATOR_SPECS = RosParam("indicator.specs")
+    ENA_GAP_SCAN = RosParam("gap_scan.enable")
+    GAP_SCAN_MIN_CANDLES = RosParam("gap_scan.min_candles")
+
+    def indicator_spec_dict(self) -> Dict[str, List[IndicatorSpec]]:
+        """
+        Indicator specs of "indicator.specs", as {series name: specs}.
+        "indicator.specs" is a comma-separated list of "<spec>[@<series name>]"
+        (e.g. "sma:20,rsi:14@usdjpy_m1"). The specs for all the series are
+        under "".
+        """
+        spec_dict = {}
+        for text in self.INDICATOR_SPECS.value.split(","):
+            if text.strip() == "":
+                continue
+            spec_text, _, series = text.strip().partition("@")
+            spec_dict.setdefault(series, []).append(IndicatorSpec.parse(spec_text))
+        return spec_dict
 
     def enable_inst_list(self):
         inst_list = []
@@ -133,9 +199,81 @@ class _RosParams():
         return gran_list
 
 
+def _series_name(inst_id: int, gran_id: int) -> str:
+    """
+    Name of a series, such as "usdjpy_m1".
+    """
+    gran_param = GranParam.get_member_by_msgid(gran_id)
+    return "{}_{}".format(_INST_NAME_DICT[inst_id], gran_param.name.lower())
+
+
+def _to_candle_msgs(times: np.ndarray, prices: np.ndarray) -> List[Candle]:
+    """
+    Build "Candle" messages from the column arrays in one pass.
+    "prices" is shaped (len(CandleRingBuffer.PRICE_COLUMNS), len(times)).
+    """
+    time_list = np.datetime_as_string(times.astype("datetime64[s]"), unit="s").tolist()
+    col_list = [prices[_PRICE_INDEX_DICT[col]].tolist()
+                for col in _COLUMNAR_FIELD_DICT.keys()]
+
+    msg_list = []
+    for (time_, ask_o, ask_h, ask_l, ask_c, bid_o, bid_h, bid_l, bid_c,
+         mid_o, mid_h, mid_l, mid_c) in zip(time_list, *col_list):
+        msg = Candle()
+        msg.ask_o = ask_o
+        msg.ask_h = ask_h
+        msg.ask_l = ask_l
+        msg.ask_c = ask_c
+        msg.bid_o = bid_o
+        msg.bid_h = bid_h
+        msg.bid_l = bid_l
+        msg.bid_c = bid_c
+        msg.mid_o = mid_o
+        msg.mid_h = mid_h
+        msg.mid_l = mid_l
+        msg.mid_c = mid_c
+        msg.time = time_
+        msg_list.append(msg)
+
+    return msg_list
+
+
+def _to_columnar_candles(times: np.ndarray,
+                         prices: np.ndarray
+                         ) -> Dict[str, array.array]:
+    """
+    Build the columnar lists of "CandlesDataSrv.Response" from the column
+    arrays, as {field name: list}. The lists are "array.array", which the
+    message takes without checking each element.
+    """
+    epoch = times.astype("datetime64[s]").astype(np.int64)
+    columnar = {"time_list": array.array("q", epoch.tobytes())}
+    for col, field in _COLUMNAR_FIELD_DICT.items():
+        values = prices[_PRICE_INDEX_DICT[col]].astype(np.float32)
+        columnar[field] = array.array("f", values.tobytes())
+    return columnar
+
+
+def _to_indicator_msgs(spec_values_list: List[Tuple[IndicatorSpec, np.ndarray]]
+                       ) -> List[Indicator]:
+    """
+    Build "Indicator" messages, one per output of each indicator.
+    """
+    msg_list = []
+    for spec, values in spec_values_list:
+        for output, output_values in zip(spec.type_.outputs, values):
+            msg = Indicator()
+            msg.spec = str(spec)
+            msg.output = output
+            msg.value_list = array.array("d", output_values.tobytes())
+            msg_list.append(msg)
+    return msg_list
+
+
 class CandlesData():
 
     class States(Enum):
+        initializing = auto()
         waiting = auto()
         updating = auto()
         retrying = auto()
@@ -143,46 +281,53 @@ class CandlesData():
     cli_cdl = None
     logger = None
     daily_param = None
+    snapshot_root = ""
+    is_shared_memory = False
+    # Runs of missing candles of this length or more are backfilled (0: disabled).
+    gap_min_count = 0
+    scheduler = None
 
-    def __init__(self,
-                 node: 'Node',
-                 inst_id: int,
-                 gran_data: _GranData
-                 ) -> None:
-
-        # Define Constant value.
-        gran_param = GranParam.get_member_by_msgid(gran_data.gran_id)
-        self._GRAN_INTERVAL = gran_param.timedelta
-        self._NEXT_UPDATETIME_OFS_SEC = dt.timedelta(seconds=5)
-        self._RETRY_INTERVAL = dt.timedelta(minutes=1)
-        self._FAIL_INTERVAL = dt.timedelta(minutes=10)
-        self._RETRY_COUNT_MAX = 2
-        self._SELF_RETRY_COUNT_MAX = 2
+    _sm = None
 
-        # ---------- Create State Machine ----------
+    @classmethod
+    def _create_state_machine(cls) -> StateMachine:
         states = [
             {
-                Tr.NAME.value: self.States.waiting,
+                Tr.NAME.value: cls.States.initializing,
+                Tr.ON_ENTER.value: None,
+                Tr.ON_EXIT.value: None
+            },
+            {
+                Tr.NAME.value: cls.States.waiting,
                 Tr.ON_ENTER.value: "_on_entry_waiting",
                 Tr.ON_EXIT.value: "_on_exit_waiting"
             },
             {
-                Tr.NAME.value: self.States.updating,
+                Tr.NAME.value: cls.States.updating,
                 Tr.ON_ENTER.value: "_on_entry_updating",
                 Tr.ON_EXIT.value: None
             },
             {
-                Tr.NAME.value: self.States.retrying,
+                Tr.NAME.value: cls.States.retrying,
                 Tr.ON_ENTER.value: "_on_enrty_retrying",
                 Tr.ON_EXIT.value: "_on_exit_retrying"
             },
         ]
 
         transitions = [
+            {
+                Tr.TRIGGER.value: "_trans_from_initializing_to_waiting",
+                Tr.SOURCE.value: cls.States.initializing,
+                Tr.DEST.value: cls.States.waiting,
+                Tr.PREPARE.value: None,
+                Tr.BEFORE.value: None,
+                Tr.AFTER.value: None,
+                Tr.CONDITIONS.value: None
+            },
             {
                 Tr.TRIGGER.value: "_trans_from_wating_to_updating",
-                Tr.SOURCE.value: self.States.waiting,
-                Tr.DEST.value: self.States.updating,
+                Tr.SOURCE.value: cls.States.waiting,
+                Tr.DEST.value: cls.States.updating,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -190,8 +335,8 @@ class CandlesData():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_updating_to_retrying",
-                Tr.SOURCE.value: self.States.updating,
-                Tr.DEST.value: self.States.retrying,
+                Tr.SOURCE.value: cls.States.updating,
+                Tr.DEST.value: cls.States.retrying,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -199,8 +344,8 @@ class CandlesData():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_retrying_to_updating",
-                Tr.SOURCE.value: self.States.retrying,
-                Tr.DEST.value: self.States.updating,
+                Tr.SOURCE.value: cls.States.retrying,
+                Tr.DEST.value: cls.States.updating,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -208,8 +353,8 @@ class CandlesData():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_updating_to_waiting",
-                Tr.SOURCE.value: self.States.updating,
-                Tr.DEST.value: self.States.waiting,
+                Tr.SOURCE.value: cls.States.updating,
+                Tr.DEST.value: cls.States.waiting,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -217,7 +362,7 @@ class CandlesData():
             },
             {
                 Tr.TRIGGER.value: "_trans_self_updating",
-                Tr.SOURCE.value: self.States.updating,
+                Tr.SOURCE.value: cls.States.updating,
                 Tr.DEST.value: "=",
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
@@ -226,56 +371,82 @@ class CandlesData():
             },
         ]
 
-        self._sm = Machine(model=self,
-                           states=states,
-                           initial=self.States.waiting,
-                           transitions=transitions)
+        return StateMachine(model_cls=cls,
+                            states=states,
+                            initial=cls.States.initializing,
+                            transitions=transitions)
 
-        if isinstance(self._sm, GraphMachine):
-            self._sm.get_graph().view()
+    def __init__(self,
+                 inst_id: int,
+                 gran_data: _GranData,
+                 pub_update: Optional[Publisher] = None,
+                 pub_indicators: Optional[Publisher] = None
+                 ) -> None:
+
+        # Define Constant value.
+        gran_param = GranParam.get_member_by_msgid(gran_data.gran_id)
+        self._GRAN_INTERVAL = gran_param.timedelta
+        self._NEXT_UPDATETIME_OFS_SEC = dt.timedelta(seconds=5)
+        self._RETRY_INTERVAL = dt.timedelta(minutes=1)
+        self._FAIL_INTERVAL = dt.timedelta(minutes=10)
+        self._RETRY_COUNT_MAX = 2
+        self._SELF_RETRY_COUNT_MAX = 2
+        # A backfill request fetches up to one API request of candles,
+        # joining the gaps with up to an hour of stored candles between them.
+        self._BACKFILL_MAX_COUNT = 5000
+        self._BACKFILL_JOIN_COUNT = dt.timedelta(hours=1) // self._GRAN_INTERVAL
+
+        # ---------- Initialize State Machine ----------
+        CandlesData._sm.init_model(self)
 
         self._inst_id = inst_id
         self._gran_id = gran_data.gran_id
-        self._df_comp = pd.DataFrame()
+        self._length = gran_data.length
+        self._comp_buf = self._create_buffer()
+        self._indicators = IndicatorEngine(self._length)
+        # The versions of each run start from the time of the start, so that
+        # a version of another run is distinguished.
+        self._version_base = time.time_ns()
         self._df_prov = pd.DataFrame()
         self._future = None
+        # [(gaps, future)] of the backfill requests in flight.
+        self._backfill_list = []
+        # The gaps which have been requested (the market may have no candles).
+        self._checked_gap_set = set()
+        # The candles of the versions before it have been backfilled since.
+        self._merged_version = 0
         self._is_update_complete = True
+        self._next_updatetime = dt.datetime.now()
+        self._pub_update = pub_update
+        self._pub_indicators = pub_indicators
 
         self.logger.debug("{:-^40}".format(" Create CandlesData:Start "))
         self.logger.debug("  - inst_id:[{}]".format(self._inst_id))
         self.logger.debug("  - gran_id:[{}]".format(self._gran_id))
 
-        dt_now = dt.datetime.now()
-        dt_from = dt_now - self._GRAN_INTERVAL * gran_data.length
-        dt_to = dt_now
-
-        self.logger.debug("  - time_from:[{}]".format(dt_from))
-        self.logger.debug("  - time_to  :[{}]".format(dt_to))
+        if self.snapshot_root:
+            self._snapshot_dir = os.path.join(self.snapshot_root,
+                                              _series_name(inst_id, gran_data.gran_id))
+            self._load_snapshot()
+        else:
+            self._snapshot_dir = None
+        self._saved_version = self._comp_buf.version
 
+        # The initial candles are requested here, and loaded by
+        # "do_timeout_event" when the response arrives.
         try:
-            future = self._request_async_candles(dt_from, dt_to)
+            self._future = self._request_initial_candles()
         except Exception as err:
             self.logger.error("{:!^50}".format(" Call ROS Service Error (Candles) "))
             self.logger.error("{}".format(err))
             raise InitializerErrorException("\"CandlesData\" initialize failed.")
 
-        rclpy.spin_until_future_complete(node, future)
-        rsp = future.result()
-        if rsp.result is True:
-            self._update_dataframe(rsp.cndl_msg_list)
-            self.logger.debug("---------- df_comp(length:[{}]) ----------"
-                              .format(len(self._df_comp)))
-            self.logger.debug("  - Head:\n{}".format(self._df_comp[:5]))
-            self.logger.debug("  - Tail:\n{}".format(self._df_comp[-5:]))
-            self.logger.debug("---------- df_prov(length:[{}]) ----------"
-                              .format(len(self._df_prov)))
-            self.logger.debug("\n{}".format(self._df_prov))
-        else:
-            self.logger.error("{:!^50}".format(" Call ROS Service Error (Candles) "))
-            self.logger.error("  future result is False")
-            raise InitializerErrorException("\"CandlesData\" initialize failed.")
-
-        self._on_entry_waiting()
+    @property
+    def is_ready(self) -> bool:
+        """
+        Whether the initial candles are loaded.
+        """
+        return self.state != self.States.initializing
 
     @property
     def inst_id(self):
@@ -286,11 +457,128 @@ class CandlesData():
         return self._gran_id
 
     @property
-    def df_comp(self):
-        return self._df_comp
+    def version(self) -> int:
+        """
+        Version of the completed candles, changed on every update.
+        """
+        return self._version_base + self._comp_buf.version
+
+    def is_current_run_version(self, version: int) -> bool:
+        """
+        Whether "version" has been given by this run, after the last backfill.
+        """
+        return self._version_base + self._merged_version <= version <= self.version
+
+    def holds_since(self, datetime_: dt.datetime) -> bool:
+        """
+        Whether all the completed candles from "datetime_" are held.
+        """
+        if len(self._comp_buf) == 0:
+            return False
+        return self._comp_buf.times[0] <= np.datetime64(datetime_, "ns")
+
+    def get_prov_msgs(self) -> List[Candle]:
+        if self._df_prov.empty:
+            return []
+        return _to_candle_msgs(self._df_prov.index.values, self._df_prov.to_numpy().T)
+
+    @property
+    def df_comp(self) -> pd.DataFrame:
+        """
+        Completed candles, as a read-only view of the ring buffer.
+        """
+        return self._comp_buf.to_dataframe()
+
+    def select(self,
+               start: Optional[dt.datetime] = None,
+               end: Optional[dt.datetime] = None,
+               dayofweeks: Optional[Sequence[int]] = None,
+               time_from: Optional[dt.time] = None,
+               time_to: Optional[dt.time] = None,
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Completed candles filtered as "CandleRingBuffer.select".
+        """
+        return self._comp_buf.select(start, end, dayofweeks, time_from, time_to)
+
+    @property
+    def indicator_specs(self) -> List[IndicatorSpec]:
+        return self._indicators.specs
+
+    def register_indicator(self, spec: IndicatorSpec) -> None:
+        """
+        Add an indicator, computed over the stored candles and updated with
+        each newly completed candle.
+        """
+        self._indicators.register(spec, self._comp_buf.prices)
+
+    def select_indicators(self,
+                          specs: Sequence[IndicatorSpec],
+                          start: Optional[dt.datetime] = None
+                          ) -> Tuple[np.ndarray, List[Tuple[IndicatorSpec, np.ndarray]]]:
+        """
+        Return (times, [(spec, values)]) of the rows from "start", for the
+        registered ones of "specs".
+        """
+        times = self._indicators.times
+        first = 0
+        if start is not None:
+            first = np.searchsorted(times, np.datetime64(start, "ns"), side="left")
+        spec_values_list = [(spec, self._indicators.values(spec)[:, first:])
+                            for spec in specs if spec in self._indicators.specs]
+        return times[first:], spec_values_list
+
+    def save_snapshot(self) -> None:
+        """
+        Save the completed candles into the snapshot, if updated since the
+        last save.
+        """
+        if ((self._snapshot_dir is None)
+                or (not self.is_ready)
+                or (self._saved_version == self._comp_buf.version)):
+            return
+
+        try:
+            self._comp_buf.save(self._snapshot_dir)
+        except Exception as err:
+            self.logger.error("{:!^50}".format(" Save Snapshot Error "))
+            self.logger.error("  - path:[{}]".format(self._snapshot_dir))
+            self.logger.error("{}".format(err))
+        else:
+            self._saved_version = self._comp_buf.version
+            self.logger.debug("--- <inst_id:[{}], gran_id:[{}]> Snapshot saved:[{}]"
+                              .format(self.inst_id, self.gran_id, len(self._comp_buf)))
+
+    def close(self) -> None:
+        if isinstance(self._comp_buf, SharedCandleBuffer):
+            self._comp_buf.close()
+
+    def _create_buffer(self) -> CandleRingBuffer:
+        if self.is_shared_memory:
+            # Other local processes read it with "CandleShmReader".
+            name = SHM_NAME_PREFIX + _series_name(self._inst_id, self._gran_id)
+            return SharedCandleBuffer(name, self._length)
+        return CandleRingBuffer(self._length)
+
+    def _load_snapshot(self) -> None:
+        if not os.path.isdir(self._snapshot_dir):
+            return
+
+        try:
+            count = self._comp_buf.load(self._snapshot_dir)
+        except Exception as err:
+            self.logger.warn("{:!^50}".format(" Load Snapshot Error "))
+            self.logger.warn("  - path:[{}]".format(self._snapshot_dir))
+            self.logger.warn("{}".format(err))
+            self._comp_buf.clear()
+            self._indicators.clear()
+        else:
+            self._indicators.append(self._comp_buf.times, self._comp_buf.prices)
+            self.logger.debug("  - snapshot:[{}] rows (latest:[{}])"
+                              .format(count, self._comp_buf.latest_time))
 
     def _get_latest_datetime_in_dataframe(self) -> dt.datetime:
-        return self._df_comp.index[-1].to_pydatetime()
+        return pd.Timestamp(self._comp_buf.latest_time).to_pydatetime()
 
     def _get_next_update_datetime(self, latest_datetime: dt.datetime):
 
@@ -309,10 +597,35 @@ class CandlesData():
 
         return next_update_dt
 
+    def get_next_event_time(self) -> Optional[dt.datetime]:
+        """
+        Time when "do_timeout_event" has to be called next, or None while
+        a request is in flight (the scheduler is woken up by its response).
+        """
+        if any([future.done() for _, future in self._backfill_list]):
+            return dt.datetime.now()
+
+        if self.state in (self.States.waiting, self.States.retrying):
+            return self._next_updatetime
+
+        if self._future is None:
+            if self.state == self.States.initializing:
+                return self._next_updatetime
+            return dt.datetime.now()
+
+        if self._future.done():
+            return dt.datetime.now()
+        return None
+
     def do_timeout_event(self) -> None:
         # self.logger.debug("state:[{}]".format(self.state))
 
-        if self.state == self.States.waiting:
+        if self._backfill_list:
+            self._on_do_backfill()
+
+        if self.state == self.States.initializing:
+            self._on_do_initializing()
+        elif self.state == self.States.waiting:
             self._on_do_waiting()
         elif self.state == self.States.updating:
             self._on_do_updating()
@@ -321,6 +634,42 @@ class CandlesData():
         else:
             pass
 
+    def _on_do_initializing(self):
+        if self._future is None:
+            if self._next_updatetime < dt.datetime.now():
+                try:
+                    self._future = self._request_initial_candles()
+                except Exception as err:
+                    self.logger.error("{:!^50}".format(" Call ROS Service Error (Candles) "))
+                    self.logger.error("{}".format(err))
+                    self._next_updatetime = dt.datetime.now() + self._RETRY_INTERVAL
+            return
+
+        if not self._future.done():
+            return
+
+        rsp = self._future.result()
+        self._future = None
+        if (rsp is not None) and rsp.result:
+            self._update_dataframe(rsp.cndl_msg_list)
+            self.logger.debug("--- <inst_id:[{}], gran_id:[{}]> Initialized"
+                              .format(self.inst_id, self.gran_id))
+            self.logger.debug("---------- df_comp(length:[{}]) ----------"
+                              .format(len(self._comp_buf)))
+            self.logger.debug("  - Head:\n{}".format(self.df_comp[:5]))
+            self.logger.debug("  - Tail:\n{}".format(self.df_comp[-5:]))
+            self.logger.debug("---------- df_prov(length:[{}]) ----------"
+                              .format(len(self._df_prov)))
+            self.logger.debug("\n{}".format(self._df_prov))
+
+        if 0 < len(self._comp_buf):
+            self._trans_from_initializing_to_waiting()
+        else:
+            self.logger.error("{:!^50}".format(" Call ROS Service Fail (Initializing) "))
+            self.logger.error("  - inst_id:[{}], gran_id:[{}]"
+                              .format(self.inst_id, self.gran_id))
+            self._next_updatetime = dt.datetime.now() + self._RETRY_INTERVAL
+
     def _on_entry_waiting(self):
         self.logger.debug("--- <inst_id:[{}], gran_id:[{}]> Call \"{}\""
                           .format(self.inst_id, self.gran_id,
@@ -331,6 +680,7 @@ class CandlesData():
             self.logger.debug("========== DF Update OK! ==========")
             latest_dt = self._get_latest_datetime_in_dataframe()
             self._next_updatetime = self._get_next_update_datetime(latest_dt)
+            self._request_backfill()
         else:
             self.logger.debug("========== DF Update NG! ==========")
             dt_now = dt_now.replace(second=0, microsecond=0)
@@ -387,9 +737,9 @@ class CandlesData():
                     if rsp.result:
                         self._update_dataframe(rsp.cndl_msg_list)
                         self.logger.debug("---------- df_comp(length:[{}]) ----------"
-                                          .format(len(self._df_comp)))
-                        self.logger.debug("  - Head:\n{}".format(self._df_comp[:5]))
-                        self.logger.debug("  - Tail:\n{}".format(self._df_comp[-5:]))
+                                          .format(len(self._comp_buf)))
+                        self.logger.debug("  - Head:\n{}".format(self.df_comp[:5]))
+                        self.logger.debug("  - Tail:\n{}".format(self.df_comp[-5:]))
                         self.logger.debug("---------- df_prov(length:[{}]) ----------"
                                           .format(len(self._df_prov)))
                         self.logger.debug("\n{}".format(self._df_prov))
@@ -456,55 +806,150 @@ class CandlesData():
                           cndl_msg_list: List[Candle]
                           ) -> None:
 
-        data = []
-        for cndl_msg in cndl_msg_list:
-            dt_ = dt.datetime.strptime(cndl_msg.time, FMT_YMDHMS)
-            hsc_o = (cndl_msg.ask_o - cndl_msg.bid_o) / 2
-            hsc_h = (cndl_msg.ask_h - cndl_msg.bid_h) / 2
-            hsc_l = (cndl_msg.ask_l - cndl_msg.bid_l) / 2
-            hsc_c = (cndl_msg.ask_c - cndl_msg.bid_c) / 2
-            data.append([dt_,
-                         cndl_msg.ask_o,
-                         cndl_msg.ask_h,
-                         cndl_msg.ask_l,
-                         cndl_msg.ask_c,
-                         cndl_msg.bid_o,
-                         cndl_msg.bid_h,
-                         cndl_msg.bid_l,
-                         cndl_msg.bid_c,
-                         cndl_msg.bid_o + hsc_o,
-                         cndl_msg.bid_h + hsc_h,
-                         cndl_msg.bid_l + hsc_l,
-                         cndl_msg.bid_c + hsc_c,
-                         cndl_msg.is_complete
-                         ])
-
-        df = pd.DataFrame(data,
-                          columns=ColName.to_list())
-        df.set_index([ColName.DATETIME.value],
-                     inplace=True)
-
-        df_comp = df[(df[ColName.COMP.value])].copy()
-        df_prov = df[~(df[ColName.COMP.value])].copy()
-
-        if not df_comp.empty:
-            df_comp.drop(ColName.COMP.value, axis=1, inplace=True)
-            if self._df_comp.empty:
-                self._df_comp = df_comp
-            else:
-                latest_idx = self._df_comp.index[-1]
-                if latest_idx in df_comp.index:
-                    row_pos = df_comp.index.get_loc(latest_idx)
-                    df_comp = df_comp[row_pos + 1:]
-                self._df_comp = self._df_comp.append(df_comp)
-                droplist = self._df_comp.index[range(0, len(df_comp))]
-                self._df_comp.drop(index=droplist, inplace=True)
-
-        if df_prov.empty:
-            self._df_prov = pd.DataFrame()
+        times, prices, is_complete = candles_from_msgs(cndl_msg_list)
+
+        count = 0
+        if is_complete.any():
+            comp_times = times[is_complete]
+            comp_prices = prices[:, is_complete]
+            # Rows not newer than the stored latest one are skipped.
+            count = self._comp_buf.append(comp_times, comp_prices)
+            if 0 < count:
+                # The appended rows are the last ones, as the candles are in
+                # time order.
+                self._indicators.append(comp_times[-count:], comp_prices[:, -count:])
+
+        is_prov = ~is_complete
+        if is_complete.all():
+            df_prov = pd.DataFrame()
         else:
-            df_prov.drop(ColName.COMP.value, axis=1, inplace=True)
-            self._df_prov = df_prov
+            index = pd.DatetimeIndex(times[is_prov], name=ColName.DATETIME.value)
+            df_prov = pd.DataFrame(prices[:, is_prov].T,
+                                   index=index,
+                                   columns=CandleRingBuffer.PRICE_COLUMNS)
+        is_prov_changed = not df_prov.equals(self._df_prov)
+        self._df_prov = df_prov
+
+        # The initial candles are not published, clients get them by "candles_data".
+        if ((self._pub_update is not None) and self.is_ready
+                and ((0 < count) or is_prov_changed)):
+            self._publish_update(count, times[is_prov], prices[:, is_prov])
+        if ((self._pub_indicators is not None) and self.is_ready
+                and (0 < count) and self._indicators.specs):
+            self._publish_indicators(count)
+
+    def _request_backfill(self) -> None:
+        if (self.gap_min_count <= 0) or self._backfill_list:
+            return
+
+        times = self._comp_buf.times
+        oldest_dt = pd.Timestamp(times[0]).to_pydatetime()
+        self._checked_gap_set = {gap for gap in self._checked_gap_set if oldest_dt < gap[0]}
+        gaps = [gap for gap in scan_gaps(times, self._GRAN_INTERVAL, self.gap_min_count)
+                if gap not in self._checked_gap_set]
+        if not gaps:
+            return
+
+        self.logger.debug("--- <inst_id:[{}], gran_id:[{}]> Request backfill"
+                          .format(self.inst_id, self.gran_id))
+        for dt_from, dt_to in batch_gaps(gaps, self._GRAN_INTERVAL,
+                                         self._BACKFILL_MAX_COUNT,
+                                         self._BACKFILL_JOIN_COUNT):
+            self.logger.debug("  - time_from:[{}], time_to:[{}]".format(dt_from, dt_to))
+            try:
+                future = self._request_async_candles(dt_from, dt_to)
+            except Exception as err:
+                self.logger.error("{:!^50}".format(" Call ROS Service Error (Backfill) "))
+                self.logger.error("{}".format(err))
+                break
+            batch = [gap for gap in gaps if (dt_from <= gap[0]) and (gap[1] <= dt_to)]
+            self._backfill_list.append((batch, future))
+
+    def _on_do_backfill(self) -> None:
+        is_merged = False
+        backfill_list = []
+        for gaps, future in self._backfill_list:
+            if not future.done():
+                backfill_list.append((gaps, future))
+                continue
+
+            rsp = future.result()
+            if (rsp is None) or (not rsp.result):
+                # Requested again at the next scan.
+                self.logger.error("{:!^50}".format(" Call ROS Service Fail (Backfill) "))
+                self.logger.error("  - inst_id:[{}], gran_id:[{}]"
+                                  .format(self.inst_id, self.gran_id))
+                continue
+
+            self._checked_gap_set.update(gaps)
+            times, prices, is_complete = candles_from_msgs(rsp.cndl_msg_list)
+            count = self._comp_buf.merge(times[is_complete], prices[:, is_complete])
+            if 0 < count:
+                # The indicators after the inserted candles are changed.
+                self._indicators.clear()
+                self._indicators.append(self._comp_buf.times, self._comp_buf.prices)
+                self._merged_version = self._comp_buf.version
+                is_merged = True
+            self.logger.debug("--- <inst_id:[{}], gran_id:[{}]> Backfilled:[{}] candles"
+                              .format(self.inst_id, self.gran_id, count))
+        self._backfill_list = backfill_list
+
+        # The subscribers fetch the whole series again.
+        if is_merged and self.is_ready:
+            if self._pub_update is not None:
+                prov_times = self._df_prov.index.values
+                prov_prices = self._df_prov.to_numpy().T.reshape(
+                    len(CandleRingBuffer.PRICE_COLUMNS), -1)
+                self._publish_update(0, prov_times, prov_prices, is_full_reload=True)
+            if (self._pub_indicators is not None) and self._indicators.specs:
+                self._publish_indicators(0, is_full_reload=True)
+
+    def _publish_update(self,
+                        count: int,
+                        prov_times: np.ndarray,
+                        prov_prices: np.ndarray,
+                        is_full_reload: bool = False
+                        ) -> None:
+        msg = CandlesUpdate()
+        msg.inst_msg.inst_id = _INST_MNG_DICT[self._inst_id]
+        msg.gran_msg.gran_id = _GRAN_MNG_DICT[self._gran_id]
+        msg.is_full_reload = is_full_reload
+        if 0 < count:
+            msg.comp_msg_list = _to_candle_msgs(self._comp_buf.times[-count:],
+                                                self._comp_buf.prices[:, -count:])
+        msg.prov_msg_list = _to_candle_msgs(prov_times, prov_prices)
+        self._pub_update.publish(msg)
+
+    def _publish_indicators(self, count: int, is_full_reload: bool = False) -> None:
+        msg = IndicatorsUpdate()
+        msg.inst_msg.inst_id = _INST_MNG_DICT[self._inst_id]
+        msg.gran_msg.gran_id = _GRAN_MNG_DICT[self._gran_id]
+        msg.is_full_reload = is_full_reload
+        count = min(count, len(self._indicators))
+        if 0 < count:
+            times = self._indicators.times[-count:]
+            msg.time_list = array.array(
+                "q", times.astype("datetime64[s]").astype(np.int64).tobytes())
+            msg.indicator_msg_list = _to_indicator_msgs(
+                [(spec, self._indicators.values(spec)[:, -count:])
+                 for spec in self._indicators.specs])
+        self._pub_indicators.publish(msg)
+
+    def _request_initial_candles(self) -> Future:
+        dt_now = dt.datetime.now()
+        dt_from = dt_now - self._GRAN_INTERVAL * self._length
+        dt_to = dt_now
+        if 0 < len(self._comp_buf):
+            # Only the candles newer than the snapshot.
+            latest_dt = self._get_latest_datetime_in_dataframe()
+            dt_from = max(dt_from, latest_dt + self._GRAN_INTERVAL)
+
+        self.logger.debug("--- <inst_id:[{}], gran_id:[{}]> Request initial candles"
+                          .format(self.inst_id, self.gran_id))
+        self.logger.debug("  - time_from:[{}]".format(dt_from))
+        self.logger.debug("  - time_to  :[{}]".format(dt_to))
+
+        return self._request_async_candles(dt_from, dt_to)
 
     def _request_async_candles(self,
                                dt_from: dt.datetime,
@@ -517,9 +962,17 @@ class CandlesData():
         req.dt_to = dt_to.strftime(FMT_YMDHMS)
 
         future = CandlesData.cli_cdl.call_async(req)
+        future.add_done_callback(self._on_done_candles)
 
         return future
 
+    def _on_done_candles(self, future: Future) -> None:
+        if CandlesData.scheduler is not None:
+            CandlesData.scheduler.wakeup(self)
+
+
+CandlesData._sm = CandlesData._create_state_machine()
+
 
 class HistoricalCandles(Node):
 
@@ -572,6 +1025,13 @@ class HistoricalCandles(Node):
         self.declare_parameter(self._rosprm.LENG_H12.name)
         self.declare_parameter(self._rosprm.LENG_D.name)
         self.declare_parameter(self._rosprm.LENG_W.name)
+        self.declare_parameter(self._rosprm.RSP_CACHE_MAX_MB.name, 64)
+        self.declare_parameter(self._rosprm.SNAPSHOT_DIR.name, "~/.ros/historical_candles")
+        self.declare_parameter(self._rosprm.SNAPSHOT_INTERVAL.name, 600.0)
+        self.declare_parameter(self._rosprm.ENA_SHARED_MEMORY.name, False)
+        self.declare_parameter(self._rosprm.INDICATOR_SPECS.name, "")
+        self.declare_parameter(self._rosprm.ENA_GAP_SCAN.name, True)
+        self.declare_parameter(self._rosprm.GAP_SCAN_MIN_CANDLES.name, 1)
 
         # Set ROS parameter
         para = self.get_parameter(self._rosprm.ENA_INST_USDJPY.name)
@@ -648,6 +1108,20 @@ class HistoricalCandles(Node):
         self._rosprm.LENG_D.value = para.value
         para = self.get_parameter(self._rosprm.LENG_W.name)
         self._rosprm.LENG_W.value = para.value
+        para = self.get_parameter(self._rosprm.RSP_CACHE_MAX_MB.name)
+        self._rosprm.RSP_CACHE_MAX_MB.value = para.value
+        para = self.get_parameter(self._rosprm.SNAPSHOT_DIR.name)
+        self._rosprm.SNAPSHOT_DIR.value = para.value
+        para = self.get_parameter(self._rosprm.SNAPSHOT_INTERVAL.name)
+        self._rosprm.SNAPSHOT_INTERVAL.value = para.value
+        para = self.get_parameter(self._rosprm.ENA_SHARED_MEMORY.name)
+        self._rosprm.ENA_SHARED_MEMORY.value = para.value
+        para = self.get_parameter(self._rosprm.INDICATOR_SPECS.name)
+        self._rosprm.INDICATOR_SPECS.value = para.value
+        para = self.get_parameter(self._rosprm.ENA_GAP_SCAN.name)
+        self._rosprm.ENA_GAP_SCAN.value = para.value
+        para = self.get_parameter(self._rosprm.GAP_SCAN_MIN_CANDLES.name)
+        self._rosprm.GAP_SCAN_MIN_CANDLES.value = para.value
 
         self.logger.debug("[Param]Enable instrument:")
         self.logger.debug("  - USD/JPY:[{}]".format(self._rosprm.ENA_INST_USDJPY.value))
@@ -689,6 +1163,25 @@ class HistoricalCandles(Node):
         self.logger.debug("  - H12:[{}]".format(self._rosprm.LENG_H12.value))
         self.logger.debug("  - D:  [{}]".format(self._rosprm.LENG_D.value))
         self.logger.debug("  - W:  [{}]".format(self._rosprm.LENG_W.value))
+        self.logger.debug("[Param]Response cache:")
+        self.logger.debug("  - max_mbytes:[{}]".format(self._rosprm.RSP_CACHE_MAX_MB.value))
+        self.logger.debug("[Param]Snapshot:")
+        self.logger.debug("  - directory:[{}]".format(self._rosprm.SNAPSHOT_DIR.value))
+        self.logger.debug("  - interval:[{}]".format(self._rosprm.SNAPSHOT_INTERVAL.value))
+        self.logger.debug("[Param]Shared memory:")
+        self.logger.debug("  - enable:[{}]".format(self._rosprm.ENA_SHARED_MEMORY.value))
+        self.logger.debug("[Param]Indicator:")
+        self.logger.debug("  - specs:[{}]".format(self._rosprm.INDICATOR_SPECS.value))
+        self.logger.debug("[Param]Gap scan:")
+        self.logger.debug("  - enable:[{}]".format(self._rosprm.ENA_GAP_SCAN.value))
+        self.logger.debug("  - min_candles:[{}]".format(self._rosprm.GAP_SCAN_MIN_CANDLES.value))
+
+        try:
+            indicator_spec_dict = self._rosprm.indicator_spec_dict()
+        except ValueError as err:
+            self.logger.error("{:!^50}".format(" Parameter Error "))
+            self.logger.error("{}".format(err))
+            raise InitializerErrorException("\"indicator.specs\" is invalid.")
 
         try:
             # Create service client "Candles"
@@ -700,11 +1193,76 @@ class HistoricalCandles(Node):
             self.logger.error(err)
             raise InitializerErrorException("create service client failed.")
 
+        # The candles are saved into the snapshots periodically and at shutdown,
+        # and loaded at startup so that only newer ones are fetched.
+        CandlesData.snapshot_root = os.path.expanduser(self._rosprm.SNAPSHOT_DIR.value)
+        self._SNAPSHOT_INTERVAL = dt.timedelta(seconds=self._rosprm.SNAPSHOT_INTERVAL.value)
+        self._next_snapshot_time = dt.datetime.now() + self._SNAPSHOT_INTERVAL
+
+        # The completed candles of each series are exported to the shared memory
+        # "historical_candles_<series name>".
+        CandlesData.is_shared_memory = self._rosprm.ENA_SHARED_MEMORY.value
+
+        # The stored candles are scanned for missing ones after each update,
+        # and the gaps are backfilled.
+        if self._rosprm.ENA_GAP_SCAN.value:
+            CandlesData.gap_min_count = self._rosprm.GAP_SCAN_MIN_CANDLES.value
+        else:
+            CandlesData.gap_min_count = 0
+
+        # Each series is woken up at its next update time (or by the response
+        # of its request), and the series sharing a boundary are woken up
+        # together.
+        self._MAX_TIMEOUT_SEC = 10.0
+        self._timer_heap = TimerHeap()
+        CandlesData.scheduler = self
+
+        self._rsp_cache = ResponseCache(self._rosprm.RSP_CACHE_MAX_MB.value * 1024 * 1024)
+
+        # Declare publisher
+        # The latest readiness is kept for late-joining subscribers.
+        qos_profile = QoSProfile(history=QoSHistoryPolicy.KEEP_LAST,
+                                 depth=1,
+                                 reliability=QoSReliabilityPolicy.RELIABLE,
+                                 durability=QoSDurabilityPolicy.TRANSIENT_LOCAL)
+        msg_type = CandlesReadiness
+        topic = "candles_readiness"
+        self._pub_ready = self.create_publisher(msg_type,
+                                                topic,
+                                                qos_profile)
+
+        # The initial candles of all series are requested at once,
+        # and each series is served as soon as its candles are loaded.
+        self._startup_time = dt.datetime.now()
+        # The newly completed and the provisional candles of each series are
+        # published on "candles_update_<series name>", and the indicators of
+        # the newly completed candles on "indicators_update_<series name>".
+        qos_profile = QoSProfile(history=QoSHistoryPolicy.KEEP_ALL,
+                                 reliability=QoSReliabilityPolicy.RELIABLE)
         self._candles_data_list = []
         for gran_data in self._rosprm.enable_gran_list():
             for inst_id in self._rosprm.enable_inst_list():
-                candles_data = CandlesData(self, inst_id, gran_data)
+                series_name = _series_name(inst_id, gran_data.gran_id)
+                msg_type = CandlesUpdate
+                topic = "candles_update_" + series_name
+                pub_update = self.create_publisher(msg_type,
+                                                   topic,
+                                                   qos_profile)
+                spec_list = (indicator_spec_dict.get("", [])
+                             + indicator_spec_dict.get(series_name, []))
+                pub_indicators = None
+                if spec_list:
+                    msg_type = IndicatorsUpdate
+                    topic = "indicators_update_" + series_name
+                    pub_indicators = self.create_publisher(msg_type,
+                                                           topic,
+                                                           qos_profile)
+                candles_data = CandlesData(inst_id, gran_data, pub_update, pub_indicators)
+                for spec in spec_list:
+                    candles_data.register_indicator(spec)
                 self._candles_data_list.append(candles_data)
+                self._schedule(candles_data)
+        self._publish_readiness()
 
         # Create service server "CandlesData"
         srv_type = CandlesDataSrv
@@ -714,16 +1272,85 @@ class HistoricalCandles(Node):
                                            srv_name,
                                            callback)
 
+        # Create service server "IndicatorsData"
+        srv_type = IndicatorsDataSrv
+        srv_name = "indicators_data"
+        callback = self._on_recv_indicators_data
+        self._ind_srv = self.create_service(srv_type,
+                                            srv_name,
+                                            callback)
+
     def do_timeout_event(self) -> None:
         # self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
 
-        for candles_data in self._candles_data_list:
+        is_changed = False
+        for candles_data in self._timer_heap.pop_due(dt.datetime.now()):
+            was_ready = candles_data.is_ready
             candles_data.do_timeout_event()
+            if candles_data.is_ready and not was_ready:
+                is_changed = True
+            self._schedule(candles_data)
             """
             self.logger.debug("inst_id:{}, gran_id:{}"
                               .format(candles_data._inst_id, candles_data._gran_id))
             """
 
+        if is_changed:
+            self._publish_readiness()
+
+        if dt.timedelta(0) < self._SNAPSHOT_INTERVAL:
+            dt_now = dt.datetime.now()
+            if self._next_snapshot_time <= dt_now:
+                self.save_snapshots()
+                self._next_snapshot_time = dt_now + self._SNAPSHOT_INTERVAL
+
+    def get_timeout_sec(self) -> float:
+        next_time = self._timer_heap.peek_time()
+        if dt.timedelta(0) < self._SNAPSHOT_INTERVAL:
+            if (next_time is None) or (self._next_snapshot_time < next_time):
+                next_time = self._next_snapshot_time
+        if next_time is None:
+            return self._MAX_TIMEOUT_SEC
+        timeout_sec = (next_time - dt.datetime.now()).total_seconds()
+        return min(max(timeout_sec, 0.0), self._MAX_TIMEOUT_SEC)
+
+    def wakeup(self, candles_data: CandlesData) -> None:
+        self._timer_heap.push(candles_data, dt.datetime.now())
+
+    def _schedule(self, candles_data: CandlesData) -> None:
+        next_time = candles_data.get_next_event_time()
+        if next_time is None:
+            self._timer_heap.remove(candles_data)
+        else:
+            self._timer_heap.push(candles_data, next_time)
+
+    def destroy_node(self) -> None:
+        for candles_data in self._candles_data_list:
+            candles_data.close()
+        super().destroy_node()
+
+    def save_snapshots(self) -> None:
+        for candles_data in self._candles_data_list:
+            candles_data.save_snapshot()
+
+    def _publish_readiness(self) -> None:
+        msg = CandlesReadiness()
+        for candles_data in self._candles_data_list:
+            if candles_data.is_ready:
+                inst_msg = InstMng()
+                inst_msg.inst_id = _INST_MNG_DICT[candles_data.inst_id]
+                gran_msg = GranMng()
+                gran_msg.gran_id = _GRAN_MNG_DICT[candles_data.gran_id]
+                msg.inst_msg_list.append(inst_msg)
+                msg.gran_msg_list.append(gran_msg)
+        msg.is_all_ready = len(msg.inst_msg_list) == len(self._candles_data_list)
+        self._pub_ready.publish(msg)
+
+        self.logger.info("Candles ready:[{}/{}] (elapsed:[{}])"
+                         .format(len(msg.inst_msg_list),
+                                 len(self._candles_data_list),
+                                 dt.datetime.now() - self._startup_time))
+
     def _create_service_client(self, srv_type: int, srv_name: str) -> Client:
         # Create service client
         cli = self.create_client(srv_type, srv_name)
@@ -734,6 +1361,13 @@ class HistoricalCandles(Node):
             self.logger.info("Waiting for [{}] service...".format(srv_name))
         return cli
 
+    def _find_ready_candles_data(self, inst_id: int, gran_id: int) -> Optional[CandlesData]:
+        for candles_data in self._candles_data_list:
+            if ((inst_id == candles_data.inst_id) and (gran_id == candles_data.gran_id)
+                    and candles_data.is_ready):
+                return candles_data
+        return None
+
     def _on_recv_candles_data(self,
                               req: SrvTypeRequest,
                               rsp: SrvTypeResponse
@@ -747,6 +1381,9 @@ class HistoricalCandles(Node):
         self.logger.debug("  - dayofweeks:[{}]".format(req.dayofweeks))
         self.logger.debug("  - time_from:[{}]".format(req.time_from))
         self.logger.debug("  - time_to:[{}]".format(req.time_to))
+        self.logger.debug("  - is_columnar:[{}]".format(req.is_columnar))
+        self.logger.debug("  - have_until:[{}]".format(req.have_until))
+        self.logger.debug("  - version:[{}]".format(req.version))
 
         inst_id = INST_DICT[req.inst_msg.inst_id]
         gran_id = GRAN_DICT[req.gran_msg.gran_id]
@@ -763,67 +1400,119 @@ class HistoricalCandles(Node):
         else:
             end_time = dt.datetime.strptime(req.time_to, FMT_TIME_HMS).time()
 
-        df_comp = None
-        for candles_data in self._candles_data_list:
-            if ((inst_id == candles_data.inst_id) and (gran_id == candles_data.gran_id)):
-                df_comp = candles_data._df_comp
-                break
+        target = self._find_ready_candles_data(inst_id, gran_id)
 
         rsp.cndl_msg_list = []
-        if df_comp is not None:
+        if target is not None:
 
+            start_dt = None
             if not req.datetime_start == "":
                 start_dt = dt.datetime.strptime(req.datetime_start, FMT_YMDHMS)
                 if gran_id == GranApi.GRAN_D:
                     start_dt = dt.datetime.combine(start_dt.date(), dt.time(6, 0))
-                df_comp = df_comp.loc[start_dt:]
 
+            end_dt = None
             if not req.datetime_end == "":
                 end_dt = dt.datetime.strptime(req.datetime_end, FMT_YMDHMS)
                 if gran_id == GranApi.GRAN_D:
                     end_dt = dt.datetime.combine(end_dt.date(), dt.time(7, 0))
-                df_comp = df_comp.loc[:end_dt]
-
-            if req.dayofweeks:
-                cond = [i in req.dayofweeks for i in df_comp.index.dayofweek]
-                df_comp = df_comp[cond]
-
-            if ((start_time is not None) and (end_time is not None)):
-                df_comp = df_comp.between_time(start_time, end_time)
-            elif ((start_time is not None) and (end_time is None)):
-                df_comp = df_comp.between_time(start_time, MAX_TIME)
-            elif ((start_time is None) and (end_time is not None)):
-                df_comp = df_comp.between_time(MIN_TIME, end_time)
+
+            if not req.have_until == "":
+                have_until = dt.datetime.strptime(req.have_until, FMT_YMDHMS)
+                if (target.is_current_run_version(req.version)
+                        and target.holds_since(have_until)):
+                    # Only the candles newer than "have_until".
+                    newer_dt = have_until + dt.timedelta(seconds=1)
+                    if (start_dt is None) or (start_dt < newer_dt):
+                        start_dt = newer_dt
+                else:
+                    rsp.is_full_reload = True
+
+            key = (inst_id, gran_id, start_dt, end_dt, tuple(sorted(set(req.dayofweeks))),
+                   start_time, end_time, req.is_columnar)
+            candles = self._rsp_cache.get(key, target.version)
+            if candles is None:
+                times, prices = target.select(start_dt, end_dt, req.dayofweeks,
+                                              start_time, end_time)
+                if req.is_columnar:
+                    candles = _to_columnar_candles(times, prices)
+                    size = sum([v.itemsize * len(v) for v in candles.values()])
+                else:
+                    candles = _to_candle_msgs(times, prices)
+                    size = len(candles) * _CANDLE_MSG_BYTES
+                self._rsp_cache.put(key, target.version, candles, size)
+
+            if req.is_columnar:
+                for field, values in candles.items():
+                    setattr(rsp, field, values)
             else:
-                pass
-
-            if not df_comp.empty:
-                for idx, sr in df_comp.iterrows():
-                    msg = Candle()
-                    msg.ask_o = sr[ColName.ASK_OP.value]
-                    msg.ask_h = sr[ColName.ASK_HI.value]
-                    msg.ask_l = sr[ColName.ASK_LO.value]
-                    msg.ask_c = sr[ColName.ASK_CL.value]
-                    msg.mid_o = sr[ColName.MID_OP.value]
-                    msg.mid_h = sr[ColName.MID_HI.value]
-                    msg.mid_l = sr[ColName.MID_LO.value]
-                    msg.mid_c = sr[ColName.MID_CL.value]
-                    msg.bid_o = sr[ColName.BID_OP.value]
-                    msg.bid_h = sr[ColName.BID_HI.value]
-                    msg.bid_l = sr[ColName.BID_LO.value]
-                    msg.bid_c = sr[ColName.BID_CL.value]
-                    msg.time = idx.strftime(FMT_YMDHMS)
-                    rsp.cndl_msg_list.append(msg)
+                rsp.cndl_msg_list = candles
+
+            rsp.version = target.version
+            rsp.prov_msg_list = target.get_prov_msgs()
 
         dbg_tm_end = dt.datetime.now()
         self.logger.debug("<Response>")
         self.logger.debug("  - cndl_msg_list(length):[{}]".format(len(rsp.cndl_msg_list)))
+        self.logger.debug("  - time_list(length):[{}]".format(len(rsp.time_list)))
+        self.logger.debug("  - prov_msg_list(length):[{}]".format(len(rsp.prov_msg_list)))
+        self.logger.debug("  - version:[{}]".format(rsp.version))
+        self.logger.debug("  - is_full_reload:[{}]".format(rsp.is_full_reload))
         self.logger.debug("[Performance]")
         self.logger.debug("  - Response time:[{}]".format(dbg_tm_end - dbg_tm_start))
+        self.logger.debug("  - Cache hit/miss:[{}/{}] ({} entries, {} bytes)"
+                          .format(self._rsp_cache.hits,
+                                  self._rsp_cache.misses,
+                                  len(self._rsp_cache),
+                                  self._rsp_cache.total_bytes))
         self.logger.debug("{:=^50}".format(" Service[historical_candles]:End "))
 
         return rsp
 
+    def _on_recv_indicators_data(self,
+                                 req: SrvTypeRequest,
+                                 rsp: SrvTypeResponse
+                                 ) -> SrvTypeResponse:
+        self.logger.debug("{:=^50}".format(" Service[indicators_data]:Start "))
+        self.logger.debug("<Request>")
+        self.logger.debug("  - gran_msg.gran_id:[{}]".format(req.gran_msg.gran_id))
+        self.logger.debug("  - inst_msg.inst_id:[{}]".format(req.inst_msg.inst_id))
+        self.logger.debug("  - datetime_start:[{}]".format(req.datetime_start))
+        self.logger.debug("  - spec_list:[{}]".format(req.spec_list))
+
+        inst_id = INST_DICT[req.inst_msg.inst_id]
+        gran_id = GRAN_DICT[req.gran_msg.gran_id]
+
+        target = self._find_ready_candles_data(inst_id, gran_id)
+        if target is not None:
+            try:
+                specs = [IndicatorSpec.parse(text) for text in req.spec_list]
+            except ValueError as err:
+                self.logger.error("{:!^50}".format(" Request Error "))
+                self.logger.error("{}".format(err))
+                specs = []
+            else:
+                if not specs:
+                    specs = target.indicator_specs
+
+            start_dt = None
+            if not req.datetime_start == "":
+                start_dt = dt.datetime.strptime(req.datetime_start, FMT_YMDHMS)
+
+            times, spec_values_list = target.select_indicators(specs, start_dt)
+            epoch = times.astype("datetime64[s]").astype(np.int64)
+            rsp.time_list = array.array("q", epoch.tobytes())
+            rsp.indicator_msg_list = _to_indicator_msgs(spec_values_list)
+            rsp.version = target.version
+
+        self.logger.debug("<Response>")
+        self.logger.debug("  - time_list(length):[{}]".format(len(rsp.time_list)))
+        self.logger.debug("  - indicator_msg_list(length):[{}]"
+                          .format(len(rsp.indicator_msg_list)))
+        self.logger.debug("{:=^50}".format(" Service[indicators_data]:End "))
+
+        return rsp
+
 
 def main(args=None):
 
@@ -836,11 +1525,12 @@ def main(args=None):
     else:
         try:
             while rclpy.ok():
-                rclpy.spin_once(hc, timeout_sec=1.0)
+                rclpy.spin_once(hc, timeout_sec=hc.get_timeout_sec())
                 hc.do_timeout_event()
         except KeyboardInterrupt:
             pass
 
+        hc.save_snapshots()
         hc.destroy_node()
 
     rclpy.shutdown()
@@ -0,0 +1,332 @@
+from typing import Dict, List, Tuple
+import math
+from dataclasses import dataclass
+from enum import Enum
+import numpy as np
+from trade_manager.constant import CandleColumnNames as ColName
+from trade_manager.candle_buffer import CandleRingBuffer
+
+# Define Constant value.
+_HIGH_INDEX = CandleRingBuffer.PRICE_COLUMNS.index(ColName.MID_HI.value)
+_LOW_INDEX = CandleRingBuffer.PRICE_COLUMNS.index(ColName.MID_LO.value)
+_CLOSE_INDEX = CandleRingBuffer.PRICE_COLUMNS.index(ColName.MID_CL.value)
+
+
+class IndicatorType(Enum):
+    """
+    Technical indicator, named as in the spec text.
+    """
+    SMA = "sma"
+    EMA = "ema"
+    ATR = "atr"
+    BOLLINGER = "bollinger"
+    RSI = "rsi"
+
+    @property
+    def outputs(self) -> List[str]:
+        if self == IndicatorType.BOLLINGER:
+            return ["middle", "upper", "lower"]
+        return ["value"]
+
+
+@dataclass(frozen=True)
+class IndicatorSpec():
+    """
+    Indicator over the mid prices of a candle series.
+    "k" is the width of Bollinger Bands in standard deviations.
+
+    The spec text is "<type>:<period>[:<k>]", e.g. "sma:20", "bollinger:20:2.0".
+    """
+    type_: IndicatorType
+    period: int
+    k: float = 2.0
+
+    @classmethod
+    def parse(cls, text: str) -> "IndicatorSpec":
+        items = text.strip().lower().split(":")
+        try:
+            type_ = IndicatorType(items[0])
+            period = int(items[1])
+            k_list = [float(v) for v in items[2:]]
+        except (ValueError, IndexError):
+            raise ValueError("invalid indicator spec: [{}]".format(text))
+
+        max_k_count = 1 if type_ == IndicatorType.BOLLINGER else 0
+        if (period <= 0) or (max_k_count < len(k_list)):
+            raise ValueError("invalid indicator spec: [{}]".format(text))
+        return cls(type_, period, *k_list)
+
+    def __str__(self) -> str:
+        if self.type_ == IndicatorType.BOLLINGER:
+            return "{}:{}:{}".format(self.type_.value, self.period, self.k)
+        return "{}:{}".format(self.type_.value, self.period)
+
+
+class _Window():
+    """
+    Last [period] values, with their sum and sum of squares.
+    The values are shifted by the first one, so that the variance of
+    prices far from zero keeps its precision.
+    """
+
+    def __init__(self, period: int) -> None:
+        self._values = [0.0] * period
+        self._pos = 0
+        self._count = 0
+        self._shift = None
+        self._sum = 0.0
+        self._sqsum = 0.0
+
+    @property
+    def is_full(self) -> bool:
+        return self._count == len(self._values)
+
+    def push(self, value: float) -> None:
+        if self._shift is None:
+            self._shift = value
+        value -= self._shift
+        if self.is_full:
+            old = self._values[self._pos]
+            self._sum -= old
+            self._sqsum -= old * old
+        else:
+            self._count += 1
+        self._values[self._pos] = value
+        self._pos = (self._pos + 1) % len(self._values)
+        self._sum += value
+        self._sqsum += value * value
+
+    def mean(self) -> float:
+        return self._shift + self._sum / self._count
+
+    def std(self) -> float:
+        mean = self._sum / self._count
+        return math.sqrt(max(self._sqsum / self._count - mean * mean, 0.0))
+
+
+class _Smoothing():
+    """
+    Exponential smoothing "s += alpha * (x - s)" seeded with the first value,
+    as "Series.ewm(alpha=alpha, adjust=False, min_periods=period)".
+    """
+
+    def __init__(self, alpha: float, period: int) -> None:
+        self._alpha = alpha
+        self._period = period
+        self._count = 0
+        self.value = math.nan
+
+    @property
+    def is_filled(self) -> bool:
+        return self._period <= self._count
+
+    def push(self, value: float) -> None:
+        if self._count == 0:
+            self.value = value
+        else:
+            self.value += self._alpha * (value - self.value)
+        self._count += 1
+
+
+class _SmaState():
+
+    def __init__(self, spec: IndicatorSpec) -> None:
+        self._window = _Window(spec.period)
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, ...]:
+        self._window.push(close)
+        if not self._window.is_full:
+            return (math.nan,)
+        return (self._window.mean(),)
+
+
+class _EmaState():
+
+    def __init__(self, spec: IndicatorSpec) -> None:
+        self._ema = _Smoothing(2 / (spec.period + 1), spec.period)
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, ...]:
+        self._ema.push(close)
+        if not self._ema.is_filled:
+            return (math.nan,)
+        return (self._ema.value,)
+
+
+class _AtrState():
+    # Wilder's smoothing of the true range.
+
+    def __init__(self, spec: IndicatorSpec) -> None:
+        self._atr = _Smoothing(1 / spec.period, spec.period)
+        self._prev_close = None
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, ...]:
+        true_range = high - low
+        if self._prev_close is not None:
+            true_range = max(true_range,
+                             abs(high - self._prev_close),
+                             abs(low - self._prev_close))
+        self._prev_close = close
+        self._atr.push(true_range)
+        if not self._atr.is_filled:
+            return (math.nan,)
+        return (self._atr.value,)
+
+
+class _BollingerState():
+
+    def __init__(self, spec: IndicatorSpec) -> None:
+        self._window = _Window(spec.period)
+        self._k = spec.k
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, ...]:
+        self._window.push(close)
+        if not self._window.is_full:
+            return (math.nan, math.nan, math.nan)
+        middle = self._window.mean()
+        width = self._k * self._window.std()
+        return (middle, middle + width, middle - width)
+
+
+class _RsiState():
+    # Wilder's smoothing of the gains and the losses.
+
+    def __init__(self, spec: IndicatorSpec) -> None:
+        self._gain = _Smoothing(1 / spec.period, spec.period)
+        self._loss = _Smoothing(1 / spec.period, spec.period)
+        self._prev_close = None
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, ...]:
+        if self._prev_close is not None:
+            change = close - self._prev_close
+            self._gain.push(max(change, 0.0))
+            self._loss.push(max(-change, 0.0))
+        self._prev_close = close
+        if not self._gain.is_filled:
+            return (math.nan,)
+        gain = self._gain.value
+        loss = self._loss.value
+        if loss == 0.0:
+            return (100.0 if 0.0 < gain else 50.0,)
+        return (100.0 - 100.0 / (1.0 + gain / loss),)
+
+
+_STATE_CLASS_DICT = {
+    IndicatorType.SMA: _SmaState,
+    IndicatorType.EMA: _EmaState,
+    IndicatorType.ATR: _AtrState,
+    IndicatorType.BOLLINGER: _BollingerState,
+    IndicatorType.RSI: _RsiState,
+}
+
+
+class IndicatorEngine():
+    """
+    Technical indicators of a candle series, updated incrementally.
+
+    Each registered indicator keeps a rolling state, so appending a candle
+    costs O(1) per indicator instead of a computation over the whole series.
+    The rows follow the ones of the "CandleRingBuffer" of the series: the
+    values are stored in a ring of the same capacity and layout, and given
+    as read-only views aligned with the candle times.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._times = np.empty(2 * capacity, dtype="datetime64[ns]")
+        self._head = 0
+        self._length = 0
+        # spec -> [state, values]
+        self._indicators: Dict[IndicatorSpec, list] = {}
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def specs(self) -> List[IndicatorSpec]:
+        return list(self._indicators.keys())
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._view(self._times[self._head:self._head + self._length])
+
+    def values(self, spec: IndicatorSpec) -> np.ndarray:
+        """
+        Values shaped (len(spec.type_.outputs), len(self)). NaN until
+        enough candles are stored.
+        """
+        _, values = self._indicators[spec]
+        return self._view(values[:, self._head:self._head + self._length])
+
+    def register(self, spec: IndicatorSpec, prices: np.ndarray) -> None:
+        """
+        Add an indicator computed over "prices", the prices of the stored
+        rows (shaped as "CandleRingBuffer.prices").
+        """
+        if spec in self._indicators:
+            return
+        if prices.shape[1] != self._length:
+            raise ValueError("prices do not match the stored rows: [{}]"
+                             .format(prices.shape[1]))
+        state = _STATE_CLASS_DICT[spec.type_](spec)
+        values = np.full((len(spec.type_.outputs), 2 * self._capacity), np.nan)
+        self._indicators[spec] = [state, values]
+        self._write(values, self._head, self._update(spec, state, prices))
+
+    def append(self, times: np.ndarray, prices: np.ndarray) -> None:
+        """
+        Append the rows just appended to the "CandleRingBuffer",
+        i.e. the last "len(times)" rows of it.
+        """
+        if self._capacity < len(times):
+            # Only the states are updated with the overwritten rows.
+            skip = len(times) - self._capacity
+            for spec, (state, _) in self._indicators.items():
+                self._update(spec, state, prices[:, :skip])
+            times = times[skip:]
+            prices = prices[:, skip:]
+
+        pos = (self._head + self._length) % self._capacity
+        self._write(self._times[np.newaxis], pos, times[np.newaxis])
+        for spec, (state, values) in self._indicators.items():
+            self._write(values, pos, self._update(spec, state, prices))
+
+        overflow = self._length + len(times) - self._capacity
+        if 0 < overflow:
+            self._head = (self._head + overflow) % self._capacity
+            self._length = self._capacity
+        else:
+            self._length += len(times)
+
+    def clear(self) -> None:
+        """
+        Remove the rows and reset the states, keeping the registered indicators.
+        """
+        self._head = 0
+        self._length = 0
+        for spec, indicator in self._indicators.items():
+            indicator[0] = _STATE_CLASS_DICT[spec.type_](spec)
+
+    def _update(self,
+                spec: IndicatorSpec,
+                state: object,
+                prices: np.ndarray
+                ) -> np.ndarray:
+        rows = [state.update(high, low, close)
+                for high, low, close in zip(prices[_HIGH_INDEX].tolist(),
+                                            prices[_LOW_INDEX].tolist(),
+                                            prices[_CLOSE_INDEX].tolist())]
+        rows = np.array(rows, dtype=np.float64).reshape(len(rows), len(spec.type_.outputs))
+        return rows.T
+
+    def _write(self, array: np.ndarray, pos: int, rows: np.ndarray) -> None:
+        # Each row is written twice, at "i" and "i + capacity".
+        count = rows.shape[1]
+        first = min(count, self._capacity - pos)
+        for start, src in ((pos, rows[:, :first]), (0, rows[:, first:])):
+            end = start + src.shape[1]
+            array[:, start:end] = src
+            array[:, start + self._capacity:end + self._capacity] = src
+
+    def _view(self, array: np.ndarray) -> np.ndarray:
+        array.flags.writeable = False
+        return array
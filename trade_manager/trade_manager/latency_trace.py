@@ -0,0 +1,119 @@
+from typing import List, TypeVar
+from bisect import bisect_left
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+
+MsgType = TypeVar("MsgType")
+StampType = TypeVar("StampType")
+
+
+class LatencyHistogram():
+    """
+    Histogram of latencies on fixed log-scale buckets. [msec]
+    """
+
+    # Define Constant value.
+    BOUNDS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500,
+                 1000, 2000, 5000, 10000, 30000, 60000)
+
+    def __init__(self) -> None:
+        self._counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def mean(self) -> float:
+        if self._count == 0:
+            return 0.0
+        return self._sum / self._count
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    def add(self, value_ms: float) -> None:
+        self._counts[bisect_left(self.BOUNDS_MS, value_ms)] += 1
+        self._count += 1
+        self._sum += value_ms
+        self._max = max(self._max, value_ms)
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-quantile.
+        The last bucket is bounded by the maximum value.
+        """
+        rank = q * self._count
+        cum = 0
+        for bound, count in zip(self.BOUNDS_MS, self._counts):
+            cum += count
+            if (0 < cum) and (rank <= cum):
+                return min(bound, self._max)
+        return self._max
+
+    def to_key_values(self) -> List[MsgType]:
+        values = [
+            KeyValue(key="count", value=str(self._count)),
+            KeyValue(key="mean_ms", value="{:.3f}".format(self.mean)),
+            KeyValue(key="p50_ms", value="{:.3f}".format(self.quantile(0.50))),
+            KeyValue(key="p90_ms", value="{:.3f}".format(self.quantile(0.90))),
+            KeyValue(key="p99_ms", value="{:.3f}".format(self.quantile(0.99))),
+            KeyValue(key="max_ms", value="{:.3f}".format(self._max)),
+        ]
+        for bound, count in zip(self.BOUNDS_MS, self._counts):
+            values.append(KeyValue(key="le_{}ms".format(bound), value=str(count)))
+        values.append(KeyValue(key="gt_{}ms".format(self.BOUNDS_MS[-1]),
+                               value=str(self._counts[-1])))
+        return values
+
+
+class LatencyTracer():
+    """
+    Per-stage latency histograms of the order path.
+
+    Stages of a service call are named "<service name>.<stage>":
+      - request:     client sent -> server received
+      - server:      server received -> OANDA API called
+      - oanda_api:   OANDA API called -> OANDA API returned
+      - response:    OANDA API returned -> client received
+      - round_trip:  client sent -> client received
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._hists = {}
+
+    def add(self, stage: str, start_ns: int, end_ns: int) -> None:
+        """
+        Add a latency. It is ignored if either time is not stamped ("0").
+        """
+        if (start_ns <= 0) or (end_ns <= 0):
+            return
+        hist = self._hists.get(stage)
+        if hist is None:
+            hist = self._hists[stage] = LatencyHistogram()
+        hist.add((end_ns - start_ns) / 1e6)
+
+    def add_service(self, srv_name: str, trace_msg: MsgType, done_ns: int) -> None:
+        self.add(srv_name + ".request", trace_msg.request_ns, trace_msg.receive_ns)
+        self.add(srv_name + ".server", trace_msg.receive_ns, trace_msg.api_start_ns)
+        self.add(srv_name + ".oanda_api", trace_msg.api_start_ns, trace_msg.api_end_ns)
+        self.add(srv_name + ".response", trace_msg.api_end_ns, done_ns)
+        self.add(srv_name + ".round_trip", trace_msg.request_ns, done_ns)
+
+    def to_diagnostic_array(self, stamp: StampType) -> MsgType:
+        msg = DiagnosticArray()
+        msg.header.stamp = stamp
+        for stage, hist in sorted(self._hists.items()):
+            status = DiagnosticStatus()
+            status.level = DiagnosticStatus.OK
+            status.name = "{}: latency {}".format(self._name, stage)
+            status.hardware_id = self._name
+            status.message = ("p50 {:.3f} ms, p99 {:.3f} ms"
+                              .format(hist.quantile(0.50), hist.quantile(0.99)))
+            status.values = hist.to_key_values()
+            msg.status.append(status)
+        return msg
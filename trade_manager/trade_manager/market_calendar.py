@@ -0,0 +1,125 @@
+from typing import Tuple
+import functools
+import datetime as dt
+import numpy as np
+import pandas as pd
+from trade_manager.constant import WeekDay
+
+# Define Constant value.
+_TZ_NEW_YORK = "America/New_York"
+_SUMMER_TIME_OPEN_CLOSE = dt.time(6, 0)
+_WINTER_TIME_OPEN_CLOSE = dt.time(7, 0)
+_FIRST_YEAR = 2000
+_YEARS_AHEAD = 10
+
+
+def _is_summer_time_tz(date_: dt.date) -> bool:
+    pddt = pd.Timestamp(date_.isoformat() + " 03:00:00", tz=_TZ_NEW_YORK)
+    return 3600 <= pddt.dst().seconds
+
+
+class MarketCalendar():
+    """
+    Market hours precomputed for the years [first_year, last_year].
+
+    The market opens on Monday and closes on Saturday, at 06:00 in the
+    summer time of New York and at 07:00 otherwise. The summer time of
+    each date, and the close and open times of each weekend, are computed
+    once, so a date is looked up in O(1) and whole arrays of times are
+    masked with "searchsorted".
+    Dates out of the span are computed on each call.
+    """
+
+    def __init__(self, first_year: int, last_year: int) -> None:
+        first_date = dt.date(first_year, 1, 1)
+        last_date = dt.date(last_year, 12, 31)
+        self._first_ordinal = first_date.toordinal()
+
+        # The UTC offset in the summer time is the larger one.
+        dates = pd.date_range(first_date, last_date, freq="D")
+        stamps = (dates + pd.Timedelta(hours=3)).tz_localize(_TZ_NEW_YORK)
+        offsets = (stamps.tz_localize(None) - stamps.tz_convert(None)).to_numpy()
+        self._is_summer = offsets != offsets.min()
+
+        is_saturday = dates.weekday == WeekDay.SAT.value
+        saturdays = dates[is_saturday].to_numpy()
+        mondays = saturdays + np.timedelta64(2, "D")
+        summer_ofs = np.timedelta64(_SUMMER_TIME_OPEN_CLOSE.hour, "h")
+        winter_ofs = np.timedelta64(_WINTER_TIME_OPEN_CLOSE.hour, "h")
+        closes = saturdays + np.where(self._is_summer[is_saturday], summer_ofs, winter_ofs)
+        mondays_idx = np.nonzero(is_saturday)[0] + 2
+        # The Monday after the last date is out of the span.
+        is_monday_summer = self._is_summer[np.minimum(mondays_idx, len(dates) - 1)]
+        opens = mondays + np.where(is_monday_summer, summer_ofs, winter_ofs)
+        self._closes = closes.astype("datetime64[ns]")
+        self._opens = opens.astype("datetime64[ns]")
+
+    def is_summer_time(self, date_: dt.date) -> bool:
+        idx = date_.toordinal() - self._first_ordinal
+        if 0 <= idx < len(self._is_summer):
+            return bool(self._is_summer[idx])
+        return _is_summer_time_tz(date_)
+
+    def get_market_open_time(self, date_: dt.date) -> dt.time:
+        if self.is_summer_time(date_):
+            return _SUMMER_TIME_OPEN_CLOSE
+        return _WINTER_TIME_OPEN_CLOSE
+
+    def get_market_close_time(self, date_: dt.date) -> dt.time:
+        if self.is_summer_time(date_):
+            return _SUMMER_TIME_OPEN_CLOSE
+        return _WINTER_TIME_OPEN_CLOSE
+
+    def is_market_close(self, dt_: dt.datetime) -> bool:
+        weekday = dt_.weekday()
+        if weekday == WeekDay.SAT.value:
+            return self.get_market_close_time(dt_.date()) <= dt_.time()
+        if weekday == WeekDay.SUN.value:
+            return True
+        if weekday == WeekDay.MON.value:
+            return dt_.time() < self.get_market_open_time(dt_.date())
+        return False
+
+    def weekend_closures(self,
+                         first: np.datetime64,
+                         last: np.datetime64
+                         ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (closes, opens) of the weekends from the one including or
+        before "first" to the one after "last", oldest first: the close
+        time on Saturday and the open time on the next Monday.
+        """
+        first_idx = np.searchsorted(self._opens, np.datetime64(first, "ns"), side="right")
+        last_idx = np.searchsorted(self._closes, np.datetime64(last, "ns"), side="right")
+        first_idx = max(first_idx - 1, 0)
+        last_idx = min(last_idx + 1, len(self._closes))
+        return self._closes[first_idx:last_idx], self._opens[first_idx:last_idx]
+
+    def is_open_mask(self, times: np.ndarray) -> np.ndarray:
+        """
+        Whether the market is open at each of "times", as "is_market_close".
+        """
+        times = np.asarray(times, dtype="datetime64[ns]")
+        idx = np.searchsorted(self._closes, times, side="right") - 1
+        in_weekend = (0 <= idx) & (times < self._opens[np.maximum(idx, 0)])
+        return ~in_weekend
+
+    def week_start_times(self, times: np.ndarray) -> np.ndarray:
+        """
+        The open time of the trading week (Monday open to Saturday close)
+        of each of "times". The times in a weekend belong to the previous
+        week, and the times before the span are NaT.
+        Comparing the result to a week's open time masks the week.
+        """
+        times = np.asarray(times, dtype="datetime64[ns]")
+        idx = np.searchsorted(self._opens, times, side="right") - 1
+        week_starts = self._opens[np.maximum(idx, 0)]
+        return np.where(0 <= idx, week_starts, np.datetime64("NaT", "ns"))
+
+
+@functools.lru_cache(maxsize=None)
+def get_market_calendar() -> MarketCalendar:
+    """
+    Calendar shared in the process, from 2000 to ten years ahead.
+    """
+    return MarketCalendar(_FIRST_YEAR, dt.date.today().year + _YEARS_AHEAD)
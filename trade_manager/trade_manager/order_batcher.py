@@ -0,0 +1,96 @@
+from typing import List, Optional, Tuple, TypeVar
+from functools import partial
+import datetime as dt
+from rclpy.client import Client
+from rclpy.task import Future
+from api_msgs.srv import OrderCreateSrv, OrderCreateBulkSrv
+from api_msgs.msg import OrderCreate
+
+MsgType = TypeVar("MsgType")
+
+
+class OrderCreateBatcher():
+    """
+    Collect "order_create" requests for a short window and send them in one
+    "order_create_bulk" call, whose orders are sent to the broker concurrently.
+
+    "call_async" has the same interface as the "order_create" client. The
+    returned future is set with the "OrderCreateSrv" response of its own
+    order, mapped back by the position in the bulk request.
+    """
+
+    def __init__(self, cli_bulk: Client, window_sec: float, max_size: int) -> None:
+        self._cli_bulk = cli_bulk
+        self._window = dt.timedelta(seconds=window_sec)
+        self._max_size = max_size
+        self._pending: List[Tuple[MsgType, Future]] = []
+        self._flush_time = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def srv_name(self) -> str:
+        return self._cli_bulk.srv_name
+
+    @property
+    def flush_time(self) -> Optional[dt.datetime]:
+        """
+        Time when the pending requests have to be sent.
+        "None" means there is no pending request.
+        """
+        return self._flush_time
+
+    def call_async(self, req: MsgType) -> Future:
+        future = Future()
+        if not self._pending:
+            self._flush_time = dt.datetime.now() + self._window
+        self._pending.append((req, future))
+        if self._max_size <= len(self._pending):
+            self.flush()
+        return future
+
+    def flush(self) -> None:
+        """
+        Send the pending requests now.
+        """
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = []
+        self._flush_time = None
+
+        bulk_req = OrderCreateBulkSrv.Request()
+        for req, _ in pending:
+            order_msg = OrderCreate()
+            order_msg.ordertype_msg = req.ordertype_msg
+            order_msg.price = req.price
+            order_msg.inst_msg = req.inst_msg
+            order_msg.units = req.units
+            order_msg.take_profit_price = req.take_profit_price
+            order_msg.stop_loss_price = req.stop_loss_price
+            order_msg.trace_msg = req.trace_msg
+            bulk_req.order_msg_list.append(order_msg)
+
+        futures = [future for _, future in pending]
+        try:
+            bulk_future = self._cli_bulk.call_async(bulk_req)
+        except Exception:
+            for future in futures:
+                future.set_result(None)
+            raise
+        bulk_future.add_done_callback(partial(self._on_done_bulk, futures))
+
+    def _on_done_bulk(self, futures: List[Future], bulk_future: Future) -> None:
+        bulk_rsp = bulk_future.result()
+        for i, future in enumerate(futures):
+            if (bulk_rsp is None) or (len(bulk_rsp.result_msg_list) <= i):
+                future.set_result(None)
+                continue
+            result_msg = bulk_rsp.result_msg_list[i]
+            rsp = OrderCreateSrv.Response()
+            rsp.result = result_msg.result
+            rsp.frc_msg = result_msg.frc_msg
+            rsp.id = result_msg.id
+            rsp.trace_msg = result_msg.trace_msg
+            future.set_result(rsp)
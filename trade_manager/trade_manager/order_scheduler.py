@@ -1,33 +1,81 @@
 import sys
-import gc
-from typing import TypeVar
+import time
+import uuid
+from typing import Any, Dict, Optional, Set, TypeVar, List
+from dataclasses import dataclass
+from functools import partial
+from collections import deque
 from enum import Enum, auto
 import datetime as dt
-from transitions import Machine
-# from transitions.extensions.factory import GraphMachine as Machine
-from transitions.extensions.factory import GraphMachine
 import rclpy
 from rclpy.node import Node
 from rclpy.qos import QoSProfile, QoSHistoryPolicy, QoSReliabilityPolicy
 from rclpy.client import Client
+from rclpy.task import Future
 from std_msgs.msg import Bool
+from diagnostic_msgs.msg import DiagnosticArray
 from trade_manager.constant import Transitions as Tr
 from trade_manager.constant import FMT_YMDHMS, FMT_YMDHMSF
 from trade_manager.constant import INST_DICT, ORDER_TYP_DICT
 from trade_manager.exception import InitializerErrorException
+from trade_manager.timer_heap import TimerHeap
+from trade_manager.state_machine import StateMachine
+from trade_manager.ticket_journal import TicketJournal
+from trade_manager.latency_trace import LatencyTracer
+from trade_manager.trigger_engine import TriggerEngine, TriggerSide
+from trade_manager.order_batcher import OrderCreateBatcher
+from trade_manager.utility import RosParam
+from oanda_api.lazy_logger import LazyLogger, get_severity
 from trade_manager_msgs.msg import OrderRequest
+from trade_manager_msgs.msg import Instrument as InstMng
 from api_msgs.srv import (OrderCreateSrv, TradeDetailsSrv,
                           TradeCRCDOSrv, TradeCloseSrv,
-                          OrderDetailsSrv, OrderCancelSrv)
+                          OrderDetailsSrv, OrderCancelSrv,
+                          OrderTradeListSrv, OrderCreateBulkSrv)
 from api_msgs.msg import OrderState, TradeState
+from api_msgs.msg import Pricing
 from api_msgs.msg import FailReasonCode as frc
 
 MsgType = TypeVar("MsgType")
 
+_JOURNAL_MSG_FIELDS = ("order_type", "order_dir", "units", "entry_price",
+                       "entry_exp_time", "take_profit_price", "stop_loss_price",
+                       "exit_exp_time", "trace_id", "is_local_trigger")
+
+
+@dataclass
+class _RosParams():
+    """
+    ROS Parameter.
+    """
+    JOURNAL_PATH = RosParam("journal.path")
+    JOURNAL_COMPACT_COUNT = RosParam("journal.compact_count")
+    TRACE_PUBLISH_PERIOD = RosParam("trace.publish_period")
+    ORDER_BATCH_WINDOW = RosParam("order_batch.window")
+    ORDER_BATCH_MAX_SIZE = RosParam("order_batch.max_size")
+    LOG_LEVEL = RosParam("log_level")
+    LOG_LEVEL_TICKET = RosParam("log_level_ticket")
+
+
+def _order_request_to_dict(msg: MsgType) -> Dict[str, Any]:
+    data = {field: getattr(msg, field) for field in _JOURNAL_MSG_FIELDS}
+    data["inst_id"] = msg.inst_msg.inst_id
+    return data
+
+
+def _order_request_from_dict(data: Dict[str, Any]) -> MsgType:
+    msg = OrderRequest()
+    for field in _JOURNAL_MSG_FIELDS:
+        if field in data:
+            setattr(msg, field, data[field])
+    msg.inst_msg.inst_id = data["inst_id"]
+    return msg
+
 
 class OrderTicket():
 
     class States(Enum):
+        EntryTriggering = auto()
         EntryOrdering = auto()
         EntryWaiting = auto()
         EntryChecking = auto()
@@ -37,71 +85,120 @@ class OrderTicket():
         ExitOrdering = auto()
         Complete = auto()
 
+    # State to be resumed from after restart.
+    _RESUME_STATE_DICT = {
+        States.EntryTriggering: States.EntryTriggering,
+        States.EntryOrdering: States.EntryOrdering,
+        States.EntryWaiting: States.EntryWaiting,
+        States.EntryChecking: States.EntryWaiting,
+        States.EntryCanceling: States.EntryCanceling,
+        States.ExitWaiting: States.ExitWaiting,
+        States.ExitChecking: States.ExitWaiting,
+        States.ExitOrdering: States.ExitOrdering,
+        States.Complete: States.Complete,
+    }
+
+    __slots__ = ("state", "_ticket_id", "_msg", "_future", "_trade_id", "_order_id",
+                 "_entry_exp_time", "_exit_exp_time", "_is_entry_exp_time_over",
+                 "_is_trans_lock_waiting", "_trans_lock_retry_time", "_next_pol_time",
+                 "_journal_rec", "_is_triggered")
+
     cli_ordcre = None
     cli_orddet = None
     cli_ordcnc = None
     cli_trddet = None
     cli_trdcrc = None
     cli_trdcls = None
+    order_batcher = None
 
     logger = None
+    scheduler = None
+    journal = None
+    tracer = None
+    trigger_engine = None
 
-    _is_trans_lock = False
+    # Define Constant value.
+    _POL_INTERVAL = dt.timedelta(minutes=1)
+    _LOG_THROTTLE_SEC = 1.0
 
-    def __init__(self, msg: MsgType) -> None:
+    _sm = None
 
-        # Define Constant value.
-        self._POL_INTERVAL = dt.timedelta(minutes=1)
+    _is_trans_lock = False
+    _trans_lock_waiters = deque()
 
-        # ---------- Create State Machine ----------
+    @classmethod
+    def _create_state_machine(cls) -> StateMachine:
         states = [
             {
-                Tr.NAME.value: self.States.EntryOrdering,
+                Tr.NAME.value: cls.States.EntryTriggering,
+                Tr.ON_ENTER.value: "_on_enter_EntryTriggering",
+                Tr.ON_EXIT.value: "_on_exit_EntryTriggering"
+            },
+            {
+                Tr.NAME.value: cls.States.EntryOrdering,
                 Tr.ON_ENTER.value: None,
                 Tr.ON_EXIT.value: None
             },
             {
-                Tr.NAME.value: self.States.EntryWaiting,
+                Tr.NAME.value: cls.States.EntryWaiting,
                 Tr.ON_ENTER.value: "_on_entry_EntryWaiting",
                 Tr.ON_EXIT.value: None
             },
             {
-                Tr.NAME.value: self.States.EntryChecking,
+                Tr.NAME.value: cls.States.EntryChecking,
                 Tr.ON_ENTER.value: "_on_enter_EntryChecking",
                 Tr.ON_EXIT.value: "_on_exit_EntryChecking"
             },
             {
-                Tr.NAME.value: self.States.EntryCanceling,
+                Tr.NAME.value: cls.States.EntryCanceling,
                 Tr.ON_ENTER.value: "_on_enter_EntryCanceling",
                 Tr.ON_EXIT.value: None
             },
             {
-                Tr.NAME.value: self.States.ExitWaiting,
+                Tr.NAME.value: cls.States.ExitWaiting,
                 Tr.ON_ENTER.value: "_on_entry_ExitWaiting",
                 Tr.ON_EXIT.value: None
             },
             {
-                Tr.NAME.value: self.States.ExitChecking,
+                Tr.NAME.value: cls.States.ExitChecking,
                 Tr.ON_ENTER.value: "_on_enter_ExitChecking",
                 Tr.ON_EXIT.value: "_on_exit_ExitChecking"
             },
             {
-                Tr.NAME.value: self.States.ExitOrdering,
+                Tr.NAME.value: cls.States.ExitOrdering,
                 Tr.ON_ENTER.value: "_on_enter_ExitOrdering",
                 Tr.ON_EXIT.value: None
             },
             {
-                Tr.NAME.value: self.States.Complete,
+                Tr.NAME.value: cls.States.Complete,
                 Tr.ON_ENTER.value: None,
                 Tr.ON_EXIT.value: None
             },
         ]
 
         transitions = [
+            {
+                Tr.TRIGGER.value: "_trans_from_EntryOrdering_to_EntryTriggering",
+                Tr.SOURCE.value: cls.States.EntryOrdering,
+                Tr.DEST.value: cls.States.EntryTriggering,
+                Tr.PREPARE.value: None,
+                Tr.BEFORE.value: None,
+                Tr.AFTER.value: None,
+                Tr.CONDITIONS.value: None
+            },
+            {
+                Tr.TRIGGER.value: "_trans_from_EntryTriggering_to_EntryOrdering",
+                Tr.SOURCE.value: cls.States.EntryTriggering,
+                Tr.DEST.value: cls.States.EntryOrdering,
+                Tr.PREPARE.value: None,
+                Tr.BEFORE.value: None,
+                Tr.AFTER.value: None,
+                Tr.CONDITIONS.value: None
+            },
             {
                 Tr.TRIGGER.value: "_trans_from_EntryOrdering_to_ExitWaiting",
-                Tr.SOURCE.value: self.States.EntryOrdering,
-                Tr.DEST.value: self.States.ExitWaiting,
+                Tr.SOURCE.value: cls.States.EntryOrdering,
+                Tr.DEST.value: cls.States.ExitWaiting,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -109,8 +206,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_EntryOrdering_to_EntryWaiting",
-                Tr.SOURCE.value: self.States.EntryOrdering,
-                Tr.DEST.value: self.States.EntryWaiting,
+                Tr.SOURCE.value: cls.States.EntryOrdering,
+                Tr.DEST.value: cls.States.EntryWaiting,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -118,8 +215,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_EntryWaiting_to_EntryChecking",
-                Tr.SOURCE.value: self.States.EntryWaiting,
-                Tr.DEST.value: self.States.EntryChecking,
+                Tr.SOURCE.value: cls.States.EntryWaiting,
+                Tr.DEST.value: cls.States.EntryChecking,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -127,8 +224,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_EntryChecking_to_EntryWaiting",
-                Tr.SOURCE.value: self.States.EntryChecking,
-                Tr.DEST.value: self.States.EntryWaiting,
+                Tr.SOURCE.value: cls.States.EntryChecking,
+                Tr.DEST.value: cls.States.EntryWaiting,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -137,8 +234,8 @@ class OrderTicket():
 
             {
                 Tr.TRIGGER.value: "_trans_from_EntryWaiting_to_EntryCanceling",
-                Tr.SOURCE.value: self.States.EntryWaiting,
-                Tr.DEST.value: self.States.EntryCanceling,
+                Tr.SOURCE.value: cls.States.EntryWaiting,
+                Tr.DEST.value: cls.States.EntryCanceling,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -146,8 +243,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_EntryCanceling_to_Complete",
-                Tr.SOURCE.value: self.States.EntryCanceling,
-                Tr.DEST.value: self.States.Complete,
+                Tr.SOURCE.value: cls.States.EntryCanceling,
+                Tr.DEST.value: cls.States.Complete,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -155,8 +252,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_EntryCanceling_to_EntryChecking",
-                Tr.SOURCE.value: self.States.EntryCanceling,
-                Tr.DEST.value: self.States.EntryChecking,
+                Tr.SOURCE.value: cls.States.EntryCanceling,
+                Tr.DEST.value: cls.States.EntryChecking,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -165,8 +262,8 @@ class OrderTicket():
 
             {
                 Tr.TRIGGER.value: "_trans_from_EntryChecking_to_ExitWaiting",
-                Tr.SOURCE.value: self.States.EntryChecking,
-                Tr.DEST.value: self.States.ExitWaiting,
+                Tr.SOURCE.value: cls.States.EntryChecking,
+                Tr.DEST.value: cls.States.ExitWaiting,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -174,8 +271,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_ExitWaiting_to_ExitChecking",
-                Tr.SOURCE.value: self.States.ExitWaiting,
-                Tr.DEST.value: self.States.ExitChecking,
+                Tr.SOURCE.value: cls.States.ExitWaiting,
+                Tr.DEST.value: cls.States.ExitChecking,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -183,8 +280,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_ExitChecking_to_ExitWaiting",
-                Tr.SOURCE.value: self.States.ExitChecking,
-                Tr.DEST.value: self.States.ExitWaiting,
+                Tr.SOURCE.value: cls.States.ExitChecking,
+                Tr.DEST.value: cls.States.ExitWaiting,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -192,8 +289,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_ExitChecking_to_Complete",
-                Tr.SOURCE.value: self.States.ExitChecking,
-                Tr.DEST.value: self.States.Complete,
+                Tr.SOURCE.value: cls.States.ExitChecking,
+                Tr.DEST.value: cls.States.Complete,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -201,8 +298,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_ExitWaiting_to_ExitOrdering",
-                Tr.SOURCE.value: self.States.ExitWaiting,
-                Tr.DEST.value: self.States.ExitOrdering,
+                Tr.SOURCE.value: cls.States.ExitWaiting,
+                Tr.DEST.value: cls.States.ExitOrdering,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -210,8 +307,8 @@ class OrderTicket():
             },
             {
                 Tr.TRIGGER.value: "_trans_from_ExitOrdering_to_Complete",
-                Tr.SOURCE.value: self.States.ExitOrdering,
-                Tr.DEST.value: self.States.Complete,
+                Tr.SOURCE.value: cls.States.ExitOrdering,
+                Tr.DEST.value: cls.States.Complete,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -220,7 +317,7 @@ class OrderTicket():
             {
                 Tr.TRIGGER.value: "_trans_to_Complete",
                 Tr.SOURCE.value: "*",
-                Tr.DEST.value: self.States.Complete,
+                Tr.DEST.value: cls.States.Complete,
                 Tr.PREPARE.value: None,
                 Tr.BEFORE.value: None,
                 Tr.AFTER.value: None,
@@ -228,14 +325,22 @@ class OrderTicket():
             },
         ]
 
-        self._sm = Machine(model=self,
-                           states=states,
-                           initial=self.States.EntryOrdering,
-                           transitions=transitions)
+        return StateMachine(model_cls=cls,
+                            states=states,
+                            initial=cls.States.EntryOrdering,
+                            transitions=transitions,
+                            after_state_change="_on_state_changed")
 
-        if isinstance(self._sm, GraphMachine):
-            self._sm.get_graph().view()
+    def __init__(self,
+                 ticket_id: int,
+                 msg: MsgType,
+                 restore_rec: Dict[str, Any] = None
+                 ) -> None:
 
+        # ---------- Initialize State Machine ----------
+        OrderTicket._sm.init_model(self)
+
+        self._ticket_id = ticket_id
         self._msg = msg
         self._future = None
         self._trade_id = None
@@ -255,24 +360,51 @@ class OrderTicket():
                                                        FMT_YMDHMS)
 
         self._is_entry_exp_time_over = False
+        self._is_trans_lock_waiting = False
+        self._trans_lock_retry_time = None
+        self._next_pol_time = None
+        self._journal_rec = None
+        self._is_triggered = False
 
         self.logger.debug("----- init -----")
+        self.logger.debug("  - ticket_id:[{}]", self._ticket_id)
         if not self._msg.order_type == OrderRequest.ORDER_TYP_MARKET:
-            self.logger.debug("  - entry_exp_time:[{}]".format(self._entry_exp_time))
-        self.logger.debug("  - exit_exp_time:[{}]".format(self._exit_exp_time))
+            self.logger.debug("  - entry_exp_time:[{}]", self._entry_exp_time)
+        self.logger.debug("  - exit_exp_time:[{}]", self._exit_exp_time)
 
-        self.do_timeout_event()
+        if restore_rec is None:
+            self._write_journal(msg=_order_request_to_dict(self._msg))
+            if self._msg.is_local_trigger:
+                self._trans_from_EntryOrdering_to_EntryTriggering()
+            else:
+                self.do_timeout_event()
+        else:
+            self._restore(restore_rec)
+
+    @property
+    def ticket_id(self) -> int:
+        return self._ticket_id
+
+    @property
+    def order_id(self) -> Optional[int]:
+        return self._order_id
+
+    @property
+    def trade_id(self) -> Optional[int]:
+        return self._trade_id
 
     def __del__(self) -> None:
         self.logger.debug("----- del -----")
-        self.logger.debug("  - order_id:[{}]".format(self._order_id))
-        self.logger.debug("  - trade_id:[{}]".format(self._trade_id))
+        self.logger.debug("  - order_id:[{}]", self._order_id)
+        self.logger.debug("  - trade_id:[{}]", self._trade_id)
 
     def do_timeout_event(self) -> None:
 
-        self.logger.debug("state:[{}]".format(self.state))
+        self.logger.debug("state:[{}]", self.state, throttle_sec=self._LOG_THROTTLE_SEC)
 
-        if self.state == self.States.EntryOrdering:
+        if self.state == self.States.EntryTriggering:
+            self._on_do_EntryTriggering()
+        elif self.state == self.States.EntryOrdering:
             self._on_do_EntryOrdering()
         elif self.state == self.States.EntryWaiting:
             self._on_do_EntryWaiting()
@@ -291,15 +423,60 @@ class OrderTicket():
         else:
             pass
 
+    def _on_enter_EntryTriggering(self) -> None:
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
+        OrderTicket.trigger_engine.add(self._msg.inst_msg.inst_id,
+                                       self._get_trigger_side(),
+                                       self._msg.entry_price,
+                                       self)
+
+    def _on_do_EntryTriggering(self) -> None:
+        now = dt.datetime.now()
+        if ((self._entry_exp_time is not None) and (self._entry_exp_time < now)):
+            self.logger.debug("  Local trigger expired.(ticket_id:[{}])", self._ticket_id)
+            self._trans_to_Complete()
+
+    def _on_exit_EntryTriggering(self) -> None:
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
+        OrderTicket.trigger_engine.remove(self._msg.inst_msg.inst_id,
+                                          self._get_trigger_side(),
+                                          self._msg.entry_price,
+                                          self)
+
+    def _get_trigger_side(self) -> TriggerSide:
+        # Same as the fill condition of the broker's "LIMIT" and "STOP" orders.
+        if self._msg.order_dir == OrderRequest.DIR_LONG:
+            if self._msg.order_type == OrderRequest.ORDER_TYP_LIMIT:
+                return TriggerSide.ASK_AT_OR_BELOW
+            return TriggerSide.ASK_AT_OR_ABOVE
+        if self._msg.order_type == OrderRequest.ORDER_TYP_LIMIT:
+            return TriggerSide.BID_AT_OR_ABOVE
+        return TriggerSide.BID_AT_OR_BELOW
+
+    def trigger(self) -> None:
+        """
+        Called when the price crosses the local trigger.
+        The entry order is sent at once as a "MARKET" order.
+        """
+        self.logger.debug("  Local trigger crossed.(ticket_id:[{}])", self._ticket_id)
+        self._is_triggered = True
+        self._trans_from_EntryTriggering_to_EntryOrdering()
+        self._on_do_EntryOrdering()
+
+    def _is_market_order(self) -> bool:
+        return ((self._msg.order_type == OrderRequest.ORDER_TYP_MARKET)
+                or self._is_triggered)
+
     def _on_do_EntryOrdering(self) -> None:
 
         if self._future is None:
             req = OrderCreateSrv.Request()
-            req.ordertype_msg.type = ORDER_TYP_DICT[self._msg.order_type]
 
-            if self._msg.order_type == OrderRequest.ORDER_TYP_MARKET:
+            if self._is_market_order():
+                req.ordertype_msg.type = ORDER_TYP_DICT[OrderRequest.ORDER_TYP_MARKET]
                 req.price = 0.0
             else:
+                req.ordertype_msg.type = ORDER_TYP_DICT[self._msg.order_type]
                 req.price = self._msg.entry_price
 
             if self._msg.order_dir == OrderRequest.DIR_LONG:
@@ -311,12 +488,17 @@ class OrderTicket():
             req.take_profit_price = self._msg.take_profit_price
             req.stop_loss_price = self._msg.stop_loss_price
 
+            if OrderTicket.order_batcher is None:
+                cli = OrderTicket.cli_ordcre
+            else:
+                cli = OrderTicket.order_batcher
+
             self.logger.debug("----- Requesting \"Order Create\" -----")
             try:
-                self._future = OrderTicket.cli_ordcre.call_async(req)
+                self._future = self._call_async(cli, req)
             except Exception as err:
-                self.logger.error("{:!^50}".format(" Call ROS Service Error (Order Create) "))
-                self.logger.error("{}".format(err))
+                self.logger.error("{:!^50}", " Call ROS Service Error (Order Create) ")
+                self.logger.error("{}", err)
                 self._trans_to_Complete()
         else:
             if self._future.done():
@@ -324,30 +506,33 @@ class OrderTicket():
                 if self._future.result() is not None:
                     rsp = self._future.result()
                     if rsp.result:
-                        if self._msg.order_type == OrderRequest.ORDER_TYP_MARKET:
+                        self._trace_from_signal("order_path.ack")
+                        if self._is_market_order():
                             self._trade_id = rsp.id
-                            self.logger.debug("  - trade_id:[{}]".format(self._trade_id))
+                            self._trace_from_signal("order_path.fill")
+                            self.logger.debug("  - trade_id:[{}]", self._trade_id)
                             self._trans_from_EntryOrdering_to_ExitWaiting()
                         else:
                             self._order_id = rsp.id
-                            self.logger.debug("  - order_id:[{}]".format(self._order_id))
+                            self.logger.debug("  - order_id:[{}]", self._order_id)
                             self._trans_from_EntryOrdering_to_EntryWaiting()
                     else:
-                        self.logger.error("{:!^50}".format(" Call ROS Service Fail (Order Create) "))
+                        self.logger.error("{:!^50}", " Call ROS Service Fail (Order Create) ")
                         self._trans_to_Complete()
                 else:
-                    self.logger.error("{:!^50}".format(" Call ROS Service Error (Order Create) "))
+                    self.logger.error("{:!^50}", " Call ROS Service Error (Order Create) ")
                     self.logger.error("  future.result() is \"None\".")
                     self._trans_to_Complete()
             else:
-                self.logger.debug("  Requesting now...")
+                self.logger.debug("  Requesting now...", throttle_sec=self._LOG_THROTTLE_SEC)
 
     def _on_entry_EntryWaiting(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
         self._next_pol_time = self._update_next_pollingtime(dt.datetime.now())
 
     def _on_do_EntryWaiting(self) -> None:
         now = dt.datetime.now()
+        self._is_trans_lock_waiting = False
         if self._is_entry_exp_time_over:
             self._trans_to_Complete()
         elif ((self._entry_exp_time is not None) and (self._entry_exp_time < now)):
@@ -355,17 +540,37 @@ class OrderTicket():
             self._is_entry_exp_time_over = True
         elif self._next_pol_time < now:
             self.logger.debug("<<< Timeout >>> in EntryWaiting")
-            self._trans_from_EntryWaiting_to_EntryChecking()
+            if not self._trans_from_EntryWaiting_to_EntryChecking():
+                self._wait_for_trans_unlock()
         else:
             pass
 
     def _conditions_trans_lock(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
-        self.logger.debug("--- trans_lock state:[{}]".format(OrderTicket._is_trans_lock))
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
+        self.logger.debug("--- trans_lock state:[{}]", OrderTicket._is_trans_lock)
         return not OrderTicket._is_trans_lock
 
+    def _wait_for_trans_unlock(self) -> None:
+        self.logger.debug("--- Wait for trans \"Unlocked\"")
+        self._is_trans_lock_waiting = True
+        # Retried at the next polling time as well, in case no wakeup comes.
+        self._trans_lock_retry_time = self._update_next_pollingtime(dt.datetime.now())
+        OrderTicket._trans_lock_waiters.append(self)
+
+    def _release_trans_lock(self) -> None:
+        OrderTicket._is_trans_lock = False
+        self.logger.debug("--- Trans \"Unlocked\"")
+        # Wake up all the tickets still waiting for the lock, oldest first.
+        # A woken ticket may expire or be removed instead of taking the lock,
+        # so the first one taking it wins and the others wait again.
+        waiters = OrderTicket._trans_lock_waiters
+        while waiters:
+            ticket = waiters.popleft()
+            if ticket._is_trans_lock_waiting:
+                OrderTicket.scheduler.wakeup(ticket)
+
     def _on_enter_EntryChecking(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
         self._future = None
         OrderTicket._is_trans_lock = True
         self.logger.debug("--- Trans \"Locked\"")
@@ -375,49 +580,50 @@ class OrderTicket():
         if self._future is None:
             req = OrderDetailsSrv.Request()
             req.order_id = self._order_id
-            self.logger.debug("----- Requesting \"Order Details\" (id:[{}]) -----"
-                              .format(self._order_id))
+            self.logger.debug("----- Requesting \"Order Details\" (id:[{}]) -----", self._order_id)
             try:
-                self._future = OrderTicket.cli_orddet.call_async(req)
+                self._future = self._call_async(OrderTicket.cli_orddet, req)
             except Exception as err:
-                self.logger.error("{:!^50}".format(" Call ROS Service Error (Order Details) "))
-                self.logger.error("{}".format(err))
+                self.logger.error("{:!^50}", " Call ROS Service Error (Order Details) ")
+                self.logger.error("{}", err)
                 self._trans_from_EntryChecking_to_EntryWaiting()
         else:
             if self._future.done():
-                self.logger.debug("  Request done.(id:[{}])".format(self._order_id))
+                self.logger.debug("  Request done.(id:[{}])", self._order_id)
                 if self._future.result() is not None:
                     rsp = self._future.result()
                     if rsp.result:
                         if rsp.order_state_msg.state == OrderState.STS_PENDING:
-                            self.logger.debug("  - order id:[{}] is Pending.".format(self._order_id))
+                            self.logger.debug("  - order id:[{}] is Pending.", self._order_id)
                             self._trans_from_EntryChecking_to_EntryWaiting()
                         elif rsp.order_state_msg.state == OrderState.STS_FILLED:
                             self._trade_id = rsp.open_trade_id
-                            self.logger.debug("  - order_id:[{}] is Filled.".format(self._order_id))
-                            self.logger.debug("  - trade_id:[{}] is Opened.".format(self._trade_id))
+                            self._trace_from_signal("order_path.fill")
+                            self.logger.debug("  - order_id:[{}] is Filled.", self._order_id)
+                            self.logger.debug("  - trade_id:[{}] is Opened.", self._trade_id)
                             self._trans_from_EntryChecking_to_ExitWaiting()
                         else:
-                            self.logger.debug("  - order id:[{}] is Unexpected State! (State No:<{}>)"
-                                              .format(self._order_id, rsp.order_state_msg.state))
+                            self.logger.debug("  - order id:[{}] is Unexpected State! (State No:<{}>)",
+                                              self._order_id,
+                                              rsp.order_state_msg.state)
                             self._trans_from_EntryChecking_to_EntryWaiting()
                     else:
-                        self.logger.error("{:!^50}".format(" Call ROS Service Fail (Order Details) "))
+                        self.logger.error("{:!^50}", " Call ROS Service Fail (Order Details) ")
                         self._trans_from_EntryChecking_to_EntryWaiting()
                 else:
-                    self.logger.error("{:!^50}".format(" Call ROS Service Error (Order Details) "))
+                    self.logger.error("{:!^50}", " Call ROS Service Error (Order Details) ")
                     self.logger.error("  future.result() is \"None\".")
                     self._trans_from_EntryChecking_to_EntryWaiting()
             else:
-                self.logger.debug("  Requesting now...(id:[{}])".format(self._order_id))
+                self.logger.debug("  Requesting now...(id:[{}])", self._order_id,
+                                  throttle_sec=self._LOG_THROTTLE_SEC)
 
     def _on_exit_EntryChecking(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
-        OrderTicket._is_trans_lock = False
-        self.logger.debug("--- Trans \"Unlocked\"")
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
+        self._release_trans_lock()
 
     def _on_enter_EntryCanceling(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
         self._future = None
         self._on_do_EntryCanceling()
 
@@ -426,53 +632,55 @@ class OrderTicket():
         if self._future is None:
             req = OrderCancelSrv.Request()
             req.order_id = self._order_id
-            self.logger.debug("----- Requesting \"Order Cancel\" (id:[{}]) -----"
-                              .format(self._order_id))
+            self.logger.debug("----- Requesting \"Order Cancel\" (id:[{}]) -----", self._order_id)
             try:
-                self._future = OrderTicket.cli_ordcnc.call_async(req)
+                self._future = self._call_async(OrderTicket.cli_ordcnc, req)
             except Exception as err:
-                self.logger.error("{:!^50}".format(" Call ROS Service Error (Order Cancel) "))
-                self.logger.error("{}".format(err))
+                self.logger.error("{:!^50}", " Call ROS Service Error (Order Cancel) ")
+                self.logger.error("{}", err)
                 self._trans_to_Complete()
         else:
             if self._future.done():
-                self.logger.debug("  Request done.(id:[{}])".format(self._order_id))
+                self.logger.debug("  Request done.(id:[{}])", self._order_id)
                 if self._future.result() is not None:
                     rsp = self._future.result()
                     if rsp.result:
-                        self.logger.debug("  EntryCanceling complete.(id:[{}])".format(self._order_id))
+                        self.logger.debug("  EntryCanceling complete.(id:[{}])", self._order_id)
                         self._trans_from_EntryCanceling_to_Complete()
                     else:
                         if rsp.frc_msg.reason_code == frc.REASON_ORDER_DOESNT_EXIST:
-                            self.logger.debug("  EntryCanceling fail.(id:[{}])".format(self._order_id))
+                            self.logger.debug("  EntryCanceling fail.(id:[{}])", self._order_id)
                             self.logger.debug("    - Order doesnt exist!")
                             self._trans_from_EntryCanceling_to_EntryChecking()
                         else:
-                            self.logger.error("{:!^50}".format(" Call ROS Service Fail (Order Cancel) "))
+                            self.logger.error("{:!^50}", " Call ROS Service Fail (Order Cancel) ")
                             self._trans_to_Complete()
                 else:
-                    self.logger.error("{:!^50}".format(" Call ROS Service Error (Order Cancel) "))
+                    self.logger.error("{:!^50}", " Call ROS Service Error (Order Cancel) ")
                     self.logger.error("  future.result() is \"None\".")
                     self._trans_to_Complete()
             else:
-                self.logger.debug("  Requesting now...(id:[{}])".format(self._order_id))
+                self.logger.debug("  Requesting now...(id:[{}])", self._order_id,
+                                  throttle_sec=self._LOG_THROTTLE_SEC)
 
     def _on_entry_ExitWaiting(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
         self._next_pol_time = self._update_next_pollingtime(dt.datetime.now())
 
     def _on_do_ExitWaiting(self) -> None:
         now = dt.datetime.now()
+        self._is_trans_lock_waiting = False
         if ((self._exit_exp_time is not None) and (self._exit_exp_time < now)):
             self._trans_from_ExitWaiting_to_ExitOrdering()
         elif self._next_pol_time < now:
             self.logger.debug("<<< Timeout >>> in ExitWaiting")
-            self._trans_from_ExitWaiting_to_ExitChecking()
+            if not self._trans_from_ExitWaiting_to_ExitChecking():
+                self._wait_for_trans_unlock()
         else:
             pass
 
     def _on_enter_ExitChecking(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
         self._future = None
         OrderTicket._is_trans_lock = True
         self.logger.debug("--- Trans \"Locked\"")
@@ -482,47 +690,47 @@ class OrderTicket():
         if self._future is None:
             req = TradeDetailsSrv.Request()
             req.trade_id = self._trade_id
-            self.logger.debug("----- Requesting \"Trade Details\" (id:[{}]) -----"
-                              .format(self._trade_id))
+            self.logger.debug("----- Requesting \"Trade Details\" (id:[{}]) -----", self._trade_id)
             try:
-                self._future = OrderTicket.cli_trddet.call_async(req)
+                self._future = self._call_async(OrderTicket.cli_trddet, req)
             except Exception as err:
-                self.logger.error("{:!^50}".format(" Call ROS Service Error (Trade Details) "))
-                self.logger.error("{}".format(err))
+                self.logger.error("{:!^50}", " Call ROS Service Error (Trade Details) ")
+                self.logger.error("{}", err)
                 self._trans_from_ExitChecking_to_ExitWaiting()
         else:
             if self._future.done():
-                self.logger.debug("  Request done.(id:[{}])".format(self._trade_id))
+                self.logger.debug("  Request done.(id:[{}])", self._trade_id)
                 if self._future.result() is not None:
                     rsp = self._future.result()
                     if rsp.result:
                         if rsp.trade_state_msg.state == TradeState.STS_OPEN:
-                            self.logger.debug("  - trade id:[{}] is Opening.".format(self._trade_id))
+                            self.logger.debug("  - trade id:[{}] is Opening.", self._trade_id)
                             self._trans_from_ExitChecking_to_ExitWaiting()
                         elif rsp.trade_state_msg.state == TradeState.STS_CLOSED:
-                            self.logger.debug("  - trade id:[{}] is Closed.".format(self._trade_id))
+                            self.logger.debug("  - trade id:[{}] is Closed.", self._trade_id)
                             self._trans_from_ExitChecking_to_Complete()
                         else:
-                            self.logger.debug("  - trade id:[{}] is Unexpected State! (State No:<{}>)"
-                                              .format(self._trade_id, rsp.trade_state_msg.state))
+                            self.logger.debug("  - trade id:[{}] is Unexpected State! (State No:<{}>)",
+                                              self._trade_id,
+                                              rsp.trade_state_msg.state)
                             self._trans_from_ExitChecking_to_ExitWaiting()
                     else:
-                        self.logger.error("{:!^50}".format(" Call ROS Service Fail (Trade Details) "))
+                        self.logger.error("{:!^50}", " Call ROS Service Fail (Trade Details) ")
                         self._trans_from_ExitChecking_to_ExitWaiting()
                 else:
-                    self.logger.error("{:!^50}".format(" Call ROS Service Error (Trade Details) "))
+                    self.logger.error("{:!^50}", " Call ROS Service Error (Trade Details) ")
                     self.logger.error("  future.result() is \"None\".")
                     self._trans_from_ExitChecking_to_ExitWaiting()
             else:
-                self.logger.debug("  Requesting now...(id:[{}])".format(self._trade_id))
+                self.logger.debug("  Requesting now...(id:[{}])", self._trade_id,
+                                  throttle_sec=self._LOG_THROTTLE_SEC)
 
     def _on_exit_ExitChecking(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
-        OrderTicket._is_trans_lock = False
-        self.logger.debug("--- Trans \"Unlocked\"")
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
+        self._release_trans_lock()
 
     def _on_enter_ExitOrdering(self) -> None:
-        self.logger.debug("----- Call \"{}\"".format(sys._getframe().f_code.co_name))
+        self.logger.debug("----- Call \"{}\"", sys._getframe().f_code.co_name)
         self._future = None
         self._on_do_ExitOrdering()
 
@@ -531,17 +739,16 @@ class OrderTicket():
         if self._future is None:
             req = TradeCloseSrv.Request()
             req.trade_id = self._trade_id
-            self.logger.debug("----- Requesting \"Trade Close\" (id:[{}]) -----"
-                              .format(self._trade_id))
+            self.logger.debug("----- Requesting \"Trade Close\" (id:[{}]) -----", self._trade_id)
             try:
-                self._future = OrderTicket.cli_trdcls.call_async(req)
+                self._future = self._call_async(OrderTicket.cli_trdcls, req)
             except Exception as err:
-                self.logger.error("{:!^50}".format(" Call ROS Service Error (Trade Close) "))
-                self.logger.error("{}".format(err))
+                self.logger.error("{:!^50}", " Call ROS Service Error (Trade Close) ")
+                self.logger.error("{}", err)
                 self._trans_to_Complete()
         else:
             if self._future.done():
-                self.logger.debug("  Request done.(id:[{}])".format(self._trade_id))
+                self.logger.debug("  Request done.(id:[{}])", self._trade_id)
                 if self._future.result() is not None:
                     rsp = self._future.result()
                     if rsp.result:
@@ -550,23 +757,137 @@ class OrderTicket():
                         if rsp.frc_msg.reason_code == frc.REASON_TRADE_DOESNT_EXIST:
                             self._trans_from_ExitOrdering_to_Complete()
                         else:
-                            self.logger.error("{:!^50}".format(" Call ROS Service Fail (Trade Close) "))
+                            self.logger.error("{:!^50}", " Call ROS Service Fail (Trade Close) ")
                             self._trans_to_Complete()
                 else:
-                    self.logger.error("{:!^50}".format(" Call ROS Service Error (Trade Close) "))
+                    self.logger.error("{:!^50}", " Call ROS Service Error (Trade Close) ")
                     self.logger.error("  future.result() is \"None\".")
                     self._trans_to_Complete()
             else:
-                self.logger.debug("  Requesting now...(id:[{}])".format(self._trade_id))
+                self.logger.debug("  Requesting now...(id:[{}])", self._trade_id,
+                                  throttle_sec=self._LOG_THROTTLE_SEC)
 
     def _on_do_Complete(self) -> None:
         pass
 
     def _update_next_pollingtime(self, time: dt.datetime) -> dt.datetime:
         next_time = time.replace(second=10, microsecond=0) + self._POL_INTERVAL
-        self.logger.debug(" - update polling time:{}".format(next_time))
+        self.logger.debug(" - update polling time:{}", next_time)
         return next_time
 
+    def get_next_event_time(self) -> Optional[dt.datetime]:
+        """
+        Time when "do_timeout_event" has to be called next.
+        "None" means the ticket is idle until "OrderScheduler.wakeup" is called.
+        """
+        if (self._future is not None) and (not self._future.done()):
+            return None
+
+        if self.state == self.States.EntryTriggering:
+            return self._entry_exp_time
+        elif self.state == self.States.EntryWaiting:
+            if self._is_entry_exp_time_over:
+                return dt.datetime.now()
+            exp_time = self._entry_exp_time
+        elif self.state == self.States.ExitWaiting:
+            exp_time = self._exit_exp_time
+        elif self.state == self.States.Complete:
+            return None
+        else:
+            return dt.datetime.now()
+
+        if self._is_trans_lock_waiting:
+            if exp_time is None:
+                return self._trans_lock_retry_time
+            return min(self._trans_lock_retry_time, exp_time)
+        if exp_time is None:
+            return self._next_pol_time
+        return min(self._next_pol_time, exp_time)
+
+    def reconcile(self,
+                  pending_order_ids: Optional[Set[int]],
+                  open_trade_ids: Optional[Set[int]]
+                  ) -> None:
+        """
+        Reconcile a restored ticket with the broker's pending orders and
+        open trades. "None" means unknown, then the ticket is polled at once.
+        """
+        if self.state == self.States.EntryWaiting:
+            if ((pending_order_ids is None)
+                    or (self._order_id not in pending_order_ids)):
+                self._next_pol_time = dt.datetime.now()
+        elif self.state == self.States.ExitWaiting:
+            if open_trade_ids is None:
+                self._next_pol_time = dt.datetime.now()
+            elif self._trade_id not in open_trade_ids:
+                self.logger.debug("  - trade id:[{}] was Closed while stopped.", self._trade_id)
+                self._trans_to_Complete()
+
+    def _restore(self, rec: Dict[str, Any]) -> None:
+        self.state = self.States[rec["state"]]
+        self._order_id = rec["order_id"]
+        self._trade_id = rec["trade_id"]
+        self._journal_rec = {"state": rec["state"],
+                             "order_id": rec["order_id"],
+                             "trade_id": rec["trade_id"]}
+
+        if self.state in (self.States.EntryWaiting, self.States.ExitWaiting):
+            self._next_pol_time = self._update_next_pollingtime(dt.datetime.now())
+        elif self.state == self.States.EntryTriggering:
+            self._on_enter_EntryTriggering()
+        elif self.state == self.States.EntryCanceling:
+            self._is_entry_exp_time_over = True
+
+        self.logger.debug("  - restored state:[{}]", self.state)
+        self.logger.debug("  - order_id:[{}]", self._order_id)
+        self.logger.debug("  - trade_id:[{}]", self._trade_id)
+
+    def _on_state_changed(self) -> None:
+        if self.state == self.States.Complete:
+            self._write_journal(is_deleted=True)
+        else:
+            self._write_journal()
+
+    def _write_journal(self, is_deleted: bool = False, **fields) -> None:
+        if OrderTicket.journal is None:
+            return
+
+        try:
+            if is_deleted:
+                OrderTicket.journal.delete(self._ticket_id)
+                return
+
+            rec = {"state": self._RESUME_STATE_DICT[self.state].name,
+                   "order_id": self._order_id,
+                   "trade_id": self._trade_id}
+            if (rec != self._journal_rec) or fields:
+                self._journal_rec = rec
+                rec = dict(rec, **fields)
+                OrderTicket.journal.write(self._ticket_id, rec)
+        except OSError as err:
+            self.logger.error("{:!^50}", " Ticket Journal Error ")
+            self.logger.error("{}", err)
+
+    def _call_async(self, cli: Client, req: MsgType) -> Future:
+        req.trace_msg.trace_id = self._msg.trace_id
+        req.trace_msg.request_ns = time.time_ns()
+        future = cli.call_async(req)
+        future.add_done_callback(partial(self._on_future_done, cli.srv_name))
+        return future
+
+    def _on_future_done(self, srv_name: str, future: Future) -> None:
+        rsp = future.result()
+        if (OrderTicket.tracer is not None) and (rsp is not None):
+            OrderTicket.tracer.add_service(srv_name, rsp.trace_msg, time.time_ns())
+        OrderTicket.scheduler.wakeup(self)
+
+    def _trace_from_signal(self, stage: str) -> None:
+        if OrderTicket.tracer is not None:
+            OrderTicket.tracer.add(stage, self._msg.signal_ns, time.time_ns())
+
+
+OrderTicket._sm = OrderTicket._create_state_machine()
+
 
 class OrderScheduler(Node):
 
@@ -574,13 +895,70 @@ class OrderScheduler(Node):
         super().__init__("order_scheduler")
 
         # Set logger lebel
-        self.logger = super().get_logger()
-        self.logger.set_level(rclpy.logging.LoggingSeverity.DEBUG)
-        OrderTicket.logger = self.logger
+        self.logger = LazyLogger(super().get_logger())
+        OrderTicket.scheduler = self
+        OrderTicket.tracer = LatencyTracer(self.get_name())
+        OrderTicket.trigger_engine = TriggerEngine()
 
-        self._tickets: list[OrderTicket] = []
+        # Define Constant value.
+        self._MAX_TIMEOUT_SEC = 1.0
+
+        self._tickets: set[OrderTicket] = set()
+        self._timer_heap = TimerHeap()
+        self._next_ticket_id = 0
+
+        # Declare ROS parameter
+        self._rosprm = _RosParams()
+        self.declare_parameter(self._rosprm.JOURNAL_PATH.name,
+                               "~/.ros/trade_manager/order_ticket.journal")
+        self.declare_parameter(self._rosprm.JOURNAL_COMPACT_COUNT.name, 1000)
+        self.declare_parameter(self._rosprm.TRACE_PUBLISH_PERIOD.name, 10.0)
+        self.declare_parameter(self._rosprm.ORDER_BATCH_WINDOW.name, 0.01)
+        self.declare_parameter(self._rosprm.ORDER_BATCH_MAX_SIZE.name, 50)
+        self.declare_parameter(self._rosprm.LOG_LEVEL.name, "INFO")
+        self.declare_parameter(self._rosprm.LOG_LEVEL_TICKET.name, "")
+
+        # Set ROS parameter
+        para = self.get_parameter(self._rosprm.JOURNAL_PATH.name)
+        self._rosprm.JOURNAL_PATH.value = para.value
+        para = self.get_parameter(self._rosprm.JOURNAL_COMPACT_COUNT.name)
+        self._rosprm.JOURNAL_COMPACT_COUNT.value = para.value
+        para = self.get_parameter(self._rosprm.TRACE_PUBLISH_PERIOD.name)
+        self._rosprm.TRACE_PUBLISH_PERIOD.value = para.value
+        para = self.get_parameter(self._rosprm.ORDER_BATCH_WINDOW.name)
+        self._rosprm.ORDER_BATCH_WINDOW.value = para.value
+        para = self.get_parameter(self._rosprm.ORDER_BATCH_MAX_SIZE.name)
+        self._rosprm.ORDER_BATCH_MAX_SIZE.value = para.value
+        para = self.get_parameter(self._rosprm.LOG_LEVEL.name)
+        self._rosprm.LOG_LEVEL.value = para.value
+        para = self.get_parameter(self._rosprm.LOG_LEVEL_TICKET.name)
+        self._rosprm.LOG_LEVEL_TICKET.value = para.value
+
+        # "log_level_ticket" falls back on "log_level" if it is not set.
+        self.logger.set_level(get_severity(self._rosprm.LOG_LEVEL.value))
+        OrderTicket.logger = self.logger.get_child("ticket")
+        OrderTicket.logger.set_level(get_severity(self._rosprm.LOG_LEVEL_TICKET.value
+                                                  or self._rosprm.LOG_LEVEL.value))
+
+        self.logger.debug("[Param]Journal:")
+        self.logger.debug("  - path:[{}]", self._rosprm.JOURNAL_PATH.value)
+        self.logger.debug("  - compact_count:[{}]", self._rosprm.JOURNAL_COMPACT_COUNT.value)
+        self.logger.debug("[Param]Trace:")
+        self.logger.debug("  - publish_period:[{}]", self._rosprm.TRACE_PUBLISH_PERIOD.value)
+        self.logger.debug("[Param]Order Batch:")
+        self.logger.debug("  - window:[{}]", self._rosprm.ORDER_BATCH_WINDOW.value)
+        self.logger.debug("  - max_size:[{}]", self._rosprm.ORDER_BATCH_MAX_SIZE.value)
+        self.logger.debug("[Param]Log Level:")
+        self.logger.debug("  - node:[{}]", self._rosprm.LOG_LEVEL.value)
+        self.logger.debug("  - ticket:[{}]", self._rosprm.LOG_LEVEL_TICKET.value)
 
         TPCNM_ORDER_REQUEST = "order_request"
+        TPCNM_DIAGNOSTICS = "diagnostics"
+        TPCNM_PRICING_DICT = {
+            InstMng.INST_USD_JPY: "pricing_usdjpy",
+            InstMng.INST_EUR_JPY: "pricing_eurjpy",
+            InstMng.INST_EUR_USD: "pricing_eurusd",
+        }
 
         # Declare publisher and subscriber
         qos_profile = QoSProfile(history=QoSHistoryPolicy.KEEP_ALL,
@@ -594,6 +972,26 @@ class OrderScheduler(Node):
                                                  callback,
                                                  qos_profile)
 
+        self._sub_pri = []
+        for inst_id, topic in TPCNM_PRICING_DICT.items():
+            msg_type = Pricing
+            callback = partial(self._on_sub_pricing, inst_id)
+            sub = self.create_subscription(msg_type,
+                                           topic,
+                                           callback,
+                                           qos_profile)
+            self._sub_pri.append(sub)
+
+        msg_type = DiagnosticArray
+        topic = TPCNM_DIAGNOSTICS
+        self._pub_diag = self.create_publisher(msg_type,
+                                               topic,
+                                               qos_profile)
+
+        if 0 < self._rosprm.TRACE_PUBLISH_PERIOD.value:
+            self._trace_timer = self.create_timer(self._rosprm.TRACE_PUBLISH_PERIOD.value,
+                                                  self._on_timer_trace)
+
         try:
             # Create service client "OrderCreate"
             OrderTicket.cli_ordcre = self._create_service_client(
@@ -625,61 +1023,230 @@ class OrderScheduler(Node):
                 TradeCloseSrv,
                 "trade_close")
 
+            # Create service client "OrderTradeList"
+            self._cli_ordtrdlst = self._create_service_client(
+                OrderTradeListSrv,
+                "order_trade_list")
+
+            # Create service client "OrderCreateBulk"
+            # (Batching is disabled if "order_batch.window" is not positive.)
+            if 0 < self._rosprm.ORDER_BATCH_WINDOW.value:
+                cli = self._create_service_client(
+                    OrderCreateBulkSrv,
+                    "order_create_bulk")
+                OrderTicket.order_batcher = OrderCreateBatcher(
+                    cli,
+                    self._rosprm.ORDER_BATCH_WINDOW.value,
+                    self._rosprm.ORDER_BATCH_MAX_SIZE.value)
+
         except Exception as err:
-            self.logger.error("{:!^50}".format(" Exception "))
+            self.logger.error("{:!^50}", " Exception ")
             self.logger.error(err)
             self.destroy_node()
             raise InitializerErrorException("create service client failed.")
 
+        if self._rosprm.JOURNAL_PATH.value:
+            try:
+                OrderTicket.journal = TicketJournal(self._rosprm.JOURNAL_PATH.value,
+                                                    self._rosprm.JOURNAL_COMPACT_COUNT.value)
+                recs = OrderTicket.journal.load()
+            except (OSError, ValueError) as err:
+                self.logger.error("{:!^50}", " Ticket Journal Error ")
+                self.logger.error("{}", err)
+                OrderTicket.journal = None
+            else:
+                self._restore_tickets(recs)
+
     def do_timeout_event(self) -> None:
 
-        for ticket in self._tickets:
+        for ticket in self._timer_heap.pop_due(dt.datetime.now()):
             ticket.do_timeout_event()
+            self._schedule(ticket)
+
+        batcher = OrderTicket.order_batcher
+        if (batcher is not None) and (batcher.flush_time is not None):
+            if batcher.flush_time <= dt.datetime.now():
+                self._flush_order_batch()
+
+        # The journal lines written in this spin are synced at once.
+        if OrderTicket.journal is not None:
+            try:
+                OrderTicket.journal.sync()
+            except OSError as err:
+                self.logger.error("{:!^50}", " Ticket Journal Error ")
+                self.logger.error("{}", err)
+
+    def get_timeout_sec(self) -> float:
+        next_time = self._timer_heap.peek_time()
+        batcher = OrderTicket.order_batcher
+        if (batcher is not None) and (batcher.flush_time is not None):
+            if (next_time is None) or (batcher.flush_time < next_time):
+                next_time = batcher.flush_time
+        if next_time is None:
+            return self._MAX_TIMEOUT_SEC
+        timeout_sec = (next_time - dt.datetime.now()).total_seconds()
+        return min(max(timeout_sec, 0.0), self._MAX_TIMEOUT_SEC)
+
+    def wakeup(self, ticket: OrderTicket) -> None:
+        if ticket in self._tickets:
+            self._timer_heap.push(ticket, dt.datetime.now())
+
+    def _restore_tickets(self, recs: Dict[int, Dict[str, Any]]) -> None:
+        dbg_tm_start = dt.datetime.now()
+
+        restored = []
+        for ticket_id, rec in sorted(recs.items()):
+            self._next_ticket_id = max(self._next_ticket_id, ticket_id + 1)
+            if rec["state"] == OrderTicket.States.EntryOrdering.name:
+                # The request may or may not have reached the broker.
+                self.logger.error("{:!^50}", " Ticket Restore Error ")
+                self.logger.error("  ticket_id:[{}] stopped while \"Order Create\".", ticket_id)
+                OrderTicket.journal.delete(ticket_id)
+                continue
+            try:
+                msg = _order_request_from_dict(rec["msg"])
+                ticket = OrderTicket(ticket_id, msg, restore_rec=rec)
+            except Exception as err:
+                self.logger.error("{:!^50}", " Ticket Restore Error ")
+                self.logger.error("{}", err)
+                OrderTicket.journal.delete(ticket_id)
+            else:
+                self._tickets.add(ticket)
+                restored.append(ticket)
+
+        dbg_tm_end = dt.datetime.now()
+        self.logger.info("Restored [{}] tickets from journal in [{}]",
+                         len(restored),
+                         dbg_tm_end - dbg_tm_start)
+
+        if restored:
+            self.logger.debug("----- Requesting \"Order Trade List\" -----")
+            try:
+                future = self._cli_ordtrdlst.call_async(OrderTradeListSrv.Request())
+            except Exception as err:
+                self.logger.error("{:!^50}", " Call ROS Service Error (Order Trade List) ")
+                self.logger.error("{}", err)
+                self._reconcile_tickets(restored, None)
+            else:
+                future.add_done_callback(partial(self._reconcile_tickets, restored))
+
+    def _reconcile_tickets(self,
+                           tickets: List[OrderTicket],
+                           future: Optional[Future]
+                           ) -> None:
+        rsp = None if future is None else future.result()
+        if (rsp is not None) and rsp.result:
+            pending_order_ids = set(rsp.pending_order_id_list)
+            open_trade_ids = set(rsp.open_trade_id_list)
+            for ticket in tickets:
+                ticket.reconcile(pending_order_ids, open_trade_ids)
+                self._schedule(ticket)
+
+            known_order_ids = {ticket.order_id for ticket in self._tickets}
+            known_trade_ids = {ticket.trade_id for ticket in self._tickets}
+            for order_id in pending_order_ids - known_order_ids:
+                self.logger.warn("  - order_id:[{}] is not managed by any ticket.", order_id)
+            for trade_id in open_trade_ids - known_trade_ids:
+                self.logger.warn("  - trade_id:[{}] is not managed by any ticket.", trade_id)
+        else:
+            self.logger.error("{:!^50}", " Call ROS Service Fail (Order Trade List) ")
+            for ticket in tickets:
+                ticket.reconcile(None, None)
+                self._schedule(ticket)
 
+    def _schedule(self, ticket: OrderTicket) -> None:
         # remove "Complete" States element
-        self._tickets = [ticket for ticket in self._tickets
-                         if ticket.state != OrderTicket.States.Complete]
-        gc.collect()
+        if ticket.state == OrderTicket.States.Complete:
+            self._timer_heap.remove(ticket)
+            self._tickets.discard(ticket)
+            return
+
+        next_time = ticket.get_next_event_time()
+        if next_time is None:
+            self._timer_heap.remove(ticket)
+        else:
+            self._timer_heap.push(ticket, next_time)
 
     def _create_service_client(self, srv_type: int, srv_name: str) -> Client:
         cli = self.create_client(srv_type, srv_name)
         while not cli.wait_for_service(timeout_sec=1.0):
             if not rclpy.ok():
                 raise RuntimeError("Interrupted while waiting for service.")
-            self._logger.info("Waiting for [{}] service...".format(srv_name))
+            self.logger.info("Waiting for [{}] service...", srv_name)
         return cli
 
+    def _on_timer_trace(self) -> None:
+        stamp = self.get_clock().now().to_msg()
+        msg = OrderTicket.tracer.to_diagnostic_array(stamp)
+        if msg.status:
+            self._pub_diag.publish(msg)
+
+    def _on_sub_pricing(self, inst_id: int, msg: MsgType) -> None:
+        if not (msg.tradeable and msg.bids and msg.asks):
+            return
+        fired = OrderTicket.trigger_engine.pop_crossed(inst_id,
+                                                       msg.bids[0].price,
+                                                       msg.asks[0].price)
+        for ticket in fired:
+            ticket.trigger()
+            self._schedule(ticket)
+        if fired and (OrderTicket.order_batcher is not None):
+            # Orders fired by the same tick are sent without waiting the window.
+            self._flush_order_batch()
+
+    def _flush_order_batch(self) -> None:
+        try:
+            OrderTicket.order_batcher.flush()
+        except Exception as err:
+            self.logger.error("{:!^50}", " Call ROS Service Error (Order Create Bulk) ")
+            self.logger.error("{}", err)
+
     def _on_sub_order_request(self, msg: MsgType) -> None:
-        dt_now = dt.datetime.now().strftime(FMT_YMDHMSF)
-        self.logger.debug("{:=^50}".format(" Topic[order_request]:Start "))
-        self.logger.debug("  - inst_id:[{}]".format(msg.inst_msg.inst_id))
-        self.logger.debug("  - order_type:[{}]".format(msg.order_type))
-        self.logger.debug("  - order_dir:[{}]".format(msg.order_dir))
-        self.logger.debug("  - units:[{}]".format(msg.units))
-        self.logger.debug("  - entry_price:[{}]".format(msg.entry_price))
-        self.logger.debug("  - entry_exp_time:[{}]".format(msg.entry_exp_time))
-        self.logger.debug("  - take_profit_price:[{}]".format(msg.take_profit_price))
-        self.logger.debug("  - stop_loss_price:[{}]".format(msg.stop_loss_price))
-        self.logger.debug("  - exit_exp_time:[{}]".format(msg.exit_exp_time))
-        self.logger.debug("[Performance]")
-        self.logger.debug("  - request time:[{}]".format(dt_now))
+        receive_ns = time.time_ns()
+        if self.logger.is_debug_enabled():
+            dt_now = dt.datetime.now().strftime(FMT_YMDHMSF)
+            self.logger.debug("{:=^50}", " Topic[order_request]:Start ")
+            self.logger.debug("  - inst_id:[{}]", msg.inst_msg.inst_id)
+            self.logger.debug("  - order_type:[{}]", msg.order_type)
+            self.logger.debug("  - order_dir:[{}]", msg.order_dir)
+            self.logger.debug("  - units:[{}]", msg.units)
+            self.logger.debug("  - entry_price:[{}]", msg.entry_price)
+            self.logger.debug("  - entry_exp_time:[{}]", msg.entry_exp_time)
+            self.logger.debug("  - take_profit_price:[{}]", msg.take_profit_price)
+            self.logger.debug("  - stop_loss_price:[{}]", msg.stop_loss_price)
+            self.logger.debug("  - exit_exp_time:[{}]", msg.exit_exp_time)
+            self.logger.debug("  - trace_id:[{}]", msg.trace_id)
+            self.logger.debug("[Performance]")
+            self.logger.debug("  - request time:[{}]", dt_now)
+
+        if not msg.trace_id:
+            msg.trace_id = uuid.uuid4().hex
+        if msg.signal_ns <= 0:
+            msg.signal_ns = receive_ns
+        else:
+            OrderTicket.tracer.add("order_request.delivery", msg.signal_ns, receive_ns)
 
         if self._validate_msg(msg):
             try:
-                ticket = OrderTicket(msg)
+                ticket = OrderTicket(self._next_ticket_id, msg)
+                self._next_ticket_id += 1
             except Exception as err:
-                self.logger.error("{:!^50}".format(" OrderTicket initialize Exception "))
+                self.logger.error("{:!^50}", " OrderTicket initialize Exception ")
                 self.logger.error(err)
             else:
-                self._tickets.append(ticket)
+                self._tickets.add(ticket)
+                self._schedule(ticket)
         else:
-            self.logger.error("{:!^50}".format(" Validate msg: NG "))
+            self.logger.error("{:!^50}", " Validate msg: NG ")
 
     def _validate_msg(self, msg: MsgType) -> Bool:
 
         if msg.units < 0:
             return False
 
+        if msg.is_local_trigger and (msg.order_type == OrderRequest.ORDER_TYP_MARKET):
+            return False
+
         return True
 
 
@@ -694,7 +1261,7 @@ def main(args=None):
     else:
         try:
             while rclpy.ok():
-                rclpy.spin_once(os, timeout_sec=1.0)
+                rclpy.spin_once(os, timeout_sec=os.get_timeout_sec())
                 os.do_timeout_event()
         except KeyboardInterrupt:
             pass
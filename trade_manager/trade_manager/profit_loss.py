@@ -0,0 +1,277 @@
+from typing import Dict, Set, TypeVar
+from dataclasses import dataclass
+from functools import partial
+import numpy as np
+import rclpy
+from rclpy.node import Node
+from rclpy.qos import QoSProfile, QoSHistoryPolicy, QoSReliabilityPolicy
+from rclpy.client import Client
+from rclpy.task import Future
+from trade_manager.constant import INST_DICT
+from trade_manager.exception import InitializerErrorException
+from trade_manager.utility import RosParam
+from oanda_api.lazy_logger import LazyLogger, get_severity
+from trade_manager_msgs.msg import Instrument as InstMng
+from trade_manager_msgs.msg import UnrealizedPl
+from api_msgs.srv import TradeDetailsSrv, OrderTradeListSrv
+from api_msgs.msg import Pricing
+from api_msgs.msg import TradeState
+
+MsgType = TypeVar("MsgType")
+
+# Instrument used to convert the quote currency into JPY.
+# ("None" means that the instrument is quoted in JPY.)
+_JPY_CONV_INST_DICT = {
+    InstMng.INST_USD_JPY: None,
+    InstMng.INST_EUR_JPY: None,
+    InstMng.INST_EUR_USD: InstMng.INST_USD_JPY,
+}
+
+
+@dataclass
+class _RosParams():
+    """
+    ROS Parameter.
+    """
+    SYNC_INTERVAL = RosParam("sync_interval")
+    LOG_LEVEL = RosParam("log_level")
+
+
+class TradeArrays():
+    """
+    Open trades of an instrument held in compact parallel arrays.
+    """
+
+    def __init__(self) -> None:
+        self.trade_ids = np.empty(0, dtype=np.int32)
+        self.prices = np.empty(0, dtype=np.float64)
+        self.units = np.empty(0, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.trade_ids)
+
+    def add(self, trade_id: int, price: float, units: int) -> None:
+        self.trade_ids = np.append(self.trade_ids, np.int32(trade_id))
+        self.prices = np.append(self.prices, price)
+        self.units = np.append(self.units, float(units))
+
+    def remove(self, trade_ids: Set[int]) -> int:
+        """
+        Remove the trades in "trade_ids", and return the number removed.
+        """
+        mask = ~np.isin(self.trade_ids, list(trade_ids))
+        removed = len(self.trade_ids) - int(np.count_nonzero(mask))
+        if 0 < removed:
+            self.trade_ids = self.trade_ids[mask]
+            self.prices = self.prices[mask]
+            self.units = self.units[mask]
+        return removed
+
+    def compute_pl(self, bid: float, ask: float) -> np.ndarray:
+        """
+        Unrealized P/L of all trades in the quote currency.
+        Long trades are closed out at the bid, short trades at the ask.
+        """
+        close = np.where(0 < self.units, bid, ask)
+        return (close - self.prices) * self.units
+
+
+class ProfitLossEngine(Node):
+    """
+    Unrealized P/L of the open trades computed from pricing ticks.
+
+    The open trades are synchronized with "order_trade_list" periodically,
+    and each new trade is fetched once with "trade_details". On each tick
+    the P/L of all trades of the instrument is recomputed in one vectorized
+    step and published on "unrealized_pl".
+    """
+
+    def __init__(self) -> None:
+        super().__init__("profit_loss")
+
+        # Set logger lebel
+        self.logger = LazyLogger(super().get_logger())
+
+        self._trades: Dict[int, TradeArrays] = {
+            inst_id: TradeArrays() for inst_id in INST_DICT.keys()
+        }
+        self._inst_pl: Dict[int, float] = {inst_id: 0.0 for inst_id in INST_DICT.keys()}
+        self._mid: Dict[int, float] = {}
+        self._inst_id_dict = {v: k for k, v in INST_DICT.items()}
+        self._requested_ids: Set[int] = set()
+        self._future_list = None
+
+        # Declare ROS parameter
+        self._rosprm = _RosParams()
+        self.declare_parameter(self._rosprm.SYNC_INTERVAL.name, 10.0)
+        self.declare_parameter(self._rosprm.LOG_LEVEL.name, "INFO")
+
+        # Set ROS parameter
+        para = self.get_parameter(self._rosprm.SYNC_INTERVAL.name)
+        self._rosprm.SYNC_INTERVAL.value = para.value
+        para = self.get_parameter(self._rosprm.LOG_LEVEL.name)
+        self._rosprm.LOG_LEVEL.value = para.value
+
+        self.logger.set_level(get_severity(self._rosprm.LOG_LEVEL.value))
+
+        self.logger.debug("[Param]Sync:")
+        self.logger.debug("  - interval:[{}]", self._rosprm.SYNC_INTERVAL.value)
+        self.logger.debug("[Param]Log Level:")
+        self.logger.debug("  - node:[{}]", self._rosprm.LOG_LEVEL.value)
+
+        TPCNM_UNREALIZED_PL = "unrealized_pl"
+        TPCNM_PRICING_DICT = {
+            InstMng.INST_USD_JPY: "pricing_usdjpy",
+            InstMng.INST_EUR_JPY: "pricing_eurjpy",
+            InstMng.INST_EUR_USD: "pricing_eurusd",
+        }
+
+        # Declare publisher and subscriber
+        qos_profile = QoSProfile(history=QoSHistoryPolicy.KEEP_ALL,
+                                 reliability=QoSReliabilityPolicy.RELIABLE)
+
+        msg_type = UnrealizedPl
+        topic = TPCNM_UNREALIZED_PL
+        self._pub_pl = self.create_publisher(msg_type,
+                                             topic,
+                                             qos_profile)
+
+        self._sub_pri = []
+        for inst_id, topic in TPCNM_PRICING_DICT.items():
+            msg_type = Pricing
+            callback = partial(self._on_sub_pricing, inst_id)
+            sub = self.create_subscription(msg_type,
+                                           topic,
+                                           callback,
+                                           qos_profile)
+            self._sub_pri.append(sub)
+
+        try:
+            # Create service client "TradeDetails"
+            self._cli_trddet = self._create_service_client(
+                TradeDetailsSrv,
+                "trade_details")
+
+            # Create service client "OrderTradeList"
+            self._cli_ordtrdlst = self._create_service_client(
+                OrderTradeListSrv,
+                "order_trade_list")
+
+        except Exception as err:
+            self.logger.error("{:!^50}", " Exception ")
+            self.logger.error("{}", err)
+            self.destroy_node()
+            raise InitializerErrorException("create service client failed.")
+
+        self._sync_trades()
+        self._sync_timer = self.create_timer(self._rosprm.SYNC_INTERVAL.value,
+                                             self._sync_trades)
+
+    def _create_service_client(self, srv_type: int, srv_name: str) -> Client:
+        cli = self.create_client(srv_type, srv_name)
+        while not cli.wait_for_service(timeout_sec=1.0):
+            if not rclpy.ok():
+                raise RuntimeError("Interrupted while waiting for service.")
+            self.logger.info("Waiting for [{}] service...", srv_name)
+        return cli
+
+    def _sync_trades(self) -> None:
+        if (self._future_list is not None) and (not self._future_list.done()):
+            return
+        req = OrderTradeListSrv.Request()
+        self._future_list = self._cli_ordtrdlst.call_async(req)
+        self._future_list.add_done_callback(self._on_done_trade_list)
+
+    def _on_done_trade_list(self, future: Future) -> None:
+        rsp = future.result()
+        if (rsp is None) or (not rsp.result):
+            self.logger.warn("Service[order_trade_list]: failed")
+            return
+
+        open_ids = set(rsp.open_trade_id_list)
+
+        for inst_id, trades in self._trades.items():
+            closed_ids = set(trades.trade_ids.tolist()) - open_ids
+            if closed_ids and (0 < trades.remove(closed_ids)):
+                self.logger.debug("Trades closed: inst_id:[{}], trade_id:{}",
+                                  inst_id, sorted(closed_ids))
+
+        known_ids = set()
+        for trades in self._trades.values():
+            known_ids.update(trades.trade_ids.tolist())
+
+        for trade_id in open_ids - known_ids - self._requested_ids:
+            req = TradeDetailsSrv.Request()
+            req.trade_id = trade_id
+            future = self._cli_trddet.call_async(req)
+            future.add_done_callback(partial(self._on_done_trade_details, trade_id))
+            self._requested_ids.add(trade_id)
+
+    def _on_done_trade_details(self, trade_id: int, future: Future) -> None:
+        self._requested_ids.discard(trade_id)
+        rsp = future.result()
+        if (rsp is None) or (not rsp.result):
+            self.logger.warn("Service[trade_details]: failed, trade_id:[{}]", trade_id)
+            return
+
+        if rsp.trade_state_msg.state != TradeState.STS_OPEN:
+            return
+
+        inst_id = self._inst_id_dict.get(rsp.inst_msg.inst_id)
+        if inst_id is None:
+            self.logger.warn("Unknown instrument: inst_id:[{}], trade_id:[{}]",
+                             rsp.inst_msg.inst_id, trade_id)
+            return
+
+        self._trades[inst_id].add(trade_id, rsp.contract_price, rsp.current_units)
+        self.logger.debug("Trade opened: inst_id:[{}], trade_id:[{}], "
+                          "price:[{}], units:[{}]",
+                          inst_id, trade_id, rsp.contract_price, rsp.current_units)
+
+    def _on_sub_pricing(self, inst_id: int, msg: MsgType) -> None:
+        if not (msg.bids and msg.asks):
+            return
+        bid = msg.bids[0].price
+        ask = msg.asks[0].price
+        self._mid[inst_id] = (bid + ask) / 2
+
+        trades = self._trades[inst_id]
+        if (len(trades) == 0) and (self._inst_pl[inst_id] == 0.0):
+            return
+
+        conv_inst_id = _JPY_CONV_INST_DICT[inst_id]
+        if conv_inst_id is None:
+            rate = 1.0
+        else:
+            rate = self._mid.get(conv_inst_id, np.nan)
+
+        pl = trades.compute_pl(bid, ask) * rate
+        self._inst_pl[inst_id] = float(pl.sum())
+
+        msg_pl = UnrealizedPl()
+        msg_pl.time = msg.time
+        msg_pl.inst_msg.inst_id = inst_id
+        msg_pl.trade_id_list = trades.trade_ids.tolist()
+        msg_pl.unrealized_pl_list = pl.tolist()
+        msg_pl.inst_unrealized_pl = self._inst_pl[inst_id]
+        msg_pl.total_unrealized_pl = sum(self._inst_pl.values())
+        self._pub_pl.publish(msg_pl)
+
+
+def main(args=None):
+
+    rclpy.init(args=args)
+
+    try:
+        ple = ProfitLossEngine()
+    except InitializerErrorException:
+        pass
+    else:
+        try:
+            rclpy.spin(ple)
+        except KeyboardInterrupt:
+            pass
+
+        ple.destroy_node()
+
+    rclpy.shutdown()
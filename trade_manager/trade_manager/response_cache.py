@@ -0,0 +1,69 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ResponseCache():
+    """
+    LRU cache of built service responses, bounded by their total size.
+
+    Each entry keeps the version of the data it was built from, and is
+    dropped when it is looked up with another version, i.e. after the data
+    has been updated.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        # key -> (version, value, size)
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if (entry is not None) and (entry[0] != version):
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, version: int, value: Any, size: int) -> None:
+        """
+        Add an entry of "size" bytes, evicting the least recently used ones
+        beyond the cap. An entry larger than the cap is not kept.
+        """
+        if key in self._entries:
+            self._remove(key)
+        if (self._max_bytes <= 0) or (self._max_bytes < size):
+            return
+
+        self._entries[key] = (version, value, size)
+        self._total_bytes += size
+        while self._max_bytes < self._total_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_size
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._total_bytes -= size
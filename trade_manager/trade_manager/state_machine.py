@@ -0,0 +1,126 @@
+from typing import Any, Dict, List
+from trade_manager.constant import Transitions as Tr
+from trade_manager.exception import InvalidTransitionErrorException
+
+_SOURCE_ANY = "*"
+_DEST_SAME = "="
+
+
+def _to_callback_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+class _Transition():
+    """
+    Compiled transition.
+    """
+    __slots__ = ("dest", "prepare", "conditions", "unless", "before", "after")
+
+    def __init__(self, dest: Any, spec: Dict[str, Any]) -> None:
+        self.dest = dest
+        self.prepare = _to_callback_list(spec.get(Tr.PREPARE.value))
+        self.conditions = _to_callback_list(spec.get(Tr.CONDITIONS.value))
+        self.unless = _to_callback_list(spec.get(Tr.UNLESS.value))
+        self.before = _to_callback_list(spec.get(Tr.BEFORE.value))
+        self.after = _to_callback_list(spec.get(Tr.AFTER.value))
+
+
+class StateMachine():
+    """
+    Table-driven state machine shared by all instances of a model class.
+
+    States and transitions are given in the same list-of-dict format as
+    "transitions.Machine". The transition table is compiled once and the
+    trigger methods are installed on the model class, so a model instance
+    only has to hold its current state in the "state" attribute.
+
+    As with "transitions.Machine", a trigger returns False if the conditions
+    are not met, and callbacks are called in the order "prepare",
+    "conditions", "before", "on_exit", "on_enter", "after",
+    "after_state_change".
+    """
+
+    def __init__(self,
+                 model_cls: type,
+                 states: List[Dict[str, Any]],
+                 transitions: List[Dict[str, Any]],
+                 initial: Any,
+                 after_state_change: str = None
+                 ) -> None:
+
+        self.spec_states = states
+        self.spec_transitions = transitions
+        self._initial = initial
+        self._after_state_change = _to_callback_list(after_state_change)
+
+        self._on_enter = {}
+        self._on_exit = {}
+        for spec in states:
+            name = spec[Tr.NAME.value]
+            self._on_enter[name] = _to_callback_list(spec.get(Tr.ON_ENTER.value))
+            self._on_exit[name] = _to_callback_list(spec.get(Tr.ON_EXIT.value))
+
+        # table[trigger][source state] = [_Transition, ...]
+        table = {}
+        for spec in transitions:
+            trigger = spec[Tr.TRIGGER.value]
+            source = spec[Tr.SOURCE.value]
+            dest = spec[Tr.DEST.value]
+            rules = table.setdefault(trigger, {})
+            if source == _SOURCE_ANY:
+                sources = self._on_enter.keys()
+            else:
+                sources = [source]
+            for src in sources:
+                dst = src if dest == _DEST_SAME else dest
+                rules.setdefault(src, []).append(_Transition(dst, spec))
+
+        for trigger, rules in table.items():
+            setattr(model_cls, trigger, self._create_trigger(trigger, rules))
+
+    def init_model(self, model: Any) -> None:
+        model.state = self._initial
+
+    def _create_trigger(self, trigger: str, rules: Dict[Any, List[_Transition]]):
+        machine = self
+
+        def trigger_method(model: Any) -> bool:
+            try:
+                candidates = rules[model.state]
+            except KeyError:
+                raise InvalidTransitionErrorException(
+                    "Can't trigger event \"{}\" from state \"{}\"."
+                    .format(trigger, model.state)) from None
+            for transition in candidates:
+                if machine._execute(model, transition):
+                    return True
+            return False
+
+        trigger_method.__name__ = trigger
+        return trigger_method
+
+    def _execute(self, model: Any, transition: _Transition) -> bool:
+        for name in transition.prepare:
+            getattr(model, name)()
+        for name in transition.conditions:
+            if not getattr(model, name)():
+                return False
+        for name in transition.unless:
+            if getattr(model, name)():
+                return False
+        for name in transition.before:
+            getattr(model, name)()
+        for name in self._on_exit[model.state]:
+            getattr(model, name)()
+        model.state = transition.dest
+        for name in self._on_enter[transition.dest]:
+            getattr(model, name)()
+        for name in transition.after:
+            getattr(model, name)()
+        for name in self._after_state_change:
+            getattr(model, name)()
+        return True
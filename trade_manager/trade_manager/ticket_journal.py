@@ -0,0 +1,115 @@
+import os
+import json
+from typing import Any, Dict
+
+_KEY_ID = "id"
+_KEY_DELETED = "deleted"
+
+
+class TicketJournal():
+    """
+    Append-only journal of order ticket records.
+
+    Each line is a JSON object holding a ticket ID and the fields that
+    changed. Replaying the file merges the lines per ticket ID, so the last
+    written value of every field wins. Deleted tickets are dropped from the
+    live set, and the file is compacted to one line per live ticket once
+    the number of lines grows well beyond the number of live tickets.
+
+    Each line is flushed to the OS as it is written, which covers a crash
+    of the process. The lines are synced to the disk by "sync", called once
+    per spin by the owner, so a crash of the OS or a power loss loses the
+    lines written since the last call at most.
+    """
+
+    def __init__(self,
+                 path: str,
+                 compact_count: int
+                 ) -> None:
+
+        self._path = os.path.expanduser(path)
+        self._compact_count = compact_count
+        self._live = {}
+        self._line_count = 0
+        self._file = None
+        self._is_dirty = False
+
+        dirname = os.path.dirname(self._path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Replay the journal and return the live records by ticket ID.
+        A torn last line (e.g. crash during write) is ignored.
+        """
+        self._live = {}
+        if os.path.exists(self._path):
+            with open(self._path, "r") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._merge(rec)
+
+        self._compact()
+        return {ticket_id: dict(rec) for ticket_id, rec in self._live.items()}
+
+    def write(self, ticket_id: int, rec: Dict[str, Any]) -> None:
+        rec = dict(rec)
+        rec[_KEY_ID] = ticket_id
+        self._merge(rec)
+        self._append(rec)
+
+    def delete(self, ticket_id: int) -> None:
+        rec = {_KEY_ID: ticket_id, _KEY_DELETED: True}
+        self._merge(rec)
+        self._append(rec)
+
+    def sync(self) -> None:
+        """
+        Sync the lines written since the last call to the disk.
+        """
+        if self._is_dirty:
+            os.fsync(self._file.fileno())
+            self._is_dirty = False
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def _merge(self, rec: Dict[str, Any]) -> None:
+        ticket_id = rec[_KEY_ID]
+        if rec.get(_KEY_DELETED, False):
+            self._live.pop(ticket_id, None)
+        else:
+            self._live.setdefault(ticket_id, {}).update(rec)
+
+    def _append(self, rec: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = open(self._path, "a")
+        self._file.write(json.dumps(rec, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._is_dirty = True
+        self._line_count += 1
+
+        if max(self._compact_count, 2 * len(self._live)) <= self._line_count:
+            self._compact()
+
+    def _compact(self) -> None:
+        self.close()
+        tmp_path = self._path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for rec in self._live.values():
+                f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+        self._line_count = len(self._live)
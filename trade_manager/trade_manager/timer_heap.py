@@ -0,0 +1,55 @@
+import heapq
+import itertools
+import datetime as dt
+from typing import Hashable, List, Optional
+
+
+class TimerHeap():
+    """
+    Min-heap of items keyed on their next due time.
+
+    Each item is held at most once. Re-scheduling an item invalidates its
+    previous entry, which is discarded lazily when it reaches the top.
+    """
+
+    _REMOVED = object()
+
+    def __init__(self) -> None:
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._entries
+
+    def push(self, item: Hashable, due_time: dt.datetime) -> None:
+        self.remove(item)
+        entry = [due_time, next(self._counter), item]
+        self._entries[item] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, item: Hashable) -> None:
+        entry = self._entries.pop(item, None)
+        if entry is not None:
+            entry[-1] = self._REMOVED
+
+    def peek_time(self) -> Optional[dt.datetime]:
+        heap = self._heap
+        while heap and (heap[0][-1] is self._REMOVED):
+            heapq.heappop(heap)
+        if heap:
+            return heap[0][0]
+        return None
+
+    def pop_due(self, now: dt.datetime) -> List[Hashable]:
+        due_items = []
+        heap = self._heap
+        while heap and (heap[0][0] <= now):
+            item = heapq.heappop(heap)[-1]
+            if item is not self._REMOVED:
+                del self._entries[item]
+                due_items.append(item)
+        return due_items
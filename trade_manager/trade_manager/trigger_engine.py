@@ -0,0 +1,42 @@
+from typing import Any, Dict, List, Tuple
+from oanda_api.price_triggers import PriceTriggers, TriggerSide
+
+
+class TriggerEngine():
+    """
+    Local price triggers of each instrument.
+
+    Triggers are indexed in sorted price arrays per instrument and side, so
+    a tick is checked with a binary search regardless of how many triggers
+    are pending. A fired trigger is removed from the engine.
+    """
+
+    def __init__(self) -> None:
+        self._triggers: Dict[Tuple[int, TriggerSide], PriceTriggers] = {}
+
+    def __len__(self) -> int:
+        return sum(len(triggers) for triggers in self._triggers.values())
+
+    def add(self, inst_id: int, side: TriggerSide, level: float, item: Any) -> None:
+        key = (inst_id, side)
+        triggers = self._triggers.get(key)
+        if triggers is None:
+            triggers = self._triggers[key] = PriceTriggers(side.is_upward)
+        triggers.add(level, item)
+
+    def remove(self, inst_id: int, side: TriggerSide, level: float, item: Any) -> bool:
+        triggers = self._triggers.get((inst_id, side))
+        if triggers is None:
+            return False
+        return triggers.remove(level, item)
+
+    def pop_crossed(self, inst_id: int, bid: float, ask: float) -> List[Any]:
+        """
+        Remove and return the items whose trigger is crossed by the tick.
+        """
+        fired = []
+        for side in TriggerSide:
+            triggers = self._triggers.get((inst_id, side))
+            if triggers:
+                fired += triggers.pop_crossed(ask if side.is_ask else bid)
+        return fired